@@ -10,6 +10,7 @@ from ordered_model.admin import OrderedModelAdmin
 from campaigns.models import Campaign, Petition, PetitionCheckbox, PetitionSignature
 from campaigns.tasks import geocode_signature
 from facets.models import District, RegisteredCommunityOrganization
+from facets.reports import facet_counts
 from pbaabp.admin import ReadOnlyLeafletGeoAdminMixin, organizer_admin
 
 
@@ -39,15 +40,12 @@ def pretty_report(modeladmin, request, queryset):
             list(petition.signatures.order_by("email").distinct("email").all()),
             key=lambda x: x.created_at,
         )
-        district_counts = {}
-        for district in District.objects.all():
-            cnt = (
-                petition.signatures.filter(location__within=district.mpoly)
-                .distinct("email")
-                .count()
-            )
-            if cnt > 0:
-                district_counts[district.name] = cnt
+        counts = facet_counts(District.objects.all(), petition.signatures.all(), distinct="email")
+        district_counts = {
+            district.name: counts[district.pk]["count"]
+            for district in District.objects.all()
+            if district.pk in counts
+        }
         _petitions[petition] = {
             "signatures": signatures,
             "total_count": len(signatures),
@@ -112,14 +110,19 @@ class PetitionAdmin(admin.ModelAdmin):
         report += f"Non-geocoded signatures: {nongeocoded}\n\n"
         report += "Districts:\n"
         philly = 0
+        district_counts = facet_counts(
+            District.objects.all(), obj.signatures.all(), distinct="email"
+        )
         for district in District.objects.all():
-            cnt = obj.signatures.filter(location__within=district.mpoly).distinct("email").count()
+            cnt = district_counts.get(district.pk, {}).get("count", 0)
             philly += cnt
             report += f"{district.name}: {cnt}\n"
         report += f"\nAll of Philadelphia: {philly}\n"
         report += "\nRCOs:\n"
-        for rco in RegisteredCommunityOrganization.objects.all():
-            cnt = obj.signatures.filter(location__within=rco.mpoly).distinct("email").count()
+        rcos = RegisteredCommunityOrganization.objects.all()
+        rco_counts = facet_counts(rcos, obj.signatures.all(), distinct="email")
+        for rco in rcos:
+            cnt = rco_counts.get(rco.pk, {}).get("count", 0)
             report += f"{rco.name}: {cnt}\n"
         return report
 
@@ -11,7 +11,7 @@ from ordered_model.models import OrderedModel
 
 from campaigns.tasks import geocode_signature, send_post_sign_email
 from events.models import ScheduledEvent
-from facets.models import District, RegisteredCommunityOrganization
+from facets.models import District, FacetMembership, RegisteredCommunityOrganization
 from lib.slugify import unique_slugify
 from membership.models import Donation, DonationProduct
 from pbaabp.models import ChoiceArrayField, MarkdownField
@@ -238,7 +238,7 @@ class PetitionCheckbox(OrderedModel):
         return self.label
 
 
-class PetitionSignature(models.Model):
+class PetitionSignature(FacetMembership):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     petition = models.ForeignKey(
         Petition, to_field="id", on_delete=models.CASCADE, related_name="signatures"
@@ -300,7 +300,7 @@ class PetitionSignature(models.Model):
     def district(self):
         if self.location is None:
             return None
-        return District.objects.filter(mpoly__contains=self.location).first()
+        return self.containing_district()
 
     @property
     def checkbox_responses_formatted(self):
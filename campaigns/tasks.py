@@ -3,6 +3,7 @@ from celery import shared_task
 from django.contrib.gis.geos import Point
 from django.template import engines
 
+from facets.membership import assign_facets
 from facets.utils import geocode_address
 from pbaabp.email import send_email_message
 
@@ -26,6 +27,7 @@ def geocode_signature(signature_id):
         else:
             print(f"No address found for {signature.postal_address_line_1} {signature.zip_code}")
             PetitionSignature.objects.filter(id=signature_id).update(location=None)
+        assign_facets(PetitionSignature.objects.filter(id=signature_id))
 
 
 @shared_task
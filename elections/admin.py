@@ -44,7 +44,7 @@ def close_election(modeladmin, request, queryset):
             # Get all ballots for this election
             ballots = (
                 Ballot.objects.filter(election=election)
-                .select_related("voter__profile")
+                .select_related("voter__profile__facet_district")
                 .prefetch_related("candidate_votes__nominee", "question_votes")
                 .annotate(
                     num_candidate_votes=Count("candidate_votes"),
@@ -85,7 +85,9 @@ def close_election(modeladmin, request, queryset):
                 ballot.save(update_fields=["had_votes"])
 
             # Store final vote counts for each nominee
-            for nominee in Nominee.objects.filter(election=election):
+            for nominee in Nominee.objects.filter(election=election).select_related(
+                "user__profile__facet_district"
+            ):
                 nominee.final_vote_count = nominee_votes.get(nominee, 0)
 
                 # Get nominee's district to find their district votes
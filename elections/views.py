@@ -279,7 +279,7 @@ def election_nominees(request, election_slug):
     # Fetch the nominees in random order
     nominees = (
         Nominee.objects.filter(id__in=nominee_ids)
-        .select_related("user", "user__profile")
+        .select_related("user", "user__profile__facet_district")
         .prefetch_related("nominations__nominator")
         .order_by("?")  # Random order
     )
@@ -323,7 +323,7 @@ def nominee_detail(request, election_slug, nominee_slug):
             nominations__draft=False,
         )
         .distinct()
-        .select_related("user", "user__profile")
+        .select_related("user", "user__profile__facet_district")
         .prefetch_related("nominations__nominator")
     )
 
@@ -609,7 +609,7 @@ def vote(request, election_slug):
     # Then get the full nominee objects and randomize order
     nominees = (
         Nominee.objects.filter(id__in=eligible_nominee_ids)
-        .select_related("user__profile")
+        .select_related("user__profile__facet_district")
         .order_by("?")  # Random order
     )
 
@@ -776,7 +776,7 @@ def calculate_election_results(election):
     if election_closed:
         # Use stored results from closed election
         ballots = Ballot.objects.filter(election=election, had_votes=True).select_related(
-            "voter__profile"
+            "voter__profile__facet_district"
         )
         total_ballots = ballots.count()
 
@@ -784,7 +784,9 @@ def calculate_election_results(election):
         nominee_votes = {}
         nominee_district_votes = defaultdict(lambda: defaultdict(int))
 
-        for nominee in Nominee.objects.filter(election=election).select_related("user__profile"):
+        for nominee in Nominee.objects.filter(election=election).select_related(
+            "user__profile__facet_district"
+        ):
             nominee_votes[nominee] = nominee.final_vote_count or 0
 
             # Get nominee's district number
@@ -802,8 +804,10 @@ def calculate_election_results(election):
         # Only count ballots that have at least one answer (candidate vote OR question vote)
         ballots = (
             Ballot.objects.filter(election=election)
-            .select_related("voter__profile")
-            .prefetch_related("candidate_votes__nominee__user__profile", "question_votes")
+            .select_related("voter__profile__facet_district")
+            .prefetch_related(
+                "candidate_votes__nominee__user__profile__facet_district", "question_votes"
+            )
             .annotate(
                 num_candidate_votes=Count("candidate_votes"),
                 num_question_votes=Count("question_votes"),
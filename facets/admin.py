@@ -38,11 +38,7 @@ class RegisteredCommunityOrganizationAdmin(FacetAdmin):
 
     def zip_code_names(self, obj):
         return ", ".join(
-            [
-                z.name
-                for z in obj.intersecting_zips.all()
-                if z.mpoly.intersection(obj.mpoly).area / z.mpoly.area > 0.01
-            ]
+            z.name for z in obj.overlapping(ZipCode, min_other_ratio=0.01).only("name")
         )
 
     def zip_codes(self, obj):
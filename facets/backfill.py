@@ -0,0 +1,165 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.contrib.gis.geos import Point
+
+from facets.membership import assign_facets
+from facets.utils import geocode_address, geocode_provider, make_geolocator
+
+# Requests per second each provider allows, when GEOCODE_RATE_LIMIT isn't set
+PROVIDER_RATE_LIMITS = {"google": 40, "nominatim": 1}
+
+
+def _not_city_level(address):
+    # Google falls back to the city itself for addresses it can't place
+    return address.address is not None and not address.address.startswith("Philadelphia")
+
+
+# Geocoded models, with their street address field and the test a result must pass
+GEOCODED_MODELS = {
+    "profiles.Profile": ("street_address", _not_city_level),
+    "campaigns.PetitionSignature": ("postal_address_line_1", lambda address: True),
+}
+
+
+class AsyncRateLimiter:
+    """Spaces acquisitions at least 1/rate seconds apart. A rate of 0 disables limiting."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+@dataclass
+class BackfillProgress:
+    model: str
+    total: int
+    processed: int = 0
+    found: int = 0
+    not_found: int = 0
+    errors: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.processed / elapsed if elapsed else 0
+
+
+def pending_rows(model_label, everything=False):
+    """Rows of a geocoded model with an address, and without a location unless everything."""
+    address_field, _ = GEOCODED_MODELS[model_label]
+    queryset = (
+        apps.get_model(model_label)
+        .objects.exclude(**{f"{address_field}__isnull": True})
+        .exclude(**{address_field: ""})
+    )
+    if not everything:
+        queryset = queryset.filter(location__isnull=True)
+    return queryset
+
+
+def _search_address(row, address_field):
+    return f"{getattr(row, address_field)} {row.zip_code or ''}".strip()
+
+
+async def _geocode(row, address_field, accept, semaphore, limiter, geolocator, progress):
+    async with semaphore:
+        try:
+            address = await geocode_address(
+                _search_address(row, address_field), limiter, geolocator
+            )
+        except Exception:
+            progress.errors += 1
+            return False
+    if address is not None and accept(address):
+        row.location = Point(address.longitude, address.latitude)
+        progress.found += 1
+    else:
+        row.location = None
+        progress.not_found += 1
+    return True
+
+
+def _fetch_chunk(queryset, address_field, after, size):
+    if after is not None:
+        queryset = queryset.filter(pk__gt=after)
+    return list(queryset.order_by("pk").only("pk", address_field, "zip_code", "location")[:size])
+
+
+def _save_chunk(model, rows):
+    model.objects.bulk_update(rows, ["location"])
+    assign_facets(model.objects.filter(pk__in=[row.pk for row in rows]))
+
+
+async def backfill(
+    model_label,
+    everything=False,
+    limit=None,
+    concurrency=None,
+    rate=None,
+    chunk_size=None,
+    on_progress=None,
+):
+    """
+    Geocode rows of a model in chunks, with at most `concurrency` lookups in flight
+    and provider calls spaced to `rate` per second. Each chunk's locations are
+    written with one bulk_update and its facet membership reassigned.
+
+    Rows whose lookup raised keep their current location. Returns the final
+    BackfillProgress, which is also passed to on_progress after every chunk.
+    """
+    address_field, accept = GEOCODED_MODELS[model_label]
+    model = apps.get_model(model_label)
+    concurrency = concurrency or settings.GEOCODE_CONCURRENCY
+    chunk_size = chunk_size or settings.GEOCODE_BACKFILL_CHUNK_SIZE
+    if rate is None:
+        rate = settings.GEOCODE_RATE_LIMIT
+    if rate is None:
+        rate = PROVIDER_RATE_LIMITS[geocode_provider()]
+
+    queryset = pending_rows(model_label, everything)
+    total = await queryset.acount()
+    progress = BackfillProgress(model_label, total if limit is None else min(total, limit))
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = AsyncRateLimiter(rate)
+
+    after = None
+    # One geocoder, and so one HTTP session, for the whole backfill
+    async with make_geolocator() as geolocator:
+        while progress.processed < progress.total:
+            size = min(chunk_size, progress.total - progress.processed)
+            rows = await sync_to_async(_fetch_chunk)(queryset, address_field, after, size)
+            if not rows:
+                break
+            after = rows[-1].pk
+
+            results = await asyncio.gather(
+                *[
+                    _geocode(row, address_field, accept, semaphore, limiter, geolocator, progress)
+                    for row in rows
+                ]
+            )
+            geocoded = [row for row, ok in zip(rows, results) if ok]
+            if geocoded:
+                await sync_to_async(_save_chunk)(model, geocoded)
+
+            progress.processed += len(rows)
+            if on_progress is not None:
+                on_progress(progress)
+    return progress
@@ -0,0 +1,129 @@
+"""
+Compact, memory-mapped copies of the bundled GeoJSON files in facets/data.
+
+Each dataset is compiled once into a directory of WKB geometries (one flat byte
+array plus offsets, as .npy files) and a column-oriented property table. Loading
+memory-maps the arrays, so there is no JSON parsing at runtime and the pages are
+shared through the OS page cache between every process on the host.
+"""
+
+import json
+import os
+import pathlib
+import threading
+
+import numpy
+import shapely
+from shapely.geometry import shape
+
+DATA = pathlib.Path(__file__).parent / "data"
+COMPILED = DATA / "compiled"
+
+# Bump when the compiled layout changes
+FORMAT_VERSION = 1
+
+_datasets = {}
+_lock = threading.Lock()
+
+
+class Dataset:
+    def __init__(self, path):
+        self.path = path
+        self._wkb = numpy.load(path / "wkb.npy", mmap_mode="r")
+        self._offsets = numpy.load(path / "offsets.npy", mmap_mode="r")
+        self._properties = None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def wkb(self, i):
+        return self._wkb[self._offsets[i] : self._offsets[i + 1]].tobytes()
+
+    def geometries(self):
+        """All geometries, as a numpy array of shapely geometries."""
+        return shapely.from_wkb([self.wkb(i) for i in range(len(self))])
+
+    @property
+    def properties(self):
+        """Feature properties as {name: [value per feature]}."""
+        if self._properties is None:
+            with open(self.path / "properties.json") as f:
+                self._properties = json.load(f)
+        return self._properties
+
+    def column(self, name):
+        return self.properties[name]
+
+
+def source_path(name):
+    return DATA / f"{name}.geojson"
+
+
+def compiled_path(name):
+    return COMPILED / name
+
+
+def _manifest(source):
+    stat = source.stat()
+    return {"format": FORMAT_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def is_compiled(name):
+    try:
+        with open(compiled_path(name) / "manifest.json") as f:
+            return json.load(f) == _manifest(source_path(name))
+    except (OSError, ValueError):
+        return False
+
+
+def _write(path, write):
+    # Write alongside and rename, so readers never see a partial file
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def compile_dataset(name):
+    """Compile facets/data/<name>.geojson. Returns the number of features."""
+    source = source_path(name)
+    with open(source) as f:
+        features = json.load(f)["features"]
+
+    wkbs = [shapely.to_wkb(shape(f["geometry"])) for f in features]
+    offsets = numpy.zeros(len(wkbs) + 1, dtype=numpy.int64)
+    offsets[1:] = numpy.cumsum([len(wkb) for wkb in wkbs])
+    wkb = numpy.frombuffer(b"".join(wkbs), dtype=numpy.uint8)
+
+    columns = {}
+    for i, feature in enumerate(features):
+        for key, value in feature["properties"].items():
+            columns.setdefault(key, [None] * len(features))[i] = value
+
+    path = compiled_path(name)
+    path.mkdir(parents=True, exist_ok=True)
+    # The manifest goes last, marking the dataset as complete
+    (path / "manifest.json").unlink(missing_ok=True)
+    _write(path / "wkb.npy", lambda f: numpy.save(f, wkb))
+    _write(path / "offsets.npy", lambda f: numpy.save(f, offsets))
+    _write(path / "properties.json", lambda f: f.write(json.dumps(columns).encode()))
+    _write(path / "manifest.json", lambda f: f.write(json.dumps(_manifest(source)).encode()))
+    return len(features)
+
+
+def bundled_datasets():
+    return sorted(path.stem for path in DATA.glob("*.geojson"))
+
+
+def get_dataset(name):
+    """
+    Process-wide Dataset for facets/data/<name>.geojson, compiling it first if it
+    hasn't been, or the source has changed since.
+    """
+    if name not in _datasets:
+        with _lock:
+            if name not in _datasets:
+                if not is_compiled(name):
+                    compile_dataset(name)
+                _datasets[name] = Dataset(compiled_path(name))
+    return _datasets[name]
@@ -0,0 +1,99 @@
+import threading
+
+import numpy
+import shapely
+from shapely.geometry import shape
+
+from facets.datasets import get_dataset
+
+DIVISIONS = "Political_Divisions"
+POLLING_PLACES = "polling_places"
+
+_index = None
+_lock = threading.Lock()
+
+
+class DivisionIndex:
+    """
+    Point lookups against the political divisions and their polling places.
+
+    Division polygons are prepared and held in an STRtree, so a lookup only tests
+    the few polygons whose bounding box contains the point. Where divisions
+    overlap, the first one in the source file wins, as with a linear scan.
+    """
+
+    def __init__(self, polygons, division_nums, polling_places):
+        """
+        polygons and division_nums are parallel sequences of division polygons and
+        DIVISION_NUMs; polling_places is an iterable of (ward, division, place).
+        """
+        self.polygons = numpy.asarray(polygons)
+        shapely.prepare(self.polygons)
+        self.tree = shapely.STRtree(self.polygons)
+        self.wards_divisions = [split_division_num(num) for num in division_nums]
+
+        self.polling_places = {}
+        for ward, division, place in polling_places:
+            self.polling_places.setdefault((ward, division), place)
+
+    @classmethod
+    def from_geojson(cls, divisions, polling_places):
+        return cls(
+            [shape(f["geometry"]) for f in divisions["features"]],
+            [f["properties"]["DIVISION_NUM"] for f in divisions["features"]],
+            [
+                (
+                    f["properties"]["ward"],
+                    f["properties"]["division"],
+                    f"{f['properties']['placename']} - {f['properties']['street_address']}",
+                )
+                for f in polling_places["features"]
+            ],
+        )
+
+    @classmethod
+    def from_datasets(cls):
+        divisions = get_dataset(DIVISIONS)
+        polling_places = get_dataset(POLLING_PLACES)
+        return cls(
+            divisions.geometries(),
+            divisions.column("DIVISION_NUM"),
+            [
+                (ward, division, f"{placename} - {street_address}")
+                for ward, division, placename, street_address in zip(
+                    polling_places.column("ward"),
+                    polling_places.column("division"),
+                    polling_places.column("placename"),
+                    polling_places.column("street_address"),
+                )
+            ],
+        )
+
+    def ward_division(self, longitude, latitude):
+        """(ward, division) containing a point, or (None, None)."""
+        point = shapely.Point(longitude, latitude)
+        candidates = numpy.sort(self.tree.query(point))
+        if len(candidates):
+            hits = candidates[shapely.contains_xy(self.polygons[candidates], longitude, latitude)]
+            if len(hits):
+                return self.wards_divisions[hits[0]]
+        return None, None
+
+    def polling_place(self, ward, division):
+        return self.polling_places.get((ward, division))
+
+
+def split_division_num(division_num):
+    """Split a DIVISION_NUM like "5815" into (ward, division) integers."""
+    ward, division = [int(division_num[i : i + 2]) for i in range(0, len(division_num), 2)]
+    return ward, division
+
+
+def get_division_index():
+    """Process-wide DivisionIndex, built from the compiled bundled data on first use."""
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = DivisionIndex.from_datasets()
+    return _index
@@ -0,0 +1,32 @@
+import hashlib
+
+# Simplification tolerances in degrees (0.0001 degrees is ~10m here)
+SIMPLIFY_TOLERANCES = {
+    "low": 0.0005,
+    "medium": 0.0001,
+    "high": 0.00002,
+}
+
+# Highest map zoom each level is served for; beyond the last, full resolution
+ZOOM_LEVELS = ((12, "low"), (15, "medium"), (17, "high"))
+DEFAULT_LEVEL = "medium"
+FULL = "full"
+
+
+def level_for_zoom(zoom):
+    for max_zoom, level in ZOOM_LEVELS:
+        if zoom <= max_zoom:
+            return level
+    return FULL
+
+
+def simplify(mpoly):
+    """GeoJSON for a geometry simplified at each tolerance, as {level: geojson}."""
+    return {
+        level: mpoly.simplify(tolerance, preserve_topology=True).geojson
+        for level, tolerance in SIMPLIFY_TOLERANCES.items()
+    }
+
+
+def geometry_hash(mpoly):
+    return hashlib.sha256(bytes(mpoly.wkb)).hexdigest()
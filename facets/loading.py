@@ -0,0 +1,142 @@
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
+from django.db import transaction
+
+from facets.geometry import geometry_hash
+from facets.locator import bump_boundaries_version
+from facets.membership import reassign_facets
+from facets.overlaps import rebuild_facet_overlaps
+
+_decoder = json.JSONDecoder()
+
+
+def iter_geojson_features(path, read_size=64 * 1024):
+    """
+    Yield the features of a GeoJSON FeatureCollection one at a time, without
+    parsing the whole file into memory.
+    """
+    with open(path) as f:
+        buffer = ""
+        while '"features"' not in buffer:
+            chunk = f.read(read_size)
+            if not chunk:
+                return
+            buffer += chunk
+        buffer = buffer[buffer.index('"features"') :]
+        while "[" not in buffer:
+            chunk = f.read(read_size)
+            if not chunk:
+                raise ValueError(f'{path}: no features array after "features"')
+            buffer += chunk
+        buffer = buffer[buffer.index("[") + 1 :]
+
+        eof = False
+        while True:
+            buffer = buffer.lstrip().lstrip(",").lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                feature, end = _decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(read_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield feature
+            buffer = buffer[end:]
+
+
+def multipolygon(geometry):
+    """A GEOS MultiPolygon from a GeoJSON geometry dict or a GEOS geometry."""
+    if isinstance(geometry, dict):
+        # GeoJSON coordinates are always WGS84
+        geometry = GEOSGeometry(json.dumps(geometry), srid=4326)
+    if geometry.geom_type == "Polygon":
+        geometry = MultiPolygon(geometry)
+    return geometry
+
+
+@dataclass
+class BoundaryPlan:
+    """Changes needed to make a Facet model's rows match a boundary dataset."""
+
+    model: type
+    create: list = field(default_factory=list)
+    # (existing row, {field: new value}) for rows whose boundary or data changed
+    update: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    stale: list = field(default_factory=list)
+
+
+def plan_boundaries(model, boundaries):
+    """
+    Diff boundaries, an iterable of {"name", "mpoly", "properties", ...} dicts,
+    against a Facet model's rows by name. Geometries are compared by hash, so
+    existing boundaries aren't loaded.
+    """
+    existing = {}
+    for facet in model.objects.order_by("pk").defer("mpoly", "simplified_geojson"):
+        existing.setdefault(facet.name, facet)
+
+    incoming = {}
+    for boundary in boundaries:
+        incoming[boundary["name"]] = {**boundary, "mpoly": multipolygon(boundary["mpoly"])}
+
+    plan = BoundaryPlan(model)
+    for name, values in incoming.items():
+        facet = existing.pop(name, None)
+        if facet is None:
+            plan.create.append(model(**values))
+            continue
+        changes = {
+            key: value
+            for key, value in values.items()
+            if key != "mpoly" and getattr(facet, key) != value
+        }
+        if geometry_hash(values["mpoly"]) != facet.geometry_hash:
+            changes["mpoly"] = values["mpoly"]
+        if changes:
+            plan.update.append((facet, changes))
+        else:
+            plan.unchanged.append(facet)
+    plan.stale = list(existing.values())
+    return plan
+
+
+def apply_boundaries(plan, delete_stale=False, batch_size=100):
+    """
+    Apply a BoundaryPlan in one transaction, then invalidate facet locators and
+    recompute facet overlaps and stored facet membership if anything changed.
+    """
+    with transaction.atomic():
+        for facet in plan.create:
+            facet.update_simplified()
+        plan.model.objects.bulk_create(plan.create, batch_size=batch_size)
+
+        # Rows are grouped by the fields they change, since deferred fields can't be
+        # written without loading them
+        by_fields = defaultdict(list)
+        for facet, changes in plan.update:
+            for key, value in changes.items():
+                setattr(facet, key, value)
+            fields = set(changes)
+            if "mpoly" in changes:
+                facet.update_simplified()
+                fields.update(["simplified_geojson", "geometry_hash"])
+            by_fields[tuple(sorted(fields))].append(facet)
+        for fields, facets in by_fields.items():
+            plan.model.objects.bulk_update(facets, fields, batch_size=batch_size)
+
+        if delete_stale and plan.stale:
+            plan.model.objects.filter(pk__in=[facet.pk for facet in plan.stale]).delete()
+
+    if plan.create or plan.update or (delete_stale and plan.stale):
+        bump_boundaries_version()
+        rebuild_facet_overlaps()
+        return reassign_facets()
+    return {}
@@ -0,0 +1,162 @@
+"""
+In-process point-in-facet lookups.
+
+Every facet type's boundaries are held as prepared shapely geometries in an
+STRtree, so "which facets contain this point?" is answered without a query.
+Single lookups are memoized in an LRU keyed by coordinates snapped to
+SNAP_DIGITS decimal places (~10cm), and locate_many classifies arrays of points
+in one vectorized pass.
+
+Each process builds its locator on first use and rebuilds it when the shared
+boundaries version changes, which happens whenever facet boundaries are saved,
+loaded or deleted.
+"""
+
+import functools
+import threading
+import time
+
+import numpy
+import shapely
+
+from facets.models import facet_models
+from pbaabp.counters import get_counters, incr
+
+SNAP_DIGITS = 6
+LRU_SIZE = 4096
+# Seconds between checks of the shared boundaries version
+VERSION_CHECK_INTERVAL = 30
+
+_locator = None
+_checked_at = 0
+_lock = threading.Lock()
+
+
+def boundaries_version():
+    return get_counters("facets", ["boundaries_version"])["boundaries_version"]
+
+
+def bump_boundaries_version():
+    """Invalidate every process's locator, after facet boundaries change."""
+    incr("facets", "boundaries_version")
+    invalidate_locator()
+
+
+def _coordinates(point):
+    if isinstance(point, (tuple, list)):
+        return point
+    return point.x, point.y
+
+
+class FacetIndex:
+    """Prepared boundaries of one facet type, in primary key order."""
+
+    def __init__(self, pks, geometries):
+        self.pks = list(pks)
+        self.geometries = numpy.asarray(geometries)
+        shapely.prepare(self.geometries)
+        self.tree = shapely.STRtree(self.geometries)
+
+    def containing(self, longitude, latitude):
+        """Primary keys of the facets containing a point, in primary key order."""
+        candidates = numpy.sort(self.tree.query(shapely.Point(longitude, latitude)))
+        if not len(candidates):
+            return ()
+        hits = candidates[shapely.contains_xy(self.geometries[candidates], longitude, latitude)]
+        return tuple(self.pks[i] for i in hits)
+
+    def containing_many(self, longitudes, latitudes):
+        """Primary keys of the facets containing each of arrays of points."""
+        points, candidates = self.tree.query(shapely.points(longitudes, latitudes))
+        inside = shapely.contains_xy(
+            self.geometries[candidates], longitudes[points], latitudes[points]
+        )
+        results = [[] for _ in range(len(longitudes))]
+        # Sorting by point then facet keeps each point's facets in primary key order
+        order = numpy.lexsort((candidates[inside], points[inside]))
+        for point, candidate in zip(points[inside][order], candidates[inside][order]):
+            results[point].append(self.pks[candidate])
+        return [tuple(pks) for pks in results]
+
+
+class FacetLocator:
+    def __init__(self, indexes, version=None, lru_size=LRU_SIZE):
+        """indexes maps each facet model to its FacetIndex."""
+        self.indexes = indexes
+        self.version = version
+        self._locate = functools.lru_cache(maxsize=lru_size)(self._locate_snapped)
+
+    @classmethod
+    def from_database(cls, models=None, **kwargs):
+        indexes = {}
+        for model in models or facet_models():
+            rows = model.objects.order_by("pk").values_list("pk", "mpoly")
+            pks, geometries = [], []
+            for pk, mpoly in rows:
+                pks.append(pk)
+                geometries.append(shapely.from_wkb(bytes(mpoly.wkb)))
+            indexes[model] = FacetIndex(pks, geometries)
+        return cls(indexes, **kwargs)
+
+    def _locate_snapped(self, longitude, latitude):
+        return {
+            model: index.containing(longitude, latitude) for model, index in self.indexes.items()
+        }
+
+    def locate(self, point):
+        """
+        {facet model: primary keys of the facets containing it} for a Point or
+        (longitude, latitude).
+        """
+        longitude, latitude = _coordinates(point)
+        return self._locate(round(longitude, SNAP_DIGITS), round(latitude, SNAP_DIGITS))
+
+    def containing(self, model, point):
+        """Primary keys of the facets of one type containing a point."""
+        if point is None:
+            return ()
+        return self.locate(point)[model]
+
+    def first(self, model, point):
+        """Primary key of the first facet of a type containing a point, or None."""
+        pks = self.containing(model, point)
+        return pks[0] if pks else None
+
+    def locate_many(self, model, points):
+        """
+        Primary keys of the facets of one type containing each of a sequence of
+        Points or (longitude, latitude) pairs. Bypasses the LRU, but snaps the same
+        way, so results always agree with locate.
+        """
+        if not len(points):
+            return []
+        coordinates = numpy.array([_coordinates(point) for point in points], dtype=float)
+        coordinates = numpy.round(coordinates, SNAP_DIGITS)
+        return self.indexes[model].containing_many(coordinates[:, 0], coordinates[:, 1])
+
+    def cache_info(self):
+        return self._locate.cache_info()
+
+
+def get_locator():
+    """
+    Process-wide FacetLocator, rebuilt when the boundaries version has changed.
+    The version is checked at most every VERSION_CHECK_INTERVAL seconds.
+    """
+    global _locator, _checked_at
+    now = time.monotonic()
+    if _locator is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+        return _locator
+    with _lock:
+        version = boundaries_version()
+        if _locator is None or _locator.version != version:
+            _locator = FacetLocator.from_database(version=version)
+        _checked_at = now
+    return _locator
+
+
+def invalidate_locator():
+    """Drop this process's locator, so the next lookup rebuilds it."""
+    global _locator
+    with _lock:
+        _locator = None
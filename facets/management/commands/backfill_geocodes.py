@@ -0,0 +1,52 @@
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+
+from facets.backfill import GEOCODED_MODELS, backfill
+
+
+class Command(BaseCommand):
+    help = "Geocode profiles and petition signatures in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            choices=list(GEOCODED_MODELS),
+            action="append",
+            help="Model to geocode, may be repeated (default: all)",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-geocode rows that already have a location, e.g. after a provider change",
+        )
+        parser.add_argument("--limit", type=int, help="Maximum rows to geocode per model")
+        parser.add_argument("--concurrency", type=int, help="Lookups in flight at once")
+        parser.add_argument(
+            "--rate", type=float, help="Provider requests per second (0 for no limit)"
+        )
+        parser.add_argument("--chunk-size", type=int, help="Rows fetched and saved per chunk")
+
+    def handle(self, *args, **options):
+        for model_label in options["model"] or GEOCODED_MODELS:
+            progress = async_to_sync(backfill)(
+                model_label,
+                everything=options["all"],
+                limit=options["limit"],
+                concurrency=options["concurrency"],
+                rate=options["rate"],
+                chunk_size=options["chunk_size"],
+                on_progress=self.report,
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model_label}: geocoded {progress.found}, not found {progress.not_found}, "
+                    f"errors {progress.errors} ({progress.rate:.1f} rows/s)"
+                )
+            )
+
+    def report(self, progress):
+        self.stdout.write(
+            f"{progress.model}: {progress.processed}/{progress.total} "
+            f"({progress.found} found, {progress.not_found} not found, "
+            f"{progress.errors} errors, {progress.rate:.1f} rows/s)"
+        )
@@ -0,0 +1,82 @@
+import json
+import random
+import time
+
+import shapely
+from django.core.management.base import BaseCommand
+from shapely.geometry import Point, shape
+
+from facets.datasets import source_path
+from facets.divisions import (
+    DIVISIONS,
+    POLLING_PLACES,
+    DivisionIndex,
+    split_division_num,
+)
+
+
+def linear_lookup(divisions, polling_places, longitude, latitude):
+    """Division and polling place lookup by scanning every feature."""
+    point = Point(longitude, latitude)
+    ward, division = None, None
+    for feature in divisions["features"]:
+        if shape(feature["geometry"]).contains(point):
+            ward, division = split_division_num(feature["properties"]["DIVISION_NUM"])
+            break
+
+    for feature in polling_places["features"]:
+        properties = feature["properties"]
+        if properties["ward"] == ward and properties["division"] == division:
+            return ward, division, f"{properties['placename']} - {properties['street_address']}"
+    return ward, division, None
+
+
+class Command(BaseCommand):
+    help = "Compare division/polling place lookup latency for a linear scan and the index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--points",
+            type=int,
+            default=200,
+            help="Random points to look up (default: 200)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with open(source_path(DIVISIONS)) as f:
+            divisions = json.load(f)
+        with open(source_path(POLLING_PLACES)) as f:
+            polling_places = json.load(f)
+
+        start = time.perf_counter()
+        index = DivisionIndex.from_geojson(divisions, polling_places)
+        self.stdout.write(f"Index built in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        rng = random.Random(options["seed"])
+        min_x, min_y, max_x, max_y = shapely.total_bounds(index.polygons)
+        points = [
+            (rng.uniform(min_x, max_x), rng.uniform(min_y, max_y))
+            for _ in range(options["points"])
+        ]
+
+        start = time.perf_counter()
+        expected = [linear_lookup(divisions, polling_places, *point) for point in points]
+        linear = (time.perf_counter() - start) / len(points)
+
+        start = time.perf_counter()
+        results = []
+        for point in points:
+            ward, division = index.ward_division(*point)
+            results.append((ward, division, index.polling_place(ward, division)))
+        indexed = (time.perf_counter() - start) / len(points)
+
+        mismatches = sum(a != b for a, b in zip(expected, results))
+        found = sum(result[0] is not None for result in results)
+        self.stdout.write(f"{len(points)} points, {found} inside a division")
+        self.stdout.write(f"Linear scan: {linear * 1e6:,.1f}µs per lookup")
+        self.stdout.write(f"Index:       {indexed * 1e6:,.1f}µs per lookup")
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f"{mismatches} lookups differ"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All lookups match"))
@@ -0,0 +1,82 @@
+import random
+import time
+
+import shapely
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand
+
+from facets.locator import SNAP_DIGITS, FacetLocator
+from facets.models import District, facet_models
+
+
+def postgis_locate(point):
+    return {
+        model: tuple(
+            model.objects.filter(mpoly__contains=point).order_by("pk").values_list("pk", flat=True)
+        )
+        for model in facet_models()
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare point-in-facet lookup latency for PostGIS queries and the facet locator"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--points",
+            type=int,
+            default=500,
+            help="Random points to look up (default: 500)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        locator = FacetLocator.from_database()
+        self.stdout.write(f"Locator built in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        rng = random.Random(options["seed"])
+        min_x, min_y, max_x, max_y = shapely.total_bounds(locator.indexes[District].geometries)
+        # Points are pre-snapped, so results can be compared exactly with PostGIS
+        points = [
+            Point(
+                round(rng.uniform(min_x, max_x), SNAP_DIGITS),
+                round(rng.uniform(min_y, max_y), SNAP_DIGITS),
+                srid=4326,
+            )
+            for _ in range(options["points"])
+        ]
+
+        start = time.perf_counter()
+        expected = [postgis_locate(point) for point in points]
+        postgis = (time.perf_counter() - start) / len(points)
+
+        start = time.perf_counter()
+        results = [locator.locate(point) for point in points]
+        cold = (time.perf_counter() - start) / len(points)
+
+        start = time.perf_counter()
+        for point in points:
+            locator.locate(point)
+        warm = (time.perf_counter() - start) / len(points)
+
+        start = time.perf_counter()
+        bulk = {model: locator.locate_many(model, points) for model in locator.indexes}
+        bulk_time = (time.perf_counter() - start) / len(points)
+
+        mismatches = sum(a != b for a, b in zip(expected, results))
+        mismatches += sum(
+            expected[i][model] != pks
+            for model, per_point in bulk.items()
+            for i, pks in enumerate(per_point)
+        )
+        found = sum(bool(result[District]) for result in results)
+        self.stdout.write(f"{len(points)} points, {found} inside a district")
+        self.stdout.write(f"PostGIS:         {postgis * 1e6:,.1f}µs per point, all facet types")
+        self.stdout.write(f"Locator (cold):  {cold * 1e6:,.1f}µs per point")
+        self.stdout.write(f"Locator (LRU):   {warm * 1e6:,.1f}µs per point")
+        self.stdout.write(f"Locator (bulk):  {bulk_time * 1e6:,.1f}µs per point")
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f"{mismatches} lookups differ"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All lookups match"))
@@ -0,0 +1,77 @@
+import json
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from facets.datasets import bundled_datasets, compile_dataset, is_compiled
+
+# Each case runs in a fresh interpreter, so RSS reflects only what it loads
+SCRIPT = """
+import json, os, sys, time
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+import numpy, shapely
+from facets.datasets import get_dataset, source_path
+from facets.divisions import DIVISIONS, POLLING_PLACES, DivisionIndex
+
+case = sys.argv[1]
+before = rss()
+start = time.perf_counter()
+if case == "import":
+    for name in (DIVISIONS, POLLING_PLACES):
+        with open(source_path(name)) as f:
+            json.load(f)
+elif case == "geojson":
+    data = []
+    for name in (DIVISIONS, POLLING_PLACES):
+        with open(source_path(name)) as f:
+            data.append(json.load(f))
+    index = DivisionIndex.from_geojson(*data)
+elif case == "compiled":
+    index = DivisionIndex.from_datasets()
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "rss": rss() - before}))
+"""
+
+CASES = (
+    ("import", "Parse GeoJSON at import (previous behaviour)"),
+    ("geojson", "Build division index from GeoJSON"),
+    ("compiled", "Build division index from compiled datasets"),
+)
+
+
+class Command(BaseCommand):
+    help = "Measure load time and RSS for the bundled GeoJSON, parsed vs compiled"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3, help="Runs per case (default: 3)")
+
+    def handle(self, *args, **options):
+        for name in bundled_datasets():
+            if not is_compiled(name):
+                compile_dataset(name)
+
+        for case, label in CASES:
+            results = []
+            for _ in range(options["runs"]):
+                output = subprocess.run(
+                    [sys.executable, "-c", SCRIPT, case],
+                    cwd=settings.BASE_DIR,
+                    capture_output=True,
+                    check=True,
+                    text=True,
+                ).stdout
+                results.append(json.loads(output))
+            ms = min(result["ms"] for result in results)
+            rss = min(result["rss"] for result in results) / 1024 / 1024
+            self.stdout.write(f"{label}: {ms:,.1f}ms, +{rss:,.1f}MB RSS")
+
+        self.stdout.write(
+            "Workers that never search addresses now pay nothing at import. Compiled "
+            "datasets are memory-mapped, so their pages are shared between processes."
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from facets.datasets import bundled_datasets, compile_dataset, is_compiled
+
+
+class Command(BaseCommand):
+    help = "Compile the bundled facets/data GeoJSON files into memory-mappable datasets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recompile datasets that are already up to date",
+        )
+
+    def handle(self, *args, **options):
+        for name in bundled_datasets():
+            if is_compiled(name) and not options["force"]:
+                self.stdout.write(f"{name} is up to date")
+                continue
+            count = compile_dataset(name)
+            self.stdout.write(self.style.SUCCESS(f"Compiled {name} ({count} features)"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from facets.utils import geocode_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show geocoding cache hit/miss counters"
+
+    def handle(self, *args, **options):
+        counts = geocode_cache_stats()
+        for kind, label in (("geocode", "Forward"), ("reverse", "Reverse")):
+            self.stdout.write(
+                f"{label}: {counts[f'{kind}_hits']} hits, {counts[f'{kind}_misses']} misses "
+                f"({counts[f'{kind}_hit_rate']:.1%} hit rate)"
+            )
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from facets.loading import apply_boundaries, iter_geojson_features, plan_boundaries
+from facets.models import facet_models
+
+MODELS = {model._meta.model_name: model for model in facet_models()}
+
+
+class Command(BaseCommand):
+    help = "Create, update and optionally delete facets to match a GeoJSON file of boundaries"
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", choices=sorted(MODELS), help="Facet type to load")
+        parser.add_argument("path", help="GeoJSON FeatureCollection to load")
+        parser.add_argument(
+            "--name",
+            required=True,
+            help='Name for each facet, formatted from its properties, e.g. "District {DISTRICT}"',
+        )
+        parser.add_argument(
+            "--delete-stale",
+            action="store_true",
+            help="Delete facets not present in the file",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show what would change without making changes",
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        plan = plan_boundaries(
+            MODELS[options["model"]],
+            (
+                {
+                    "name": options["name"].format(**feature["properties"]),
+                    "mpoly": feature["geometry"],
+                    "properties": feature["properties"],
+                }
+                for feature in iter_geojson_features(options["path"])
+            ),
+        )
+        stale = len(plan.stale) if options["delete_stale"] else 0
+        self.stdout.write(
+            f"{len(plan.create)} to create, {len(plan.update)} to update, "
+            f"{len(plan.unchanged)} unchanged, {stale} to delete"
+        )
+        if options["dry_run"]:
+            return
+
+        for label, count in apply_boundaries(plan, delete_stale=options["delete_stale"]).items():
+            self.stdout.write(f"Reassigned facets for {count} {label} rows")
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.monotonic() - start:.1f}s"))
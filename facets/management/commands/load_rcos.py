@@ -1,9 +1,8 @@
-import json
 import pathlib
 
-from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
 from django.core.management.base import BaseCommand
 
+from facets.loading import apply_boundaries, iter_geojson_features, plan_boundaries
 from facets.models import RegisteredCommunityOrganization
 
 
@@ -27,78 +26,53 @@ class Command(BaseCommand):
         delete_stale = options["delete_stale"]
         geojson_path = pathlib.Path(__file__).parent.parent.parent / "data" / "Zoning_RCO.geojson"
 
-        with open(geojson_path) as f:
-            data = json.load(f)
-
         if dry_run:
             self.stdout.write(self.style.WARNING("DRY RUN - no changes will be made"))
 
-        created_count = 0
-        updated_count = 0
-        file_names = set()
-
-        for feature in data["features"]:
-            props = feature["properties"]
-            name = props["organization_name"]
-            file_names.add(name)
-
-            lni_id = props.get("lni_id")
-            existing = RegisteredCommunityOrganization.objects.filter(name=name).first()
+        plan = plan_boundaries(
+            RegisteredCommunityOrganization,
+            (
+                {
+                    "name": feature["properties"]["organization_name"],
+                    "mpoly": feature["geometry"],
+                    "properties": feature["properties"],
+                }
+                for feature in iter_geojson_features(geojson_path)
+            ),
+        )
 
-            if existing and existing.properties.get("lni_id") != lni_id:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"lni_id mismatch for {name}: "
-                        f"db={existing.properties.get('lni_id')}, file={lni_id}"
+        for rco, changes in plan.update:
+            if "properties" in changes:
+                lni_id = changes["properties"].get("lni_id")
+                if rco.properties.get("lni_id") != lni_id:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"lni_id mismatch for {rco.name}: "
+                            f"db={rco.properties.get('lni_id')}, file={lni_id}"
+                        )
                     )
-                )
-
-            if dry_run:
-                action = "Would update" if existing else "Would create"
-                if existing:
-                    updated_count += 1
-                else:
-                    created_count += 1
-                self.stdout.write(f"{action} {name}")
-                continue
-
-            geojson = json.dumps(feature["geometry"])
-            geos_geom = GEOSGeometry(geojson)
-
-            if geos_geom.geom_type == "Polygon":
-                geos_geom = MultiPolygon(geos_geom)
 
-            rco, created = RegisteredCommunityOrganization.objects.update_or_create(
-                name=name,
-                defaults={
-                    "mpoly": geos_geom,
-                    "properties": props,
-                },
-            )
-
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
-
-            action = "Created" if created else "Updated"
-            self.stdout.write(f"{action} {rco.name}")
-
-        deleted_count = 0
+        if dry_run:
+            created, updated, deleted = "Would create", "Would update", "Would delete"
+        else:
+            created, updated, deleted = "Created", "Updated", "Deleted"
+        for rco in plan.create:
+            self.stdout.write(f"{created} {rco.name}")
+        for rco, _ in plan.update:
+            self.stdout.write(f"{updated} {rco.name}")
         if delete_stale:
-            stale = RegisteredCommunityOrganization.objects.exclude(name__in=file_names)
-            for rco in stale:
-                if dry_run:
-                    self.stdout.write(f"Would delete {rco.name}")
-                else:
-                    self.stdout.write(f"Deleted {rco.name}")
-                deleted_count += 1
-            if not dry_run:
-                stale.delete()
+            for rco in plan.stale:
+                self.stdout.write(f"{deleted} {rco.name}")
+
+        if not dry_run:
+            reassigned = apply_boundaries(plan, delete_stale=delete_stale)
+            for label, count in reassigned.items():
+                self.stdout.write(f"Reassigned facets for {count} {label} rows")
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Done: {created_count} created, {updated_count} updated, "
-                f"{deleted_count} deleted"
+                f"Done: {len(plan.create)} created, {len(plan.update)} updated, "
+                f"{len(plan.unchanged)} unchanged, "
+                f"{len(plan.stale) if delete_stale else 0} deleted"
             )
         )
@@ -1,12 +1,11 @@
-import json
 import pathlib
 from collections import defaultdict
 
-from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
 from django.core.management.base import BaseCommand
 from shapely import union_all
 from shapely.geometry import mapping, shape
 
+from facets.loading import apply_boundaries, iter_geojson_features, plan_boundaries
 from facets.models import Ward
 
 
@@ -18,33 +17,30 @@ class Command(BaseCommand):
             pathlib.Path(__file__).parent.parent.parent / "data" / "Political_Divisions.geojson"
         )
 
-        with open(geojson_path) as f:
-            data = json.load(f)
-
         divisions_by_ward = defaultdict(list)
-        for feature in data["features"]:
+        for feature in iter_geojson_features(geojson_path):
             ward_num = feature["properties"]["DIVISION_NUM"][:2]
             divisions_by_ward[ward_num].append(shape(feature["geometry"]))
 
-        for ward_num in sorted(divisions_by_ward.keys(), key=int):
-            divisions = divisions_by_ward[ward_num]
-            merged = union_all(divisions)
-
-            geojson = json.dumps(mapping(merged))
-            geos_geom = GEOSGeometry(geojson)
-
-            if geos_geom.geom_type == "Polygon":
-                geos_geom = MultiPolygon(geos_geom)
-
-            ward, created = Ward.objects.update_or_create(
-                name=f"Ward {int(ward_num)}",
-                defaults={
-                    "mpoly": geos_geom,
+        plan = plan_boundaries(
+            Ward,
+            (
+                {
+                    "name": f"Ward {int(ward_num)}",
+                    "mpoly": mapping(union_all(divisions_by_ward[ward_num])),
                     "properties": {"ward_number": int(ward_num)},
-                },
-            )
+                }
+                for ward_num in sorted(divisions_by_ward.keys(), key=int)
+            ),
+        )
+        reassigned = apply_boundaries(plan)
 
-            action = "Created" if created else "Updated"
-            self.stdout.write(f"{action} {ward.name}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {len(divisions_by_ward)} wards: {len(plan.create)} created, "
+                f"{len(plan.update)} updated, {len(plan.unchanged)} unchanged"
+            )
+        )
 
-        self.stdout.write(self.style.SUCCESS(f"Loaded {len(divisions_by_ward)} wards"))
+        for label, count in reassigned.items():
+            self.stdout.write(f"Reassigned facets for {count} {label} rows")
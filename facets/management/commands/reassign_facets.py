@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from facets.membership import reassign_facets
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored facet membership of profiles and petition signatures"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only-missing",
+            action="store_true",
+            help="Only assign rows that have never been assigned",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Rows to update per query (default: 2000)",
+        )
+
+    def handle(self, *args, **options):
+        counts = reassign_facets(
+            only_missing=options["only_missing"], batch_size=options["batch_size"]
+        )
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count} rows assigned")
+        self.stdout.write(self.style.SUCCESS("Done"))
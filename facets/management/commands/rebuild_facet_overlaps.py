@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from facets.overlaps import rebuild_facet_overlaps
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed overlaps between facet boundaries"
+
+    def handle(self, *args, **options):
+        count = rebuild_facet_overlaps()
+        self.stdout.write(self.style.SUCCESS(f"Stored {count} facet overlaps"))
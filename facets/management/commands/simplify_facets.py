@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from facets.models import facet_models
+
+
+class Command(BaseCommand):
+    help = "Regenerate simplified map GeoJSON for facets whose boundaries have changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate every facet, not just changed ones",
+        )
+
+    def handle(self, *args, **options):
+        for model in facet_models():
+            changed = []
+            for facet in model.objects.only("pk", "mpoly", "simplified_geojson", "geometry_hash"):
+                if options["force"]:
+                    facet.geometry_hash = ""
+                previous = facet.geometry_hash
+                facet.update_simplified()
+                if facet.geometry_hash != previous:
+                    changed.append(facet)
+            model.objects.bulk_update(
+                changed, ["simplified_geojson", "geometry_hash"], batch_size=100
+            )
+            self.stdout.write(f"Simplified {len(changed)} {model._meta.verbose_name_plural}")
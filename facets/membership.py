@@ -0,0 +1,67 @@
+from django.apps import apps
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from facets.models import (
+    District,
+    FacetMembership,
+    RegisteredCommunityOrganization,
+    StateHouseDistrict,
+    StateSenateDistrict,
+    Ward,
+    ZipCode,
+)
+from facets.reports import bump_dataset_version
+
+MEMBERSHIP_FACETS = {
+    "facet_district": District,
+    "facet_ward": Ward,
+    "facet_zip_code": ZipCode,
+    "facet_state_house_district": StateHouseDistrict,
+    "facet_state_senate_district": StateSenateDistrict,
+}
+
+
+def membership_models():
+    return [model for model in apps.get_models() if issubclass(model, FacetMembership)]
+
+
+def _containing(facet_model):
+    return facet_model.objects.filter(mpoly__contains=OuterRef("location")).order_by("pk")
+
+
+def assign_facets(queryset):
+    """
+    Store the facets containing each row's location with a single UPDATE, letting
+    PostGIS do the point-in-polygon work. Returns the number of rows updated.
+    """
+    updates = {
+        field: Subquery(_containing(facet_model).values("pk")[:1])
+        for field, facet_model in MEMBERSHIP_FACETS.items()
+    }
+    updates["facet_rco_ids"] = ArraySubquery(
+        _containing(RegisteredCommunityOrganization).values("pk")
+    )
+    updated = queryset.update(**updates, facets_assigned_at=timezone.now())
+    bump_dataset_version()
+    return updated
+
+
+def reassign_facets(models=None, only_missing=False, batch_size=2000):
+    """
+    Recompute stored facet membership for every row of each membership model,
+    in batches. Returns {model label: rows updated}.
+    """
+    counts = {}
+    for model in models or membership_models():
+        queryset = model.objects.all()
+        if only_missing:
+            queryset = queryset.filter(facets_assigned_at__isnull=True)
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True))
+
+        counts[model._meta.label] = 0
+        for start in range(0, len(pks), batch_size):
+            batch = model.objects.filter(pk__in=pks[start : start + batch_size])
+            counts[model._meta.label] += assign_facets(batch)
+    return counts
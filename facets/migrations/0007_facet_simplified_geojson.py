@@ -0,0 +1,73 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("facets", "0006_ward"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="district",
+            name="geometry_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="district",
+            name="simplified_geojson",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="registeredcommunityorganization",
+            name="geometry_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="registeredcommunityorganization",
+            name="simplified_geojson",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="statehousedistrict",
+            name="geometry_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="statehousedistrict",
+            name="simplified_geojson",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="statesenatedistrict",
+            name="geometry_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="statesenatedistrict",
+            name="simplified_geojson",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="ward",
+            name="geometry_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="ward",
+            name="simplified_geojson",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="zipcode",
+            name="geometry_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="zipcode",
+            name="simplified_geojson",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
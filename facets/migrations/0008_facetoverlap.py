@@ -0,0 +1,95 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:01
+
+from django.db import migrations, models
+
+
+def _ratio(area, total):
+    return area / total if total else 0
+
+
+# A copy of facets.overlaps.compute_overlaps as of this migration, so it only
+# touches historical models.
+def compute_overlaps(model, other_model, FacetOverlap):
+    facets = list(model.objects.only("id", "mpoly"))
+    others = list(other_model.objects.only("id", "mpoly"))
+    other_areas = [other.mpoly.area for other in others]
+
+    overlaps = []
+    for facet in facets:
+        prepared = facet.mpoly.prepared
+        area = facet.mpoly.area
+        for other, other_area in zip(others, other_areas):
+            if not prepared.intersects(other.mpoly):
+                continue
+            shared = facet.mpoly.intersection(other.mpoly).area
+            overlaps.append(
+                FacetOverlap(
+                    facet_type=model._meta.model_name,
+                    facet_id=facet.id,
+                    other_type=other_model._meta.model_name,
+                    other_id=other.id,
+                    ratio=_ratio(shared, area),
+                    other_ratio=_ratio(shared, other_area),
+                )
+            )
+            overlaps.append(
+                FacetOverlap(
+                    facet_type=other_model._meta.model_name,
+                    facet_id=other.id,
+                    other_type=model._meta.model_name,
+                    other_id=facet.id,
+                    ratio=_ratio(shared, other_area),
+                    other_ratio=_ratio(shared, area),
+                )
+            )
+    return overlaps
+
+
+def populate_overlaps(apps, schema_editor):
+    FacetOverlap = apps.get_model("facets", "FacetOverlap")
+    District = apps.get_model("facets", "District")
+    RegisteredCommunityOrganization = apps.get_model("facets", "RegisteredCommunityOrganization")
+    ZipCode = apps.get_model("facets", "ZipCode")
+    for model, other_model in [
+        (District, RegisteredCommunityOrganization),
+        (RegisteredCommunityOrganization, ZipCode),
+    ]:
+        FacetOverlap.objects.bulk_create(
+            compute_overlaps(model, other_model, FacetOverlap), batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("facets", "0007_facet_simplified_geojson"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FacetOverlap",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("facet_type", models.CharField(max_length=64)),
+                ("facet_id", models.UUIDField()),
+                ("other_type", models.CharField(max_length=64)),
+                ("other_id", models.UUIDField()),
+                ("ratio", models.FloatField()),
+                ("other_ratio", models.FloatField()),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("facet_type", "facet_id", "other_type", "other_id"),
+                        name="unique_facet_overlap",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_overlaps, migrations.RunPython.noop),
+    ]
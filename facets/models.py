@@ -1,9 +1,15 @@
 import uuid
 
 from django.contrib.gis.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import transaction
 from django.db.models import Q
 from relativity.fields import L, Relationship
 
+from facets.geometry import DEFAULT_LEVEL, FULL, geometry_hash, simplify
+from facets.reports import bump_dataset_version
+
 
 class Facet(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -13,6 +19,10 @@ class Facet(models.Model):
 
     targetable = models.BooleanField(default=False)
 
+    # Pre-simplified GeoJSON for maps, see facets.geometry
+    simplified_geojson = models.JSONField(default=dict, blank=True, editable=False)
+    geometry_hash = models.CharField(max_length=64, blank=True, editable=False)
+
     contained_profiles = Relationship(
         to="profiles.profile", predicate=Q(location__within=L("mpoly"))
     )
@@ -23,6 +33,50 @@ class Facet(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        previous_hash = self.geometry_hash
+        if update_fields is None or "mpoly" in update_fields:
+            self.update_simplified()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "simplified_geojson", "geometry_hash"}
+        super().save(*args, **kwargs)
+
+        if self.geometry_hash != previous_hash:
+            from facets.locator import bump_boundaries_version
+
+            transaction.on_commit(bump_boundaries_version)
+
+    def update_simplified(self):
+        """Regenerate simplified GeoJSON if the boundary has changed."""
+        digest = geometry_hash(self.mpoly)
+        if digest != self.geometry_hash or not self.simplified_geojson:
+            self.simplified_geojson = simplify(self.mpoly)
+            self.geometry_hash = digest
+
+    def geojson(self, level=DEFAULT_LEVEL):
+        """GeoJSON of the boundary at a simplification level, or full resolution."""
+        if level == FULL or level not in self.simplified_geojson:
+            return self.mpoly.geojson
+        return self.simplified_geojson[level]
+
+    def overlapping(self, model, min_ratio=0, min_other_ratio=0):
+        """
+        Facets of another type whose boundaries intersect this one, from the
+        precomputed FacetOverlap table. min_ratio and min_other_ratio require the
+        overlap to cover more than that share of this facet or the other one.
+        """
+        overlaps = FacetOverlap.objects.filter(
+            facet_type=self._meta.model_name,
+            facet_id=self.pk,
+            other_type=model._meta.model_name,
+        )
+        if min_ratio:
+            overlaps = overlaps.filter(ratio__gt=min_ratio)
+        if min_other_ratio:
+            overlaps = overlaps.filter(other_ratio__gt=min_other_ratio)
+        return model.objects.filter(id__in=overlaps.values("other_id"))
+
     def __lt__(self, other):
         if other is None:
             return False
@@ -35,37 +89,34 @@ class Facet(models.Model):
 
 
 class District(Facet):
-    intersecting_rcos = Relationship(
-        to="facets.registeredcommunityorganization", predicate=Q(mpoly__intersects=L("mpoly"))
-    )
-
     targetable = models.BooleanField(default=True)
     organizers = models.ManyToManyField(
         "profiles.Profile", related_name="organized_districts", blank=True
     )
 
+    @property
+    def intersecting_rcos(self):
+        return self.overlapping(RegisteredCommunityOrganization)
+
 
 class RegisteredCommunityOrganization(Facet):
-    intersecting_zips = Relationship(
-        to="facets.zipcode", predicate=Q(mpoly__intersects=L("mpoly"))
-    )
-    intersecting_districts = Relationship(
-        to="facets.district", predicate=Q(mpoly__intersects=L("mpoly"))
-    )
+    @property
+    def intersecting_zips(self):
+        return self.overlapping(ZipCode)
+
+    @property
+    def intersecting_districts(self):
+        return self.overlapping(District)
 
     @property
     def zips(self):
-        return [
-            z
-            for z in self.intersecting_zips.all()
-            if z.mpoly.intersection(self.mpoly).area / self.mpoly.area > 0.001
-        ]
+        return list(self.overlapping(ZipCode, min_ratio=0.001))
 
 
 class ZipCode(Facet):
-    intersecting_rcos = Relationship(
-        to="facets.registeredcommunityorganization", predicate=Q(mpoly__intersects=L("mpoly"))
-    )
+    @property
+    def intersecting_rcos(self):
+        return self.overlapping(RegisteredCommunityOrganization)
 
 
 class StateHouseDistrict(Facet):
@@ -78,3 +129,131 @@ class StateSenateDistrict(Facet):
 
 class Ward(Facet):
     pass
+
+
+class FacetOverlap(models.Model):
+    """
+    A pair of intersecting facet boundaries, stored in both directions, with the
+    share of each facet's area covered by the intersection (0 if they only touch).
+
+    Rebuilt by facets.overlaps when boundaries are loaded.
+    """
+
+    facet_type = models.CharField(max_length=64)
+    facet_id = models.UUIDField()
+    other_type = models.CharField(max_length=64)
+    other_id = models.UUIDField()
+    ratio = models.FloatField()
+    other_ratio = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["facet_type", "facet_id", "other_type", "other_id"],
+                name="unique_facet_overlap",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.facet_type} {self.facet_id} / {self.other_type} {self.other_id}"
+
+
+def facet_models():
+    return [
+        District,
+        RegisteredCommunityOrganization,
+        ZipCode,
+        StateHouseDistrict,
+        StateSenateDistrict,
+        Ward,
+    ]
+
+
+class FacetMembership(models.Model):
+    """
+    Stores the facets containing a model's location, so they can be read (and
+    select_related) without a spatial query per row.
+
+    Maintained by facets.membership: assigned when a location is geocoded and
+    reassigned in bulk when boundaries are reloaded. Until facets_assigned_at is
+    set, lookups fall back to querying by location.
+    """
+
+    facet_district = models.ForeignKey(
+        District,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    facet_ward = models.ForeignKey(
+        Ward, null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name="+"
+    )
+    facet_zip_code = models.ForeignKey(
+        ZipCode, null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name="+"
+    )
+    facet_state_house_district = models.ForeignKey(
+        StateHouseDistrict,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    facet_state_senate_district = models.ForeignKey(
+        StateSenateDistrict,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    facet_rco_ids = ArrayField(models.UUIDField(), default=list, blank=True, editable=False)
+    facets_assigned_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+        indexes = [GinIndex(fields=["facet_rco_ids"], name="%(class)s_rco_ids")]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_location = instance.__dict__.get("location")
+        return instance
+
+    def save(self, *args, **kwargs):
+        location_changed = "location" in self.__dict__ and self.location != getattr(
+            self, "_loaded_location", None
+        )
+        if location_changed:
+            # Stored membership is stale until it is reassigned
+            self.facets_assigned_at = None
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "location" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "facets_assigned_at"}
+        super().save(*args, **kwargs)
+        self._loaded_location = self.__dict__.get("location")
+
+        if location_changed:
+            transaction.on_commit(bump_dataset_version)
+        if location_changed and self.location is not None:
+            from facets.tasks import assign_facets
+
+            transaction.on_commit(lambda: assign_facets.delay(self._meta.label, self.pk))
+
+    def containing_district(self):
+        if self.facets_assigned_at is not None:
+            return self.facet_district
+        from facets.locator import get_locator
+
+        return District.objects.filter(pk=get_locator().first(District, self.location)).first()
+
+    def containing_rcos(self):
+        if self.facets_assigned_at is not None:
+            return RegisteredCommunityOrganization.objects.filter(id__in=self.facet_rco_ids)
+        from facets.locator import get_locator
+
+        return RegisteredCommunityOrganization.objects.filter(
+            id__in=get_locator().containing(RegisteredCommunityOrganization, self.location)
+        )
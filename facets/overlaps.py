@@ -0,0 +1,69 @@
+from django.db import transaction
+
+from facets.models import (
+    District,
+    FacetOverlap,
+    RegisteredCommunityOrganization,
+    ZipCode,
+)
+
+# Facet types whose overlaps are precomputed
+OVERLAP_PAIRS = [
+    (District, RegisteredCommunityOrganization),
+    (RegisteredCommunityOrganization, ZipCode),
+]
+
+
+def _ratio(area, total):
+    return area / total if total else 0
+
+
+def compute_overlaps(model, other_model):
+    """
+    FacetOverlaps between every pair of intersecting facets of two types, in both
+    directions. Pairs that only touch are kept, with ratios of 0.
+    """
+    facets = list(model.objects.only("id", "mpoly"))
+    others = list(other_model.objects.only("id", "mpoly"))
+    other_areas = [other.mpoly.area for other in others]
+
+    overlaps = []
+    for facet in facets:
+        prepared = facet.mpoly.prepared
+        area = facet.mpoly.area
+        for other, other_area in zip(others, other_areas):
+            if not prepared.intersects(other.mpoly):
+                continue
+            shared = facet.mpoly.intersection(other.mpoly).area
+            overlaps.append(
+                FacetOverlap(
+                    facet_type=model._meta.model_name,
+                    facet_id=facet.id,
+                    other_type=other_model._meta.model_name,
+                    other_id=other.id,
+                    ratio=_ratio(shared, area),
+                    other_ratio=_ratio(shared, other_area),
+                )
+            )
+            overlaps.append(
+                FacetOverlap(
+                    facet_type=other_model._meta.model_name,
+                    facet_id=other.id,
+                    other_type=model._meta.model_name,
+                    other_id=facet.id,
+                    ratio=_ratio(shared, other_area),
+                    other_ratio=_ratio(shared, area),
+                )
+            )
+    return overlaps
+
+
+def rebuild_facet_overlaps(batch_size=1000):
+    """Recompute the FacetOverlap table from current boundaries. Returns the row count."""
+    overlaps = []
+    for model, other_model in OVERLAP_PAIRS:
+        overlaps.extend(compute_overlaps(model, other_model))
+    with transaction.atomic():
+        FacetOverlap.objects.all().delete()
+        FacetOverlap.objects.bulk_create(overlaps, batch_size=batch_size)
+    return len(overlaps)
@@ -0,0 +1,64 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import F, IntegerField, OuterRef, Subquery
+
+from pbaabp.counters import get_counters, incr
+
+CACHE_TIMEOUT = 60 * 60
+
+
+class SubqueryCount(Subquery):
+    template = "(SELECT count(*) FROM (%(subquery)s) _count)"
+    output_field = IntegerField()
+
+
+class SubquerySum(Subquery):
+    template = "(SELECT coalesce(sum(_sum.total), 0) FROM (%(subquery)s) _sum)"
+    output_field = IntegerField()
+
+
+def dataset_version():
+    return get_counters("facets", ["dataset_version"])["dataset_version"]
+
+
+def bump_dataset_version():
+    """Invalidate cached facet aggregates, after located rows or boundaries change."""
+    incr("facets", "dataset_version")
+
+
+def facet_counts(facets, points, distinct="pk", total=None, location="location"):
+    """
+    Count the points inside each of a queryset of facets, in one query with PostGIS
+    doing the spatial join. Returns {facet pk: {"count": ..., "total": ...}} for
+    facets containing at least one point.
+
+    count is the number of distinct values of the `distinct` field; total, if a
+    `total` field or annotation is given, sums it over the distinct points.
+    Results are cached until the dataset version is bumped.
+    """
+    inside = (
+        points.filter(**{f"{location}__within": OuterRef("mpoly")})
+        .order_by()
+        .values(distinct)
+        .distinct()
+    )
+    annotations = {"count": SubqueryCount(inside)}
+    if total is not None:
+        annotations["total"] = SubquerySum(
+            points.filter(**{f"{location}__within": OuterRef("mpoly")})
+            .order_by(distinct)
+            .distinct(distinct)
+            .values(total=F(total))
+        )
+
+    rows = facets.annotate(**annotations).values("pk", *annotations)
+    sql, params = rows.query.sql_with_params()
+    digest = hashlib.sha256(f"{sql}{params}".encode()).hexdigest()
+    key = f"facets:counts:{dataset_version()}:{digest}"
+
+    counts = cache.get(key)
+    if counts is None:
+        counts = {row.pop("pk"): row for row in rows if row["count"]}
+        cache.set(key, counts, CACHE_TIMEOUT)
+    return counts
@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from facets.locator import bump_boundaries_version
+from facets.models import Facet, FacetMembership
+from facets.reports import bump_dataset_version
+
+
+@receiver(post_delete, dispatch_uid="facet_membership_post_delete")
+def facet_membership_post_delete(sender, instance, **kwargs):
+    if isinstance(instance, FacetMembership) and instance.location is not None:
+        transaction.on_commit(bump_dataset_version)
+
+
+@receiver(post_delete, dispatch_uid="facet_post_delete")
+def facet_post_delete(sender, instance, **kwargs):
+    if isinstance(instance, Facet):
+        transaction.on_commit(bump_boundaries_version)
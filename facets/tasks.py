@@ -0,0 +1,33 @@
+import logging
+
+from asgiref.sync import async_to_sync
+from celery import shared_task
+from django.apps import apps
+
+from facets.backfill import GEOCODED_MODELS, backfill
+from facets.membership import assign_facets as _assign_facets
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def assign_facets(model_label, pk):
+    model = apps.get_model(model_label)
+    _assign_facets(model.objects.filter(pk=pk))
+
+
+@shared_task
+def backfill_geocodes(model_labels=None, everything=False, limit=None):
+    for model_label in model_labels or GEOCODED_MODELS:
+        progress = async_to_sync(backfill)(
+            model_label,
+            everything=everything,
+            limit=limit,
+            on_progress=lambda p: logger.info(
+                f"{p.model}: {p.processed}/{p.total} geocoded ({p.rate:.1f} rows/s)"
+            ),
+        )
+        logger.info(
+            f"{model_label}: geocoded {progress.found}, not found {progress.not_found}, "
+            f"errors {progress.errors}"
+        )
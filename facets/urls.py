@@ -9,4 +9,9 @@ urlpatterns = [
     path("email-report/", views.email_report, name="rco_email_report"),
     path("list/", views.rco_list, name="rco_list"),
     path("rco/<str:rco_id>", views.rco, name="rco_detail"),
+    path(
+        "geojson/<str:kind>/<uuid:facet_id>.geojson",
+        views.facet_geojson,
+        name="facet_geojson",
+    ),
 ]
@@ -1,38 +1,146 @@
+import asyncio
+import hashlib
+import logging
+import re
+import weakref
+
 import sentry_sdk
 from django.conf import settings
+from django.core.cache import cache
 from geopy.adapters import AioHTTPAdapter
 from geopy.geocoders import GoogleV3, Nominatim
+from geopy.point import Point
+
+from pbaabp.counters import aincr, get_counters
 
 UA = "apps.bikeaction.org Geopy"
 
+# Reverse lookups are keyed by coordinates snapped to a ~10m grid
+# (0.0001 degrees of latitude is ~11m), so nearby points share a result.
+REVERSE_SNAP_DECIMALS = 4
+# Google's terms allow caching Geocoding API results for at most 30 days
+GEOCODE_CACHE_TIMEOUT = 30 * 24 * 60 * 60
+REVERSE_GEOCODE_CACHE_TIMEOUT = 30 * 24 * 60 * 60
+STATS_KEYS = ("geocode_hits", "geocode_misses", "reverse_hits", "reverse_misses")
+
+logger = logging.getLogger(__name__)
+
+# Geocoders hold an aiohttp session, which is bound to the event loop that
+# created it. Each running loop shares one, closed as the loop shuts down, so
+# Uvicorn's long-lived loop keeps reusing its session, while an async_to_sync
+# call, which runs on a loop of its own, opens and closes one for that call.
+_geolocators = weakref.WeakKeyDictionary()
+_keepers = set()
+
+
+def geocode_provider():
+    return "google" if settings.GOOGLE_MAPS_API_KEY is not None else "nominatim"
+
+
+def make_geolocator():
+    """
+    A new geocoder for the configured provider. Use it as an async context
+    manager, so its aiohttp session is closed with it.
+    """
+    if settings.GOOGLE_MAPS_API_KEY is not None:
+        return GoogleV3(
+            api_key=settings.GOOGLE_MAPS_API_KEY, user_agent=UA, adapter_factory=AioHTTPAdapter
+        )
+    return Nominatim(user_agent=UA, adapter_factory=AioHTTPAdapter)
 
-async def geocode_address(search_address):
+
+async def _keep_open(loop, geolocator):
+    """Hold a loop's geocoder open until the loop cancels its tasks at shutdown."""
     try:
-        if settings.GOOGLE_MAPS_API_KEY is not None:
-            async with GoogleV3(
-                api_key=settings.GOOGLE_MAPS_API_KEY, user_agent=UA, adapter_factory=AioHTTPAdapter
-            ) as geolocator:
-                address = await geolocator.geocode(search_address)
-        else:
-            async with Nominatim(user_agent=UA, adapter_factory=AioHTTPAdapter) as geolocator:
-                address = await geolocator.geocode(search_address)
-        return address
-    except Exception as err:
-        sentry_sdk.capture_exception(err)
-        raise
+        async with geolocator:
+            await loop.create_future()
+    finally:
+        _geolocators.pop(loop, None)
 
 
-async def reverse_geocode_point(search_point, exactly_one=True):
+def get_geolocator():
+    """The running loop's shared geocoder, see _geolocators."""
+    loop = asyncio.get_running_loop()
+    geolocator = _geolocators.get(loop)
+    if geolocator is None:
+        geolocator = _geolocators[loop] = make_geolocator()
+        # The loop only holds weak references to its tasks
+        task = loop.create_task(_keep_open(loop, geolocator))
+        _keepers.add(task)
+        task.add_done_callback(_keepers.discard)
+    return geolocator
+
+
+async def _query(geolocator, method, *args, **kwargs):
     try:
-        if settings.GOOGLE_MAPS_API_KEY is not None:
-            async with GoogleV3(
-                api_key=settings.GOOGLE_MAPS_API_KEY, user_agent=UA, adapter_factory=AioHTTPAdapter
-            ) as geolocator:
-                address = await geolocator.reverse(search_point, exactly_one=exactly_one)
-        else:
-            async with Nominatim(user_agent=UA, adapter_factory=AioHTTPAdapter) as geolocator:
-                address = await geolocator.reverse(search_point, exactly_one=exactly_one)
-        return address
+        return await getattr(geolocator or get_geolocator(), method)(*args, **kwargs)
     except Exception as err:
         sentry_sdk.capture_exception(err)
         raise
+
+
+def normalize_address(address):
+    return " ".join(re.sub(r"[^\w\s]", " ", address.lower()).split())
+
+
+def snap_point(search_point):
+    point = Point(search_point)
+    return (
+        round(point.latitude, REVERSE_SNAP_DECIMALS),
+        round(point.longitude, REVERSE_SNAP_DECIMALS),
+    )
+
+
+def geocode_cache_stats():
+    counts = get_counters("geocode", STATS_KEYS)
+    for kind in ("geocode", "reverse"):
+        lookups = counts[f"{kind}_hits"] + counts[f"{kind}_misses"]
+        counts[f"{kind}_hit_rate"] = counts[f"{kind}_hits"] / lookups if lookups else 0
+    return counts
+
+
+async def _cached(key, timeout, stat, lookup):
+    try:
+        result = await cache.aget(key)
+    except Exception:
+        logger.exception("Geocode cache lookup failed")
+        result = None
+    if result is not None:
+        await aincr("geocode", f"{stat}_hits")
+        return result
+
+    await aincr("geocode", f"{stat}_misses")
+    result = await lookup()
+    if result is not None:
+        try:
+            await cache.aset(key, result, timeout)
+        except Exception:
+            logger.exception("Geocode cache store failed")
+    return result
+
+
+async def geocode_address(search_address, limiter=None, geolocator=None):
+    """
+    Geocode an address, from the cache if possible. If a limiter is given, its
+    acquire() is awaited before each call to the provider. If a geolocator from
+    make_geolocator is given, it's used instead of opening a new one.
+    """
+    digest = hashlib.sha256(normalize_address(search_address).encode()).hexdigest()
+    key = f"geocode:{geocode_provider()}:{digest}"
+
+    async def lookup():
+        if limiter is not None:
+            await limiter.acquire()
+        return await _query(geolocator, "geocode", search_address)
+
+    return await _cached(key, GEOCODE_CACHE_TIMEOUT, "geocode", lookup)
+
+
+async def reverse_geocode_point(search_point, exactly_one=True, geolocator=None):
+    lat, lng = snap_point(search_point)
+    key = f"reverse_geocode:{geocode_provider()}:{int(exactly_one)}:{lat}:{lng}"
+
+    async def lookup():
+        return await _query(geolocator, "reverse", search_point, exactly_one=exactly_one)
+
+    return await _cached(key, REVERSE_GEOCODE_CACHE_TIMEOUT, "reverse", lookup)
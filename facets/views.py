@@ -1,28 +1,33 @@
 import datetime
-import json
-import pathlib
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.gis.geos import Point as GEOPoint
 from django.db import transaction
-from django.db.models import Count
-from django.http import HttpResponse
-from django.shortcuts import render
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Lower
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
-from django.utils.html import mark_safe
-from email_log.models import Email
-from shapely.geometry import Point, shape
-
-from facets.models import District, RegisteredCommunityOrganization, Ward
+from django.utils.cache import patch_cache_control
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
+
+from facets.divisions import get_division_index
+from facets.geometry import DEFAULT_LEVEL, level_for_zoom
+from facets.locator import get_locator
+from facets.models import (
+    District,
+    RegisteredCommunityOrganization,
+    StateHouseDistrict,
+    StateSenateDistrict,
+    Ward,
+    ZipCode,
+)
+from facets.reports import facet_counts
 from facets.utils import geocode_address
-from profiles.models import Profile
-
-with open(pathlib.Path(__file__).parent / "data" / "Political_Divisions.geojson") as f:
-    DIVISIONS = json.load(f)
-
-with open(pathlib.Path(__file__).parent / "data" / "polling_places.geojson") as f:
-    POLLING_PLACES = json.load(f)
+from profiles.models import EmailRecipient, Profile
 
 
 def index(request):
@@ -49,18 +54,20 @@ async def query_address(request):
         )
         return HttpResponse(f'<p style="color: red;">{error}</p>')
 
-    point = Point(address.longitude, address.latitude)
     geopoint = GEOPoint(address.longitude, address.latitude)
 
     rcos = []
-    rcos_geojson = []
     other = []
     wards = []
     primary_rco = None
-    async for rco in RegisteredCommunityOrganization.objects.filter(mpoly__contains=geopoint):
+    locator = await sync_to_async(get_locator)()
+    located = locator.locate(geopoint)
+
+    async for rco in RegisteredCommunityOrganization.objects.filter(
+        id__in=located[RegisteredCommunityOrganization]
+    ).defer("mpoly", "simplified_geojson"):
         if rco.targetable:
             primary_rco = rco
-        rcos_geojson.append(mark_safe(rco.mpoly.geojson))
         if rco.properties["org_type"] == "Ward":
             wards.append(rco)
         elif rco.properties["org_type"] in ["NID", "SSD", None]:
@@ -68,33 +75,22 @@ async def query_address(request):
         else:
             rcos.append(rco)
 
-    district = await District.objects.filter(mpoly__contains=geopoint).aget()
-    district_geojson = mark_safe(district.mpoly.geojson)
-
-    ward, division = None, None
-    for feature in DIVISIONS["features"]:
-        polygon = shape(feature["geometry"])
-        if polygon.contains(point):
-            dn = feature["properties"]["DIVISION_NUM"]
-            ward, division = [int(dn[i : i + 2]) for i in range(0, len(dn), 2)]
-            break
-
-    polling_place = None
-    for feature in POLLING_PLACES["features"]:
-        if feature["properties"]["ward"] == ward and feature["properties"]["division"] == division:
-            polling_place = (
-                f"{feature['properties']['placename']} - {feature['properties']['street_address']}"
-            )
-            break
+    district = (
+        await District.objects.filter(id__in=located[District])
+        .defer("mpoly", "simplified_geojson")
+        .aget()
+    )
+
+    division_index = get_division_index()
+    ward, division = division_index.ward_division(address.longitude, address.latitude)
+    polling_place = division_index.polling_place(ward, division)
 
     return render(
         request,
         "rco_partial.html",
         context={
             "DISTRICT": district,
-            "DISTRICT_GEOJSON": district_geojson,
             "RCOS": rcos,
-            "RCOS_GEOJSON": rcos_geojson,
             "primary_rco": primary_rco,
             "OTHER": other,
             "WARDS": wards,
@@ -108,94 +104,119 @@ async def query_address(request):
     )
 
 
+def with_profile_counts(facets, profiles):
+    counts = facet_counts(facets, profiles)
+    facets = list(facets)
+    for facet in facets:
+        facet.profile_count = counts.get(facet.pk, {}).get("count", 0)
+    return facets
+
+
 def report(request):
-    districts = District.objects.annotate(Count("contained_profiles"))
-    rcos = RegisteredCommunityOrganization.objects.annotate(Count("contained_profiles"))
-    wards = Ward.objects.annotate(Count("contained_profiles")).order_by(
-        "-contained_profiles__count"
+    profiles = Profile.objects.filter(location__isnull=False)
+    districts = with_profile_counts(District.objects.all(), profiles)
+    rcos = with_profile_counts(RegisteredCommunityOrganization.objects.all(), profiles)
+    wards = sorted(
+        with_profile_counts(Ward.objects.all(), profiles),
+        key=lambda ward: ward.profile_count,
+        reverse=True,
     )
     context = {"districts": districts, "rcos": rcos, "wards": wards}
     return render(request, "facets_report.html", context=context)
 
 
-@staff_member_required
-def email_report(request):
-    thirty_days_ago = timezone.now() - datetime.timedelta(days=30)
-
-    all_profiles = Profile.objects.filter(
-        user__email__isnull=False, location__isnull=False
-    ).select_related("user")
-
-    email_to_profile = {profile.user.email.lower(): profile for profile in all_profiles}
-
-    email_counts = {}
-
-    recent_emails = Email.objects.filter(date_sent__gte=thirty_days_ago).values_list(
-        "recipients", flat=True
-    )
-
-    for recipients_field in recent_emails:
-        if recipients_field:
-            recipients_lower = recipients_field.lower()
-            for email_addr in email_to_profile.keys():
-                if email_addr in recipients_lower:
-                    email_counts[email_addr] = email_counts.get(email_addr, 0) + 1
-
-    districts_data = []
-    for district in District.objects.all():
-        profiles_in_district = all_profiles.filter(location__within=district.mpoly)
-        profile_count = profiles_in_district.count()
-
-        if profile_count > 0:
-            total_emails = sum(
-                email_counts.get(profile.user.email.lower(), 0) for profile in profiles_in_district
-            )
-
-            avg_emails = total_emails / profile_count if profile_count > 0 else 0
-
-            districts_data.append(
+def email_report_rows(facets, profiles):
+    counts = facet_counts(facets, profiles, total="email_count")
+    rows = []
+    for facet in facets:
+        if facet.pk in counts:
+            profile_count = counts[facet.pk]["count"]
+            total_emails = counts[facet.pk]["total"]
+            rows.append(
                 {
-                    "name": district.name,
+                    "name": facet.name,
                     "profile_count": profile_count,
                     "total_emails": total_emails,
-                    "avg_emails": round(avg_emails, 2),
+                    "avg_emails": round(total_emails / profile_count, 2),
                 }
             )
+    rows.sort(key=lambda x: x["avg_emails"], reverse=True)
+    return rows
 
-    districts_data.sort(key=lambda x: x["avg_emails"], reverse=True)
-
-    rcos_data = []
-    for rco in RegisteredCommunityOrganization.objects.filter(targetable=True):
-        profiles_in_rco = all_profiles.filter(location__within=rco.mpoly)
-        profile_count = profiles_in_rco.count()
-
-        if profile_count > 0:
-            total_emails = sum(
-                email_counts.get(profile.user.email.lower(), 0) for profile in profiles_in_rco
-            )
 
-            avg_emails = total_emails / profile_count if profile_count > 0 else 0
-
-            rcos_data.append(
-                {
-                    "name": rco.name,
-                    "profile_count": profile_count,
-                    "total_emails": total_emails,
-                    "avg_emails": round(avg_emails, 2),
-                }
-            )
-
-    rcos_data.sort(key=lambda x: x["avg_emails"], reverse=True)
+@staff_member_required
+def email_report(request):
+    # Counting from the start of the day and up to the newest logged email lets the
+    # facet counts be cached until more mail is sent
+    thirty_days_ago = (timezone.now() - datetime.timedelta(days=30)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    latest_email = EmailRecipient.objects.aggregate(latest=Max("email_id"))["latest"] or 0
+    email_count = Subquery(
+        EmailRecipient.objects.filter(
+            address=Lower(OuterRef("user__email")),
+            date_sent__gte=thirty_days_ago,
+            email_id__lte=latest_email,
+        )
+        .order_by()
+        .values("address")
+        .annotate(count=Count("*"))
+        .values("count"),
+        output_field=IntegerField(),
+    )
+    profiles = Profile.objects.filter(user__email__isnull=False, location__isnull=False).annotate(
+        email_count=Coalesce(email_count, Value(0))
+    )
 
     context = {
-        "districts": districts_data,
-        "rcos": rcos_data,
+        "districts": email_report_rows(District.objects.all(), profiles),
+        "rcos": email_report_rows(
+            RegisteredCommunityOrganization.objects.filter(targetable=True), profiles
+        ),
         "date_range": f"Last 30 days (since {thirty_days_ago.date()})",
     }
 
     return render(request, "facets_email_report.html", context=context)
 
 
+FACET_KINDS = {
+    "district": District,
+    "rco": RegisteredCommunityOrganization,
+    "ward": Ward,
+    "zip": ZipCode,
+    "state-house": StateHouseDistrict,
+    "state-senate": StateSenateDistrict,
+}
+
+
+def _geojson_level(request):
+    zoom = request.GET.get("zoom", "")
+    return level_for_zoom(int(zoom)) if zoom.isdigit() else DEFAULT_LEVEL
+
+
+def _facet_geojson_etag(request, kind, facet_id):
+    model = FACET_KINDS.get(kind)
+    if model is None:
+        return None
+    digest = model.objects.filter(pk=facet_id).values_list("geometry_hash", flat=True).first()
+    return f"{digest}-{_geojson_level(request)}" if digest else None
+
+
+@gzip_page
+@condition(etag_func=_facet_geojson_etag)
+def facet_geojson(request, kind, facet_id):
+    if kind not in FACET_KINDS:
+        raise Http404
+    facet = get_object_or_404(FACET_KINDS[kind].objects.defer("mpoly", "properties"), pk=facet_id)
+    response = HttpResponse(
+        facet.geojson(_geojson_level(request)), content_type="application/geo+json"
+    )
+    # The URL doesn't change with the geometry, so have clients revalidate every
+    # time; an unchanged facet costs a 304 from the geometry_hash ETag.
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
 def rco_list(request):
     rcos = RegisteredCommunityOrganization.objects.all
     return render(request, "facets_rco_list.html", context={"rcos": rcos})
@@ -8,8 +8,9 @@ from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
 from facets.utils import reverse_geocode_point
+from lazer.dispatch import queue_violation_reports
 from lazer.models import Banner, ViolationReport, ViolationSubmission
-from lazer.tasks import submit_violation_report_to_ppa
+from lazer.tasks import dispatch_ppa_submissions, submit_violation_report_to_ppa
 from pbaabp.admin import ReadOnlyLeafletGeoAdminMixin
 
 
@@ -118,6 +119,11 @@ class ViolationReportAdmin(ExtraButtonsMixin, admin.ModelAdmin):
         "image_tag_success",
         "image_tag_error",
         "image_tag_final",
+        "ppa_queued_at",
+        "ppa_attempts",
+        "ppa_last_attempt_at",
+        "ppa_next_attempt_at",
+        "ppa_last_error",
     )
     exclude = ("redacted_image",)
     actions = ["bulk_resubmit_violations"]
@@ -141,11 +147,8 @@ class ViolationReportAdmin(ExtraButtonsMixin, admin.ModelAdmin):
     @admin.action(description="Re-submit selected violations to PPA")
     def bulk_resubmit_violations(self, request, queryset):
         """Bulk action to re-submit multiple violation reports to the PPA."""
-        count = 0
-        for report in queryset:
-            # Queue each report for submission
-            submit_violation_report_to_ppa.delay(report.id)
-            count += 1
+        count = queue_violation_reports(queryset)
+        dispatch_ppa_submissions.delay()
 
         self.message_user(
             request,
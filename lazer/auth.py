@@ -0,0 +1,83 @@
+import hashlib
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from lazer.session_backend import SessionStore as LazerSessionStore
+
+# Keep the default session store for backwards compatibility with existing sessions
+DjangoSessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+User = get_user_model()
+
+# Try LazerSessionStore first, then fall back to Django's session store
+SESSION_STORES = (LazerSessionStore, DjangoSessionStore)
+
+# Resolved users are kept briefly, so deactivations and deleted sessions apply
+# within a few minutes even without an explicit logout.
+SESSION_USER_CACHE_TIMEOUT = 5 * 60
+
+
+def session_key_from_request(request):
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Session: "):
+        return authorization.split("Session: ")[1]
+    return None
+
+
+def _session_user_cache_key(session_key):
+    return f"lazer:session_user:{hashlib.sha256(session_key.encode()).hexdigest()}"
+
+
+def session_user(session_key):
+    """
+    Resolve an API session key to (user, session), or (None, None).
+
+    Cached resolutions cost no queries: the session is loaded lazily, and Lazer
+    sessions come from the cache when they are.
+    """
+    cache_key = _session_user_cache_key(session_key)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        user, store_index = cached
+        return user, SESSION_STORES[store_index](session_key=session_key)
+
+    for store_index, store_class in enumerate(SESSION_STORES):
+        session = store_class(session_key=session_key)
+        user_id = session.get("_auth_user_id")
+        if user_id:
+            user = User.objects.filter(id=user_id).first()
+            if user is not None:
+                cache.set(cache_key, (user, store_index), SESSION_USER_CACHE_TIMEOUT)
+                return user, session
+    return None, None
+
+
+async def asession_user(session_key):
+    cache_key = _session_user_cache_key(session_key)
+    cached = await cache.aget(cache_key)
+    if cached is not None:
+        user, store_index = cached
+        return user, SESSION_STORES[store_index](session_key=session_key)
+
+    for store_index, store_class in enumerate(SESSION_STORES):
+        session = store_class(session_key=session_key)
+        user_id = await session.aget("_auth_user_id")
+        if user_id:
+            user = await User.objects.filter(id=user_id).afirst()
+            if user is not None:
+                await cache.aset(cache_key, (user, store_index), SESSION_USER_CACHE_TIMEOUT)
+                return user, session
+    return None, None
+
+
+def forget_session_user(session_key):
+    cache.delete(_session_user_cache_key(session_key))
+
+
+def end_session(session_key):
+    """Delete an API session from every store and forget its cached user."""
+    forget_session_user(session_key)
+    for store_class in SESSION_STORES:
+        store_class(session_key=session_key).delete()
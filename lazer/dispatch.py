@@ -0,0 +1,176 @@
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+from lazer.models import ViolationReport
+from lazer.utils import submit_violation_report_to_ppa
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+MAX_BACKOFF = 6 * 60 * 60
+LOCK_KEY = "lazer:ppa_dispatch:lock"
+LOCK_TIMEOUT = 15 * 60
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing `rate` acquisitions per second on average,
+    with bursts of up to `capacity`. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def queue_violation_reports(queryset):
+    """Queue reports for submission to the PPA, resetting any previous attempt state."""
+    now = timezone.now()
+    return queryset.update(
+        ppa_queued_at=now, ppa_attempts=0, ppa_next_attempt_at=now, ppa_last_error=None
+    )
+
+
+def due_reports(now=None):
+    return ViolationReport.objects.filter(ppa_next_attempt_at__lte=now or timezone.now()).order_by(
+        "ppa_next_attempt_at"
+    )
+
+
+def is_retryable(err):
+    if isinstance(err, requests.HTTPError):
+        return err.response is not None and err.response.status_code in RETRY_STATUSES
+    return isinstance(err, (requests.ConnectionError, requests.Timeout))
+
+
+def retry_delay(attempts, err=None):
+    """Exponential backoff with jitter, honouring a Retry-After header in seconds."""
+    delay = min(settings.PPA_RETRY_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF)
+    delay *= random.uniform(1, 1.25)
+    response = getattr(err, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+    return timedelta(seconds=delay)
+
+
+def _session(local):
+    if not hasattr(local, "session"):
+        local.session = requests.Session()
+    return local.session
+
+
+def attempt_submission(report_id, bucket, local):
+    """
+    Make one rate-limited submission attempt and record its outcome on the report.
+
+    Returns "submitted", "retry", "failed" or "missing".
+    """
+    try:
+        report = ViolationReport.objects.select_related("submission").filter(id=report_id).first()
+        if report is None:
+            return "missing"
+
+        bucket.acquire()
+        report.ppa_attempts += 1
+        report.ppa_last_attempt_at = timezone.now()
+        try:
+            submit_violation_report_to_ppa(report, session=_session(local))
+        except Exception as err:
+            logger.exception(
+                f"PPA submission attempt {report.ppa_attempts} for {report.id} failed"
+            )
+            report.ppa_last_error = f"{type(err).__name__}: {err}"
+            if is_retryable(err) and report.ppa_attempts < settings.PPA_MAX_ATTEMPTS:
+                report.ppa_next_attempt_at = timezone.now() + retry_delay(report.ppa_attempts, err)
+                outcome = "retry"
+            else:
+                report.ppa_next_attempt_at = None
+                outcome = "failed"
+        else:
+            report.ppa_last_error = None
+            report.ppa_next_attempt_at = None
+            outcome = "submitted"
+
+        report.save(
+            update_fields=[
+                "ppa_attempts",
+                "ppa_last_attempt_at",
+                "ppa_next_attempt_at",
+                "ppa_last_error",
+            ]
+        )
+        return outcome
+    finally:
+        # Worker threads each hold their own database connection
+        connections.close_all()
+
+
+def dispatch(limit=None, rate=None, burst=None, concurrency=None):
+    """
+    Submit due reports to the PPA until none are left (or `limit` attempts were made).
+
+    Up to `concurrency` requests are in flight at once, started no faster than the
+    token bucket allows. Only one dispatcher runs at a time across all processes;
+    returns None if another one holds the lock, otherwise a Counter of outcomes.
+    """
+    rate = settings.PPA_RATE_LIMIT if rate is None else rate
+    burst = burst or settings.PPA_RATE_BURST
+    concurrency = concurrency or settings.PPA_CONCURRENCY
+
+    token = uuid.uuid4().hex
+    if not cache.add(LOCK_KEY, token, LOCK_TIMEOUT):
+        return None
+
+    outcomes = Counter()
+    bucket = TokenBucket(rate, burst)
+    local = threading.local()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while True:
+                size = settings.PPA_DISPATCH_BATCH_SIZE
+                if limit is not None:
+                    size = min(size, limit - sum(outcomes.values()))
+                    if size <= 0:
+                        break
+                ids = list(due_reports().values_list("id", flat=True)[:size])
+                if not ids:
+                    break
+                outcomes.update(
+                    pool.map(lambda report_id: attempt_submission(report_id, bucket, local), ids)
+                )
+                cache.touch(LOCK_KEY, LOCK_TIMEOUT)
+    finally:
+        if cache.get(LOCK_KEY) == token:
+            cache.delete(LOCK_KEY)
+    return outcomes
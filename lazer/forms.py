@@ -9,6 +9,15 @@ class SubmissionForm(forms.Form):
     image = forms.CharField()
 
 
+class SubmissionUploadForm(forms.Form):
+    """Same as SubmissionForm, but the image is sent as a multipart file upload."""
+
+    latitude = forms.CharField()
+    longitude = forms.CharField()
+    datetime = forms.DateTimeField()
+    image = forms.FileField()
+
+
 class ReportForm(forms.Form):
     submission_id = forms.UUIDField()
 
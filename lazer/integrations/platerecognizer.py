@@ -1,19 +1,188 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+import weakref
+
 import httpx
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.cache import cache
 
+from pbaabp.counters import aget_counters, aincr
+
+URL = "https://api.platerecognizer.com/v1/plate-reader/"
+REGIONS = ["us-pa", "us-nj", "us-ny"]
+CONFIG = {"detection_mode": "vehicle"}
+
+TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+LIMITS = httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=60)
+MAX_CONCURRENCY = 4
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Bump when REGIONS/CONFIG change so stale responses aren't reused.
+CACHE_VERSION = 1
+CACHE_TIMEOUT = 30 * 24 * 60 * 60
+STATS_KEYS = ("hits", "misses", "errors", "latency_ms")
+
+logger = logging.getLogger(__name__)
+
+# httpx clients, semaphores and in-flight tasks are bound to an event loop.
+# Uvicorn workers run a single long-lived loop, while async_to_sync callers get a
+# fresh one, so keep one set per loop and let them go when the loop does.
+_clients = weakref.WeakKeyDictionary()
+_semaphores = weakref.WeakKeyDictionary()
+_in_flight = weakref.WeakKeyDictionary()
+
+
+def _headers():
+    return {"Authorization": f"Token {settings.PLATERECOGNIZER_API_KEY}"}
+
+
+def get_client():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = httpx.AsyncClient(
+            headers=_headers(), timeout=TIMEOUT, limits=LIMITS
+        )
+    return client
+
+
+def _get_semaphore():
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return _semaphores[loop]
+
+
+def _cache_key(digest):
+    return f"platerecognizer:{CACHE_VERSION}:{digest}"
+
+
+async def _incr(name, amount=1):
+    await aincr("platerecognizer", name, amount)
+
+
+async def stats():
+    """
+    Hit/miss/error counts and mean upstream latency, shared across processes.
+
+    Hits are lookups answered without a new upstream call, either from the cache
+    or by joining an identical request already in flight.
+    """
+    counts = await aget_counters("platerecognizer", STATS_KEYS)
+    lookups = counts["hits"] + counts["misses"]
+    counts["hit_rate"] = counts["hits"] / lookups if lookups else 0
+    counts["mean_latency_ms"] = counts["latency_ms"] / counts["misses"] if counts["misses"] else 0
+    return counts
 
-async def read_plate(image, utc_time):
-    url = "https://api.platerecognizer.com/v1/plate-reader/"
-    headers = {"Authorization": f"Token {settings.PLATERECOGNIZER_API_KEY}"}
 
+async def _post(**kwargs):
+    """POST to Plate Recognizer with bounded concurrency and retries."""
+    client = get_client()
+    async with _get_semaphore():
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = await client.post(URL, **kwargs)
+            except httpx.TransportError:
+                if attempt == MAX_RETRIES:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    return response
+            if "files" in kwargs:
+                for f in kwargs["files"].values():
+                    f.seek(0)
+            await asyncio.sleep(RETRY_BACKOFF * 2**attempt)
+
+
+async def _read_plate_cached(digest, send):
+    """
+    Return the cached response for an image digest, or call send() once for it.
+
+    Concurrent requests for the same image on this loop share a single call.
+    """
+    key = _cache_key(digest)
+    try:
+        cached = await cache.aget(key)
+    except Exception:
+        logger.exception("Plate Recognizer cache lookup failed")
+        cached = None
+    if cached is not None:
+        await _incr("hits")
+        return cached
+
+    in_flight = _in_flight.setdefault(asyncio.get_running_loop(), {})
+    if digest in in_flight:
+        await _incr("hits")
+        return await asyncio.shield(in_flight[digest])
+
+    async def fetch():
+        start = time.monotonic()
+        try:
+            response = await send()
+        except Exception:
+            await _incr("errors")
+            raise
+        await _incr("misses")
+        await _incr("latency_ms", int((time.monotonic() - start) * 1000))
+        data = response.json()
+        if response.is_success and "results" in data:
+            try:
+                await cache.aset(key, data, CACHE_TIMEOUT)
+            except Exception:
+                logger.exception("Plate Recognizer cache store failed")
+        return data
+
+    task = in_flight[digest] = asyncio.ensure_future(fetch())
+    task.add_done_callback(lambda _: in_flight.pop(digest, None))
+    return await asyncio.shield(task)
+
+
+def _base64_digest(image):
+    return hashlib.sha256(base64.b64decode(image)).hexdigest()
+
+
+async def read_plate(image, utc_time):
     data = {
         "upload": image,
-        "regions": ["us-pa", "us-nj", "us-ny"],
+        "regions": REGIONS,
         "timestamp": utc_time.isoformat(),
         "mmc": True,
-        "config": {"detection_mode": "vehicle"},
+        "config": CONFIG,
+    }
+
+    digest = await sync_to_async(_base64_digest)(image)
+    return await _read_plate_cached(digest, lambda: _post(json=data))
+
+
+def _file_digest(image_file):
+    image_file.seek(0)
+    sha = hashlib.sha256()
+    for chunk in iter(lambda: image_file.read(64 * 1024), b""):
+        sha.update(chunk)
+    image_file.seek(0)
+    return sha.hexdigest()
+
+
+async def read_plate_file(image_file, utc_time):
+    """
+    Like read_plate, but streams an open binary file as a multipart upload
+    instead of sending a base64 string in a JSON body. The file is hashed in a
+    thread, but httpx streams it from the event loop, so it should be a local
+    file, such as the upload Django spooled, rather than one on remote storage.
+    """
+    data = {
+        "regions": REGIONS,
+        "timestamp": utc_time.isoformat(),
+        "mmc": "true",
+        "config": json.dumps(CONFIG),
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=data)
-        return response.json()
+    digest = await sync_to_async(_file_digest)(image_file)
+    return await _read_plate_cached(digest, lambda: _post(data=data, files={"upload": image_file}))
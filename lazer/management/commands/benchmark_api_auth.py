@@ -0,0 +1,72 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import JsonResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from lazer.auth import end_session, forget_session_user
+from lazer.session_backend import SessionStore as LazerSessionStore
+from lazer.views import api_auth
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure database queries and time per Laser API request authenticated with a "
+        "Session header, with cold and warm session caches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user to authenticate as")
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=100,
+            help="Requests to make in each mode (default: 100)",
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.get(email=options["email"])
+        count = options["requests"]
+
+        session = LazerSessionStore()
+        session["_auth_user_id"] = str(user.pk)
+        session["_auth_user_backend"] = settings.AUTHENTICATION_BACKENDS[0]
+        session.create()
+        session_key = session.session_key
+
+        view = api_auth(lambda request: JsonResponse({"success": "ok"}))
+        factory = RequestFactory()
+
+        try:
+            # Cold is what every request cost before sessions and users were cached
+            for label, cold in (("cold", True), ("warm", False)):
+                queries = 0
+                elapsed = 0
+                for _ in range(count):
+                    if cold:
+                        forget_session_user(session_key)
+                        session._cache.delete(session.cache_key)
+                    request = factory.get(
+                        "/lazer/api/check-login/", HTTP_AUTHORIZATION=f"Session: {session_key}"
+                    )
+                    request.user = AnonymousUser()
+                    start = time.perf_counter()
+                    with CaptureQueriesContext(connection) as context:
+                        response = view(request)
+                    elapsed += time.perf_counter() - start
+                    queries += len(context)
+                    assert response.status_code == 200, response.content
+
+                self.stdout.write(
+                    f"{label}: {queries / count:.2f} queries/request, "
+                    f"{elapsed / count * 1000:.2f} ms/request"
+                )
+        finally:
+            end_session(session_key)
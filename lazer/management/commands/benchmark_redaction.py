@@ -0,0 +1,64 @@
+import pathlib
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lazer.redaction import get_face_cascade, redact_image_bytes, redact_many
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+
+
+class Command(BaseCommand):
+    help = "Benchmark face/plate redaction over a folder of sample images"
+
+    def add_arguments(self, parser):
+        parser.add_argument("folder", help="Folder containing sample .jpg/.png images")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of worker processes for the pool run (default: number of CPUs)",
+        )
+
+    def handle(self, *args, **options):
+        folder = pathlib.Path(options["folder"])
+        if not folder.is_dir():
+            raise CommandError(f"{folder} is not a directory")
+
+        images = [
+            p.read_bytes() for p in sorted(folder.iterdir()) if p.suffix.lower() in IMAGE_SUFFIXES
+        ]
+        if not images:
+            raise CommandError(f"No images found in {folder}")
+
+        self.stdout.write(f"Benchmarking redaction over {len(images)} images\n")
+
+        def uncached():
+            # What every call used to pay: a freshly parsed classifier
+            for image_bytes in images:
+                get_face_cascade.cache_clear()
+                redact_image_bytes(image_bytes)
+
+        def cached():
+            for image_bytes in images:
+                redact_image_bytes(image_bytes)
+
+        def pooled():
+            jobs = ((i, image_bytes, []) for i, image_bytes in enumerate(images))
+            for _ in redact_many(jobs, max_workers=options["workers"]):
+                pass
+
+        get_face_cascade.cache_clear()
+        start = time.monotonic()
+        get_face_cascade()
+        self.stdout.write(f"  classifier load: {(time.monotonic() - start) * 1000:.1f}ms")
+
+        for label, run in (
+            ("serial, classifier per image", uncached),
+            ("serial, cached classifier", cached),
+            ("process pool", pooled),
+        ):
+            start = time.monotonic()
+            run()
+            elapsed = time.monotonic() - start
+            self.stdout.write(f"  {label}: {elapsed:.2f}s ({len(images) / elapsed:.1f} images/s)")
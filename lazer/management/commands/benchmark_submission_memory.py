@@ -0,0 +1,96 @@
+import base64
+import datetime
+import os
+import tracemalloc
+from unittest import mock
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from lazer.forms import SubmissionForm, SubmissionUploadForm
+from lazer.integrations import platerecognizer
+from lazer.views import get_image_from_data_url
+
+
+async def _plate_recognizer(request):
+    # Drain the body the way the network would, without buffering it
+    async for _ in request.stream:
+        pass
+    return httpx.Response(200, json={"results": []})
+
+
+def _stub_client():
+    return httpx.AsyncClient(transport=httpx.MockTransport(_plate_recognizer))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare peak memory of the data URL and multipart submission paths, "
+        "from request parsing through sending the Plate Recognizer request "
+        "to a stubbed transport"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size-mb",
+            type=float,
+            default=5,
+            help="Size of the simulated photo in megabytes (default: 5)",
+        )
+
+    # A local cache so the Plate Recognizer cache and counters don't need Redis
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def handle(self, *args, **options):
+        image_bytes = os.urandom(int(options["size_mb"] * 1024 * 1024))
+        fields = {
+            "latitude": "39.9528",
+            "longitude": "-75.1635",
+            "datetime": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        factory = RequestFactory()
+        utc_time = datetime.datetime.now(datetime.timezone.utc)
+
+        data_url = "data:image/jpeg;base64," + base64.b64encode(image_bytes).decode()
+        data_url_request = factory.post("/lazer/api/submit/", {**fields, "image": data_url})
+        del data_url
+
+        upload_request = factory.post(
+            "/lazer/api/submit/upload/",
+            {**fields, "image": SimpleUploadedFile("photo.jpg", image_bytes, "image/jpeg")},
+        )
+        upload_class = []
+
+        # The data URL travels as a regular form field, so production has to raise
+        # DATA_UPLOAD_MAX_MEMORY_SIZE for it to be accepted at all.
+        @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=None)
+        def data_url_path():
+            form = SubmissionForm(data_url_request.POST)
+            form.is_valid()
+            get_image_from_data_url(form.cleaned_data["image"])
+            async_to_sync(platerecognizer.read_plate)(
+                form.cleaned_data["image"].split(";base64,")[1], utc_time
+            )
+
+        def upload_path():
+            # Parsing spools uploads over FILE_UPLOAD_MAX_MEMORY_SIZE to disk
+            form = SubmissionUploadForm(upload_request.POST, upload_request.FILES)
+            form.is_valid()
+            upload = form.cleaned_data["image"]
+            upload_class.append(type(upload).__name__)
+            async_to_sync(platerecognizer.read_plate_file)(upload, utc_time)
+            upload.close()
+
+        self.stdout.write(f"Simulated photo: {len(image_bytes) / 1024 / 1024:.1f}MB\n")
+        with mock.patch.object(platerecognizer, "get_client", _stub_client):
+            for label, run in (("data URL", data_url_path), ("multipart upload", upload_path)):
+                tracemalloc.start()
+                run()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.stdout.write(f"  {label}: peak {peak / 1024 / 1024:.1f}MB")
+        self.stdout.write(f"  (upload parsed as {upload_class[0]})")
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from lazer.dispatch import dispatch, due_reports, queue_violation_reports
+from lazer.models import ViolationReport
+
+
+class Command(BaseCommand):
+    help = "Submit all queued Laser Vision violation reports to the PPA, rate limited"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=None, help="Stop after this many submission attempts"
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=None,
+            help=f"Requests per second (default: {settings.PPA_RATE_LIMIT}, 0 for unlimited)",
+        )
+        parser.add_argument(
+            "--burst",
+            type=int,
+            default=None,
+            help=f"Token bucket size (default: {settings.PPA_RATE_BURST})",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help=f"Requests in flight at once (default: {settings.PPA_CONCURRENCY})",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Requeue unsubmitted reports that ran out of attempts or failed permanently",
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            failed = ViolationReport.objects.filter(
+                submitted__isnull=True,
+                ppa_queued_at__isnull=False,
+                ppa_next_attempt_at__isnull=True,
+                ppa_last_error__isnull=False,
+            )
+            self.stdout.write(f"Requeued {queue_violation_reports(failed)} failed reports")
+
+        self.stdout.write(f"{due_reports().count()} reports due for submission")
+
+        outcomes = dispatch(
+            limit=options["limit"],
+            rate=options["rate"],
+            burst=options["burst"],
+            concurrency=options["concurrency"],
+        )
+        if outcomes is None:
+            raise CommandError("Another PPA dispatcher is already running")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Submitted {outcomes['submitted']}, "
+                f"retrying {outcomes['retry']}, "
+                f"failed {outcomes['failed']}"
+            )
+        )
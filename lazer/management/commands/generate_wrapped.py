@@ -5,7 +5,7 @@ from django.core.management.base import BaseCommand
 from django.db.models import Count
 
 from lazer.models import LazerWrapped, ViolationReport
-from lazer.views import calculate_wrapped_stats
+from lazer.wrapped import save_wrapped, wrapped_stats
 
 User = get_user_model()
 
@@ -62,6 +62,10 @@ class Command(BaseCommand):
         user_ids = [u["submission__created_by"] for u in eligible_users]
         users = User.objects.filter(id__in=user_ids)
         user_map = {u.id: u for u in users}
+        existing_map = {
+            wrapped.user_id: wrapped
+            for wrapped in LazerWrapped.objects.filter(year=year, user_id__in=user_ids)
+        }
 
         self.stdout.write(f"Found {len(eligible_users)} eligible users\n")
 
@@ -69,6 +73,7 @@ class Command(BaseCommand):
         updated_count = 0
         skipped_count = 0
 
+        to_generate = []
         for user_data in eligible_users:
             user_id = user_data["submission__created_by"]
             report_count = user_data["report_count"]
@@ -78,7 +83,7 @@ class Command(BaseCommand):
                 continue
 
             # Check if wrapped already exists
-            existing = LazerWrapped.objects.filter(user=user, year=year).first()
+            existing = existing_map.get(user_id)
 
             if existing and not regenerate:
                 self.stdout.write(
@@ -96,73 +101,29 @@ class Command(BaseCommand):
                     created_count += 1
                 continue
 
-            # Calculate stats
-            stats = calculate_wrapped_stats(user, year)
-            if stats is None:
-                self.stdout.write(
-                    self.style.WARNING(f"  WARN: {user.email} - no stats calculated")
-                )
-                continue
+            to_generate.append((user, report_count))
 
-            if existing:
-                # Update existing wrapped
-                existing.total_submissions = stats["total_submissions"]
-                existing.total_reports = stats["total_reports"]
-                existing.violations_by_type = stats["violations_by_type"]
-                existing.top_streets = stats["top_streets"]
-                existing.top_zip_codes = stats["top_zip_codes"]
-                existing.reports_by_month = stats["reports_by_month"]
-                existing.first_report_date = stats["first_report_date"]
-                existing.longest_streak = stats["longest_streak"]
-                existing.longest_streak_start = stats["longest_streak_start"]
-                existing.longest_streak_end = stats["longest_streak_end"]
-                existing.longest_streak_reports = stats["longest_streak_reports"]
-                existing.top_day_date = stats["top_day_date"]
-                existing.top_day_count = stats["top_day_count"]
-                existing.top_user_vehicles = stats["top_user_vehicles"]
-                existing.top_community_vehicles = stats["top_community_vehicles"]
-                existing.rank = stats["rank"]
-                existing.total_users = stats["total_users"]
-                existing.percentile = stats["percentile"]
-                existing.avg_reports = stats["avg_reports"]
-                existing.total_community_reports = stats["total_community_reports"]
-                existing.percent_of_total = stats["percent_of_total"]
-                existing.save()
-                self.stdout.write(
-                    self.style.SUCCESS(f"  UPDATE: {user.email} ({report_count} reports)")
-                )
-                updated_count += 1
-            else:
-                # Create new wrapped
-                LazerWrapped.objects.create(
-                    user=user,
-                    year=year,
-                    total_submissions=stats["total_submissions"],
-                    total_reports=stats["total_reports"],
-                    violations_by_type=stats["violations_by_type"],
-                    top_streets=stats["top_streets"],
-                    top_zip_codes=stats["top_zip_codes"],
-                    reports_by_month=stats["reports_by_month"],
-                    first_report_date=stats["first_report_date"],
-                    longest_streak=stats["longest_streak"],
-                    longest_streak_start=stats["longest_streak_start"],
-                    longest_streak_end=stats["longest_streak_end"],
-                    longest_streak_reports=stats["longest_streak_reports"],
-                    top_day_date=stats["top_day_date"],
-                    top_day_count=stats["top_day_count"],
-                    top_user_vehicles=stats["top_user_vehicles"],
-                    top_community_vehicles=stats["top_community_vehicles"],
-                    rank=stats["rank"],
-                    total_users=stats["total_users"],
-                    percentile=stats["percentile"],
-                    avg_reports=stats["avg_reports"],
-                    total_community_reports=stats["total_community_reports"],
-                    percent_of_total=stats["percent_of_total"],
-                )
-                self.stdout.write(
-                    self.style.SUCCESS(f"  CREATE: {user.email} ({report_count} reports)")
-                )
-                created_count += 1
+        if to_generate:
+            # Calculate stats for everyone at once
+            stats = wrapped_stats(year, user_ids=[user.id for user, _ in to_generate])
+
+            for user, report_count in to_generate:
+                if user.id not in stats:
+                    self.stdout.write(
+                        self.style.WARNING(f"  WARN: {user.email} - no stats calculated")
+                    )
+                    continue
+
+                if user.id in existing_map:
+                    self.stdout.write(
+                        self.style.SUCCESS(f"  UPDATE: {user.email} ({report_count} reports)")
+                    )
+                else:
+                    self.stdout.write(
+                        self.style.SUCCESS(f"  CREATE: {user.email} ({report_count} reports)")
+                    )
+
+            created_count, updated_count = save_wrapped(year, stats, existing=existing_map)
 
         self.stdout.write("")
         self.stdout.write(self.style.SUCCESS("Summary:"))
@@ -0,0 +1,16 @@
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+
+from lazer.integrations.platerecognizer import stats
+
+
+class Command(BaseCommand):
+    help = "Show Plate Recognizer cache hit/miss and latency counters"
+
+    def handle(self, *args, **options):
+        counts = async_to_sync(stats)()
+        self.stdout.write(f"Hits:         {counts['hits']}")
+        self.stdout.write(f"Misses:       {counts['misses']}")
+        self.stdout.write(f"Errors:       {counts['errors']}")
+        self.stdout.write(f"Hit rate:     {counts['hit_rate']:.1%}")
+        self.stdout.write(f"Mean latency: {counts['mean_latency_ms']:.0f}ms")
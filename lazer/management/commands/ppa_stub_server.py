@@ -0,0 +1,79 @@
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local stand-in for the PPA Power Automate endpoint, for load testing the "
+        "submission dispatcher. Point PPA_API_URL at it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--latency", type=float, default=1.0, help="Seconds to wait before responding"
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0.0,
+            help="Fraction of requests answered with a 503",
+        )
+
+    def handle(self, *args, **options):
+        latency = options["latency"]
+        error_rate = options["error_rate"]
+        stdout = self.stdout
+        lock = threading.Lock()
+        stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "started": None}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with lock:
+                    stats["started"] = stats["started"] or time.monotonic()
+                    stats["requests"] += 1
+                    stats["in_flight"] += 1
+                    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+                    count = stats["requests"]
+                    elapsed = time.monotonic() - stats["started"]
+                    in_flight = stats["in_flight"]
+
+                time.sleep(latency)
+                if random.random() < error_rate:
+                    status, body = 503, {"error": "stub failure"}
+                else:
+                    status, body = 200, {"itemId": str(uuid.uuid4())}
+
+                content = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+                with lock:
+                    stats["in_flight"] -= 1
+                rate = count / elapsed if elapsed else 0
+                stdout.write(
+                    f"#{count} {status} in_flight={in_flight} "
+                    f"max_in_flight={stats['max_in_flight']} rate={rate:.2f}/s"
+                )
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", options["port"]), Handler)
+        self.stdout.write(f"PPA stub listening on http://127.0.0.1:{options['port']}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
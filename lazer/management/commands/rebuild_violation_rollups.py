@@ -0,0 +1,29 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from lazer.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Backfill or rebuild the daily Laser Vision violation rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=datetime.date.fromisoformat,
+            default=None,
+            help="Only rebuild days on or after this date (YYYY-MM-DD, default: all days)",
+        )
+
+    def handle(self, *args, **options):
+        since = options["since"]
+
+        if since:
+            self.stdout.write(f"Rebuilding violation rollups since {since}")
+        else:
+            self.stdout.write("Rebuilding all violation rollups")
+
+        count = rebuild_rollups(since=since)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} rollup rows"))
@@ -0,0 +1,85 @@
+import os
+import time
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+
+from lazer.models import ViolationReport
+from lazer.redaction import RedactionError, plate_boxes, redact_many
+
+
+class Command(BaseCommand):
+    help = "Redact plates and faces for a backlog of violation reports across a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of worker processes (default: number of CPUs)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Maximum number of reports to redact",
+        )
+        parser.add_argument(
+            "--include-submitted",
+            action="store_true",
+            help="Also redact reports that were already submitted to the PPA",
+        )
+
+    def handle(self, *args, **options):
+        reports = (
+            ViolationReport.objects.filter(redacted_image="")
+            .select_related("submission")
+            .order_by("id")
+        )
+        if not options["include_submitted"]:
+            reports = reports.filter(submitted__isnull=True)
+        if options["limit"]:
+            reports = reports[: options["limit"]]
+
+        names = {}
+
+        def jobs():
+            for report in reports.iterator():
+                image = report.submission.image
+                with image.open("rb") as f:
+                    image_bytes = f.read()
+                names[report.id] = os.path.basename(image.name)
+                yield (
+                    report.id,
+                    image_bytes,
+                    plate_boxes(report.submission.plate_recognizer_response),
+                )
+
+        start = time.monotonic()
+        processed = 0
+        redacted = 0
+        failed = 0
+        for report_id, redacted_bytes in redact_many(jobs(), max_workers=options["workers"]):
+            processed += 1
+            image_name = names.pop(report_id)
+            if isinstance(redacted_bytes, RedactionError):
+                self.stderr.write(f"Report {report_id}: {redacted_bytes}")
+                failed += 1
+                continue
+            if redacted_bytes is None:
+                continue
+            report = ViolationReport.objects.get(id=report_id)
+            report.redacted_image.save(
+                f"redacted_{image_name}", ContentFile(redacted_bytes), save=False
+            )
+            report.save(update_fields=["redacted_image"])
+            redacted += 1
+
+        elapsed = time.monotonic() - start
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {processed} reports ({redacted} redacted, {failed} failed) "
+                f"in {elapsed:.1f}s ({rate:.1f}/s)"
+            )
+        )
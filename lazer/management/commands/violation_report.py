@@ -1,65 +1,153 @@
+import csv
 import json
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
 from zoneinfo import ZoneInfo
 
 from django.contrib.gis.geos import GEOSGeometry
 from django.core.management.base import BaseCommand
-from django.db.models import Count
+from django.db.models import (
+    Avg,
+    BigIntegerField,
+    Count,
+    F,
+    FloatField,
+    Func,
+    Max,
+    Min,
+    Q,
+    Value,
+)
+from django.db.models.functions import Cast, NullIf, TruncDate
 
 from lazer.models import ViolationReport
 
+EXPORT_FIELDS = [
+    "id",
+    "captured_at",
+    "period",
+    "violation_observed",
+    "block_number",
+    "street_name",
+    "zip_code",
+    "lat",
+    "lon",
+]
+
+
+class PointX(Func):
+    function = "ST_X"
+    output_field = FloatField()
+
+
+class PointY(Func):
+    function = "ST_Y"
+    output_field = FloatField()
+
+
+def leading_block_number():
+    """
+    The digits of the first word of block_number as an integer, or NULL if
+    there are none.
+    """
+    first_word = Func(
+        F("block_number"), Value(r"^\s*(\S*).*$"), Value(r"\1"), function="regexp_replace"
+    )
+    digits = Func(first_word, Value(r"\D"), Value(""), Value("g"), function="regexp_replace")
+    return Cast(NullIf(digits, Value("")), BigIntegerField())
+
+
+def summarize_violations(violations, comparison_date):
+    """Counts, first/last times and mean location, before and after, in one query."""
+    before = Q(submission__captured_at__lt=comparison_date)
+    after = ~before
+    captured_at = "submission__captured_at"
+    return violations.aggregate(
+        total_count=Count("id"),
+        before_count=Count("id", filter=before),
+        after_count=Count("id", filter=after),
+        first=Min(captured_at),
+        last=Max(captured_at),
+        before_first=Min(captured_at, filter=before),
+        before_last=Max(captured_at, filter=before),
+        after_first=Min(captured_at, filter=after),
+        after_last=Max(captured_at, filter=after),
+        center_lat=Avg(PointY("submission__location")),
+        center_lon=Avg(PointX("submission__location")),
+    )
+
+
+def daily_violation_counts(violations):
+    """Violations per (UTC) day."""
+    return dict(
+        violations.annotate(day=TruncDate("submission__captured_at", tzinfo=dt_timezone.utc))
+        .values("day")
+        .annotate(count=Count("id"))
+        .order_by()
+        .values_list("day", "count")
+    )
+
+
+def violation_rows(violations, comparison_date):
+    """Stream violations as plain dicts, without loading model instances."""
+    rows = violations.values(
+        "id",
+        "violation_observed",
+        "block_number",
+        "street_name",
+        "zip_code",
+        captured_at=F("submission__captured_at"),
+        lat=PointY("submission__location"),
+        lon=PointX("submission__location"),
+    )
+    for row in rows.iterator(chunk_size=2000):
+        row["period"] = "before" if row["captured_at"] < comparison_date else "after"
+        yield row
+
+
+def report_item(row):
+    return {
+        "datetime": row["captured_at"].strftime("%Y-%m-%d %H:%M:%S"),
+        "location": f"{row['block_number']} {row['street_name']}",
+        "type": row["violation_observed"],
+        "lat": row["lat"],
+        "lon": row["lon"],
+        "period": row["period"],
+    }
+
 
 class Command(BaseCommand):
     help = (
         "Generate a report of violations within a GeoJSON polygon, comparing before/after a date"
     )
 
-    def generate_html_report(
+    def iter_html_report(
         self,
         violations,
+        summary,
         polygon,
         comparison_date,
         comparison_date_str,
-        before_count,
-        after_count,
         geojson_data,
         filter_mode,
         street_name=None,
         block_range=None,
     ):
-        """Generate an HTML report with map, chart, and data table."""
-        from collections import defaultdict
-
-        # Prepare data for timeline chart
-        from datetime import timedelta
-
-        daily_counts = defaultdict(int)
-        violation_list = []
-
-        for report in violations:
-            date_str = report.submission.captured_at.strftime("%Y-%m-%d")
-            period = "before" if report.submission.captured_at < comparison_date else "after"
-            daily_counts[date_str] += 1
-
-            # Get violation details
-            violation_type = report.violation_observed
-            location = f"{report.block_number} {report.street_name}"
-
-            violation_list.append(
-                {
-                    "datetime": report.submission.captured_at.strftime("%Y-%m-%d %H:%M:%S"),
-                    "location": location,
-                    "type": violation_type,
-                    "lat": report.submission.location.y,
-                    "lon": report.submission.location.x,
-                    "period": period,
-                }
-            )
+        """
+        Generate an HTML report with map, chart, and data table.
+
+        Yields the document in chunks, streaming the violations from the database
+        for the table and the map so memory stays flat for large areas.
+        """
+        before_count = summary["before_count"]
+        after_count = summary["after_count"]
 
         # Create complete date range (all days including zeros)
-        if violations:
-            min_date = violations.earliest("submission__captured_at").submission.captured_at.date()
-            max_date = violations.latest("submission__captured_at").submission.captured_at.date()
+        if summary["total_count"]:
+            daily_counts = daily_violation_counts(violations)
+            min_date = summary["first"].date()
+            max_date = summary["last"].date()
 
             # Generate all dates in range
             chart_labels = []
@@ -75,7 +163,7 @@ class Command(BaseCommand):
             while current_date <= max_date:
                 date_str = current_date.strftime("%Y-%m-%d")
                 chart_labels.append(date_str)
-                count = daily_counts.get(date_str, 0)
+                count = daily_counts.get(current_date, 0)
 
                 if current_date < comparison_date_only:
                     chart_data_before.append(count)
@@ -104,12 +192,10 @@ class Command(BaseCommand):
         if filter_mode == "geojson" and polygon:
             center_lat = polygon.centroid.y
             center_lon = polygon.centroid.x
-        elif violations:
-            # Calculate center from violations
-            lats = [v.submission.location.y for v in violations]
-            lons = [v.submission.location.x for v in violations]
-            center_lat = sum(lats) / len(lats) if lats else 39.95
-            center_lon = sum(lons) / len(lons) if lons else -75.16
+        elif summary["total_count"]:
+            # Mean of the violation locations
+            center_lat = summary["center_lat"]
+            center_lon = summary["center_lon"]
         else:
             # Default to Philly center
             center_lat = 39.95
@@ -144,7 +230,7 @@ class Command(BaseCommand):
             filter_info = ""
 
         # Generate HTML
-        html = f"""<!DOCTYPE html>
+        yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -421,12 +507,15 @@ class Command(BaseCommand):
                     </tr>
                 </thead>
                 <tbody>
-                    {''.join([f'''<tr>
+                    """
+        for v in map(report_item, violation_rows(violations, comparison_date)):
+            yield f"""<tr>
                             <td>{v['datetime']}</td>
                             <td>{v['location']}</td>
                             <td>{v['type']}</td>
                             <td class="period-{v['period']}">{v['period'].upper()}</td>
-                        </tr>''' for v in violation_list])}
+                        </tr>"""
+        yield f"""
                 </tbody>
             </table>
         </div>
@@ -458,7 +547,11 @@ class Command(BaseCommand):
         {polygon_js}
 
         // Add violation markers
-        const violations = {json.dumps(violation_list)};
+        const violations = """
+        yield "["
+        for i, v in enumerate(map(report_item, violation_rows(violations, comparison_date))):
+            yield f"{', ' if i else ''}{json.dumps(v)}"
+        yield f"""];
         violations.forEach(v => {{
             const color = v.period === 'before' ? '#d8107d' : 'rgb(131, 189, 86)';
             const marker = L.circleMarker([v.lat, v.lon], {{
@@ -596,7 +689,6 @@ class Command(BaseCommand):
 </body>
 </html>
 """
-        return html
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -631,6 +723,21 @@ class Command(BaseCommand):
             type=str,
             help="Generate HTML report and save to this file path",
         )
+        parser.add_argument(
+            "--export",
+            type=str,
+            help="Stream every violation to this file as CSV or GeoJSON",
+        )
+        parser.add_argument(
+            "--export-format",
+            choices=["csv", "geojson"],
+            help="Format for --export (default: from the file extension, else csv)",
+        )
+        parser.add_argument(
+            "--no-list",
+            action="store_true",
+            help="Don't print every violation, for large areas",
+        )
 
     def handle(self, *args, **options):
         # Check that either geojson or street-name is provided
@@ -692,18 +799,14 @@ class Command(BaseCommand):
 
         # Query violation reports based on filter mode
         if filter_mode == "geojson":
-            violations_in_area = (
-                ViolationReport.objects.filter(submission__location__within=polygon)
-                .select_related("submission")
-                .order_by("submission__captured_at")
-            )
+            violations_in_area = ViolationReport.objects.filter(
+                submission__location__within=polygon
+            ).order_by("submission__captured_at")
         else:  # street mode
             # Start with street name filter
-            violations_in_area = (
-                ViolationReport.objects.filter(street_name__icontains=street_name)
-                .select_related("submission")
-                .order_by("submission__captured_at")
-            )
+            violations_in_area = ViolationReport.objects.filter(
+                street_name__icontains=street_name
+            ).order_by("submission__captured_at")
 
             # If block range is provided, filter by it
             if block_range:
@@ -713,20 +816,10 @@ class Command(BaseCommand):
                     min_block = int(min_block.strip())
                     max_block = int(max_block.strip())
 
-                    # Filter by extracting numeric part of block_number
-                    filtered_violations = []
-                    for v in violations_in_area:
-                        try:
-                            # Extract first number from block_number
-                            block_num = int(
-                                "".join(filter(str.isdigit, v.block_number.split()[0]))
-                            )
-                            if min_block <= block_num <= max_block:
-                                filtered_violations.append(v.id)
-                        except (ValueError, AttributeError, IndexError):
-                            pass
-
-                    violations_in_area = violations_in_area.filter(id__in=filtered_violations)
+                    # Filter by the numeric part of the first word of block_number
+                    violations_in_area = violations_in_area.annotate(
+                        block_num=leading_block_number()
+                    ).filter(block_num__gte=min_block, block_num__lte=max_block)
                 else:
                     # Single block number
                     target_block = block_range.strip()
@@ -734,23 +827,19 @@ class Command(BaseCommand):
                         block_number__icontains=target_block
                     )
 
-        total_count = violations_in_area.count()
+        summary = summarize_violations(violations_in_area, comparison_date)
+        total_count = summary["total_count"]
+        before_count = summary["before_count"]
+        after_count = summary["after_count"]
 
         # Split by date
         before = violations_in_area.filter(submission__captured_at__lt=comparison_date)
         after = violations_in_area.filter(submission__captured_at__gte=comparison_date)
 
-        before_count = before.count()
-        after_count = after.count()
-
         # Calculate date ranges for averages
         if total_count > 0:
-            min_date = violations_in_area.earliest(
-                "submission__captured_at"
-            ).submission.captured_at.date()
-            max_date = violations_in_area.latest(
-                "submission__captured_at"
-            ).submission.captured_at.date()
+            min_date = summary["first"].date()
+            max_date = summary["last"].date()
             comparison_date_only = comparison_date.date()
 
             days_before = (comparison_date_only - min_date).days
@@ -777,49 +866,30 @@ class Command(BaseCommand):
         self.stdout.write(f"Comparison date: {comparison_date_str}\n")
         self.stdout.write(f"Total violations in area: {total_count}\n")
 
-        self.stdout.write(self.style.SUCCESS(f"\n{'=' * 60}"))
-        self.stdout.write(self.style.SUCCESS(f"BEFORE {comparison_date_str}"))
-        self.stdout.write(self.style.SUCCESS(f"{'=' * 60}\n"))
-        self.stdout.write(f"Count: {before_count}\n")
-        self.stdout.write(f"Days: {days_before}\n")
-        self.stdout.write(f"Average per day: {avg_before:.2f}\n")
-
-        if before_count > 0:
-            earliest = before.earliest("submission__captured_at")
-            latest = before.latest("submission__captured_at")
-            self.stdout.write(f"First violation: {earliest.submission.captured_at}")
-            self.stdout.write(f"Last violation:  {latest.submission.captured_at}\n")
-
-            # Breakdown by violation type
-            self.stdout.write("Breakdown by violation type:")
-            for report in (
-                before.values("violation_observed").annotate(count=Count("id")).order_by("-count")
-            ):
-                violation_type = report["violation_observed"] or "Unknown"
-                count = report["count"]
-                self.stdout.write(f"  - {violation_type}: {count}")
-
-        self.stdout.write(self.style.SUCCESS(f"\n{'=' * 60}"))
-        self.stdout.write(self.style.SUCCESS(f"AFTER {comparison_date_str}"))
-        self.stdout.write(self.style.SUCCESS(f"{'=' * 60}\n"))
-        self.stdout.write(f"Count: {after_count}\n")
-        self.stdout.write(f"Days: {days_after}\n")
-        self.stdout.write(f"Average per day: {avg_after:.2f}\n")
-
-        if after_count > 0:
-            earliest = after.earliest("submission__captured_at")
-            latest = after.latest("submission__captured_at")
-            self.stdout.write(f"First violation: {earliest.submission.captured_at}")
-            self.stdout.write(f"Last violation:  {latest.submission.captured_at}\n")
-
-            # Breakdown by violation type
-            self.stdout.write("Breakdown by violation type:")
-            for report in (
-                after.values("violation_observed").annotate(count=Count("id")).order_by("-count")
-            ):
-                violation_type = report["violation_observed"] or "Unknown"
-                count = report["count"]
-                self.stdout.write(f"  - {violation_type}: {count}")
+        for period, queryset, count, days, avg in (
+            ("before", before, before_count, days_before, avg_before),
+            ("after", after, after_count, days_after, avg_after),
+        ):
+            self.stdout.write(self.style.SUCCESS(f"\n{'=' * 60}"))
+            self.stdout.write(self.style.SUCCESS(f"{period.upper()} {comparison_date_str}"))
+            self.stdout.write(self.style.SUCCESS(f"{'=' * 60}\n"))
+            self.stdout.write(f"Count: {count}\n")
+            self.stdout.write(f"Days: {days}\n")
+            self.stdout.write(f"Average per day: {avg:.2f}\n")
+
+            if count > 0:
+                self.stdout.write(f"First violation: {summary[f'{period}_first']}")
+                self.stdout.write(f"Last violation:  {summary[f'{period}_last']}\n")
+
+                # Breakdown by violation type
+                self.stdout.write("Breakdown by violation type:")
+                for report in (
+                    queryset.values("violation_observed")
+                    .annotate(count=Count("id"))
+                    .order_by("-count")
+                ):
+                    violation_type = report["violation_observed"] or "Unknown"
+                    self.stdout.write(f"  - {violation_type}: {report['count']}")
 
         # Calculate change
         self.stdout.write(self.style.SUCCESS(f"\n{'=' * 60}"))
@@ -839,67 +909,83 @@ class Command(BaseCommand):
         else:
             self.stdout.write("No violations before comparison date to calculate change.\n")
 
-        # List all violations with details
-        self.stdout.write(self.style.SUCCESS(f"\n{'=' * 60}"))
-        self.stdout.write(self.style.SUCCESS("ALL VIOLATIONS (chronological)"))
-        self.stdout.write(self.style.SUCCESS(f"{'=' * 60}\n"))
-
-        for i, report in enumerate(violations_in_area, 1):
-            period = "BEFORE" if report.submission.captured_at < comparison_date else "AFTER"
+        if not options["no_list"]:
+            # List all violations with details
+            self.stdout.write(self.style.SUCCESS(f"\n{'=' * 60}"))
+            self.stdout.write(self.style.SUCCESS("ALL VIOLATIONS (chronological)"))
+            self.stdout.write(self.style.SUCCESS(f"{'=' * 60}\n"))
+
+            for i, row in enumerate(violation_rows(violations_in_area, comparison_date), 1):
+                self.stdout.write(
+                    f"{i}. [{row['period'].upper()}] {row['captured_at']} - "
+                    f"Lat: {row['lat']:.6f}, Lon: {row['lon']:.6f}"
+                )
+                self.stdout.write(f"   Type: {row['violation_observed']}")
+                self.stdout.write(f"   Location: {row['block_number']} {row['street_name']}")
+
+            self.stdout.write(self.style.SUCCESS(f"\n{'=' * 60}\n"))
+
+        export_path = options.get("export")
+        if export_path:
+            export_format = options.get("export_format") or (
+                "geojson" if export_path.endswith((".geojson", ".json")) else "csv"
+            )
+            rows = violation_rows(violations_in_area, comparison_date)
+            with open(export_path, "w", newline="") as f:
+                if export_format == "geojson":
+                    self.write_geojson(f, rows)
+                else:
+                    self.write_csv(f, rows)
             self.stdout.write(
-                f"{i}. [{period}] {report.submission.captured_at} - "
-                f"Lat: {report.submission.location.y:.6f}, Lon: {report.submission.location.x:.6f}"
+                self.style.SUCCESS(f"\nExported {total_count} violations: {export_path}")
             )
-            self.stdout.write(f"   Type: {report.violation_observed}")
-            self.stdout.write(f"   Location: {report.block_number} {report.street_name}")
-
-        self.stdout.write(self.style.SUCCESS(f"\n{'=' * 60}\n"))
 
         # Generate HTML report if requested
         html_path = options.get("html")
-        if html_path:
-            html_content = self.generate_html_report(
-                violations_in_area,
-                polygon,
-                comparison_date,
-                comparison_date_str,
-                before_count,
-                after_count,
-                geojson_data,
-                filter_mode,
-                street_name,
-                block_range,
-            )
-
-            with open(html_path, "w") as f:
-                f.write(html_content)
-
-            self.stdout.write(self.style.SUCCESS(f"\nHTML report generated: {html_path}"))
-        elif filter_mode == "street" and street_name:
+        if not html_path and filter_mode == "street" and street_name:
             # Auto-generate filename for street mode
-            import re
-
-            # Clean street name for filename
             clean_street = re.sub(r"[^\w\s-]", "", street_name).strip().replace(" ", "_")
             clean_block = (
                 re.sub(r"[^\w\s-]", "", block_range).replace("-", "_") if block_range else "all"
             )
-            auto_filename = f"violation_report_{clean_street}_{clean_block}.html"
-
-            html_content = self.generate_html_report(
-                violations_in_area,
-                polygon,
-                comparison_date,
-                comparison_date_str,
-                before_count,
-                after_count,
-                geojson_data,
-                filter_mode,
-                street_name,
-                block_range,
-            )
+            html_path = f"violation_report_{clean_street}_{clean_block}.html"
+
+        if html_path:
+            with open(html_path, "w") as f:
+                f.writelines(
+                    self.iter_html_report(
+                        violations_in_area,
+                        summary,
+                        polygon,
+                        comparison_date,
+                        comparison_date_str,
+                        geojson_data,
+                        filter_mode,
+                        street_name,
+                        block_range,
+                    )
+                )
 
-            with open(auto_filename, "w") as f:
-                f.write(html_content)
+            self.stdout.write(self.style.SUCCESS(f"\nHTML report generated: {html_path}"))
 
-            self.stdout.write(self.style.SUCCESS(f"\nHTML report generated: {auto_filename}"))
+    def write_csv(self, f, rows):
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, "captured_at": row["captured_at"].isoformat()})
+
+    def write_geojson(self, f, rows):
+        """Write a GeoJSON FeatureCollection one feature at a time."""
+        f.write('{"type": "FeatureCollection", "features": [\n')
+        for i, row in enumerate(rows):
+            properties = {
+                field: row[field] for field in EXPORT_FIELDS if field not in ("lat", "lon")
+            }
+            properties["captured_at"] = row["captured_at"].isoformat()
+            feature = {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [row["lon"], row["lat"]]},
+                "properties": properties,
+            }
+            f.write(f"{',' if i else ''}{json.dumps(feature)}\n")
+        f.write("]}\n")
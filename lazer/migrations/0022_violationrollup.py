@@ -0,0 +1,56 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:28
+
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("facets", "0006_ward"),
+        ("lazer", "0021_merge_0019_banner_0020_violationreport_redacted_image"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ViolationRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("violation_observed", models.CharField()),
+                ("zip_code", models.CharField()),
+                ("cell", django.contrib.gis.db.models.fields.PointField(srid=4326)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "district",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="facets.district",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["day", "violation_observed"], name="lazer_viola_day_881ae5_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "violation_observed", "zip_code", "district", "cell"),
+                        name="unique_violation_rollup",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+    ]
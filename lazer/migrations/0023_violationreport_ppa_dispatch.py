@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lazer", "0022_violationrollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="violationreport",
+            name="ppa_attempts",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="violationreport",
+            name="ppa_last_attempt_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="violationreport",
+            name="ppa_last_error",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="violationreport",
+            name="ppa_next_attempt_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="violationreport",
+            name="ppa_queued_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
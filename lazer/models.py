@@ -89,6 +89,13 @@ class ViolationReport(models.Model):
     service_id = models.CharField(null=True, blank=True)
     submission_response = models.JSONField(null=True, blank=True)
 
+    # PPA dispatch state, see lazer.dispatch
+    ppa_queued_at = models.DateTimeField(null=True, blank=True)
+    ppa_attempts = models.IntegerField(default=0)
+    ppa_last_attempt_at = models.DateTimeField(null=True, blank=True)
+    ppa_next_attempt_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    ppa_last_error = models.TextField(null=True, blank=True)
+
     def is_submitted(self):
         return self.submitted is not None
 
@@ -156,6 +163,38 @@ class ViolationReport(models.Model):
     image_tag_redacted.short_description = "Redacted Image"
 
 
+class ViolationRollup(models.Model):
+    """
+    Daily count of submitted violation reports, keyed by violation type, zip code,
+    council district and a fine spatial grid cell.
+
+    Maintained incrementally as reports are submitted to the PPA, and rebuilt with
+    the rebuild_violation_rollups management command.
+    """
+
+    day = models.DateField()
+    violation_observed = models.CharField()
+    zip_code = models.CharField()
+    district = models.ForeignKey(
+        "facets.District", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    cell = models.PointField(srid=4326)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "violation_observed", "zip_code", "district", "cell"],
+                name="unique_violation_rollup",
+                nulls_distinct=False,
+            )
+        ]
+        indexes = [models.Index(fields=["day", "violation_observed"])]
+
+    def __str__(self):
+        return f"{self.day} {self.violation_observed} {self.zip_code}: {self.count}"
+
+
 class LazerWrapped(models.Model):
     """Shareable year-in-review statistics for Laser Vision users."""
 
@@ -0,0 +1,141 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Matches PIL's default JPEG quality, which redact_image used to save with.
+JPEG_QUALITY = 75
+
+
+class RedactionError(ValueError):
+    """An image with something to redact couldn't be decoded or re-encoded."""
+
+
+@lru_cache(maxsize=1)
+def get_face_cascade():
+    """Load the Haar cascade once per process; it's ~1MB of XML to parse."""
+    return cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+
+def decode_image(image_bytes):
+    """
+    Decode an image to a BGR array, or None if OpenCV can't read it. EXIF
+    orientation is ignored, so pixels stay in the frame Plate Recognizer's boxes
+    are given in, as PIL's Image.open left them.
+    """
+    return cv2.imdecode(
+        np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+    )
+
+
+def detect_faces_in_array(img, max_dimension=1920):
+    """
+    Detect faces in a decoded BGR image.
+
+    Returns a list of dicts with xmin, ymin, xmax, ymax keys in image coordinates.
+    """
+    original_height, original_width = img.shape[:2]
+    scale = 1.0
+
+    # Downsample if image is too large to prevent memory issues
+    if max(original_width, original_height) > max_dimension:
+        scale = max_dimension / max(original_width, original_height)
+        new_width = int(original_width * scale)
+        new_height = int(original_height * scale)
+        img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    faces = get_face_cascade().detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
+
+    # Scale coordinates back to original image size
+    return [
+        {
+            "xmin": int(x / scale),
+            "ymin": int(y / scale),
+            "xmax": int((x + w) / scale),
+            "ymax": int((y + h) / scale),
+        }
+        for (x, y, w, h) in faces
+    ]
+
+
+def plate_boxes(plate_recognizer_response):
+    boxes = []
+    if plate_recognizer_response:
+        for result in plate_recognizer_response.get("results", []):
+            if result.get("plate") and result["plate"].get("box"):
+                boxes.append(result["plate"]["box"])
+    return boxes
+
+
+def redact_image_bytes(image_bytes, boxes=()):
+    """
+    Black out the given boxes and any detected faces in an encoded image.
+
+    The image is decoded once and the same pixel buffer is used for face
+    detection and painting. Returns the re-encoded image bytes, or None if
+    there was nothing to redact. Raises RedactionError if there are boxes to
+    redact but the image can't be decoded or re-encoded, so an unredacted image
+    is never mistaken for one with nothing to hide.
+    """
+    img = decode_image(image_bytes)
+    if img is None:
+        if boxes:
+            raise RedactionError("Could not decode image to redact")
+        return None
+
+    boxes = [*boxes, *detect_faces_in_array(img)]
+    if not boxes:
+        return None
+
+    for box in boxes:
+        cv2.rectangle(
+            img,
+            (int(box["xmin"]), int(box["ymin"])),
+            (int(box["xmax"]), int(box["ymax"])),
+            color=(0, 0, 0),
+            thickness=cv2.FILLED,
+        )
+
+    if image_bytes.startswith(PNG_SIGNATURE):
+        ok, encoded = cv2.imencode(".png", img)
+    else:
+        ok, encoded = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    if not ok:
+        raise RedactionError("Could not encode redacted image")
+    return encoded.tobytes()
+
+
+def _redact_job(job):
+    key, image_bytes, boxes = job
+    try:
+        return key, redact_image_bytes(image_bytes, boxes)
+    except RedactionError as e:
+        return key, e
+
+
+def redact_many(jobs, max_workers=None, max_pending=None):
+    """
+    Redact (key, image_bytes, boxes) jobs across a pool of worker processes.
+
+    Yields (key, redacted_bytes_or_None) in submission order, or (key, error)
+    with the RedactionError for an image that couldn't be redacted. At most
+    max_pending jobs (default twice the worker count) are held in memory at
+    once, so jobs can be a lazy generator over a large backlog.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or max_workers * 2
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=get_face_cascade) as pool:
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(_redact_job, job))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,73 @@
+from django.contrib.gis.db.models.functions import SnapToGrid
+from django.contrib.gis.geos import Point
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from facets.locator import get_locator
+from facets.models import District
+from lazer.models import ViolationReport, ViolationRollup
+from lazer.tiles import MIN_CELL_SIZE
+
+# Rollup cells are stored at the finest resolution the heatmap will ever bin to,
+# so tiles at any zoom level can re-snap them.
+ROLLUP_CELL_SIZE = MIN_CELL_SIZE
+
+
+def snap_point(point, size=ROLLUP_CELL_SIZE):
+    """Snap a point to the grid the same way PostGIS ST_SnapToGrid does."""
+    return Point(round(point.x / size) * size, round(point.y / size) * size, srid=4326)
+
+
+def rollup_key(violation_report):
+    location = violation_report.submission.location
+    return {
+        "day": timezone.localdate(violation_report.submission.captured_at),
+        "violation_observed": violation_report.violation_observed,
+        "zip_code": violation_report.zip_code,
+        "district": District.objects.filter(pk=get_locator().first(District, location)).first(),
+        "cell": snap_point(location),
+    }
+
+
+def record_violation_report(violation_report, delta=1):
+    """Add (or with a negative delta, remove) a submitted report from the rollups."""
+    with transaction.atomic():
+        rollup, _ = ViolationRollup.objects.get_or_create(**rollup_key(violation_report))
+        ViolationRollup.objects.filter(id=rollup.id).update(count=F("count") + delta)
+
+
+def rebuild_rollups(since=None):
+    """
+    Recompute rollups from raw reports in a single grouped query.
+
+    If since is given, only days on or after it are rebuilt.
+    Returns the number of rollup rows written.
+    """
+    reports = ViolationReport.objects.filter(submitted__isnull=False)
+    rollups = ViolationRollup.objects.all()
+    if since is not None:
+        reports = reports.filter(submission__captured_at__date__gte=since)
+        rollups = rollups.filter(day__gte=since)
+
+    district = District.objects.filter(mpoly__contains=OuterRef("submission__location")).values(
+        "id"
+    )[:1]
+    rows = (
+        reports.annotate(
+            day=TruncDate("submission__captured_at"),
+            cell=SnapToGrid("submission__location", ROLLUP_CELL_SIZE),
+            district_id=Subquery(district),
+        )
+        .values("day", "violation_observed", "zip_code", "district_id", "cell")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        rollups.delete()
+        created = ViolationRollup.objects.bulk_create(
+            [ViolationRollup(**row) for row in rows.iterator()], batch_size=1000
+        )
+    return len(created)
@@ -1,12 +1,19 @@
-from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+from django.contrib.sessions.backends.cached_db import (
+    SessionStore as CachedDBSessionStore,
+)
 
 
-class SessionStore(DBSessionStore):
+class SessionStore(CachedDBSessionStore):
     """
     Session store that uses the LazerSession model instead of the default Session model.
     Lazer sessions are only valid for Lazer API routes and have a longer expiry (1 year).
+
+    Sessions are read from the cache and written through to the lazer_session table,
+    so existing sessions keep working and are cached on first use.
     """
 
+    cache_key_prefix = "lazer.session_backend"
+
     @classmethod
     def get_model_class(cls):
         from lazer.models import LazerSession
@@ -1,14 +1,17 @@
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from lazer.models import ViolationReport
+from lazer.rollups import record_violation_report
 from lazer.tasks import submit_violation_report_discord, submit_violation_report_to_ppa
 
 
 @receiver(post_save, sender=ViolationReport, dispatch_uid="violation_report_post_save")
 def violation_report_post_save(sender, instance, created, update_fields, **kwargs):
     if instance.submitted is not None:
+        if created:
+            record_violation_report(instance)
         return
     if created:
         if (
@@ -20,3 +23,9 @@ def violation_report_post_save(sender, instance, created, update_fields, **kwarg
             transaction.on_commit(lambda: submit_violation_report_to_ppa.delay(instance.id))
         else:
             transaction.on_commit(lambda: submit_violation_report_discord.delay(instance.id))
+
+
+@receiver(post_delete, sender=ViolationReport, dispatch_uid="violation_report_post_delete")
+def violation_report_post_delete(sender, instance, **kwargs):
+    if instance.submitted is not None:
+        record_violation_report(instance, delta=-1)
@@ -3,18 +3,28 @@ from asgiref.sync import async_to_sync
 from celery import shared_task
 from django.conf import settings
 
+from lazer.dispatch import dispatch, queue_violation_reports
 from lazer.models import ViolationReport
 from lazer.utils import build_embed
-from lazer.utils import (
-    submit_violation_report_to_ppa as _submit_violation_report_to_ppa,
-)
 from pba_discord.bot import bot
 
 
 @shared_task
 def submit_violation_report_to_ppa(violation_id):
-    violation_report = ViolationReport.objects.select_related("submission").get(id=violation_id)
-    _submit_violation_report_to_ppa(violation_report)
+    queue_violation_reports(ViolationReport.objects.filter(id=violation_id))
+    dispatch_ppa_submissions.delay()
+
+
+@shared_task
+def dispatch_ppa_submissions():
+    """
+    Work through one batch of due PPA submissions, re-enqueueing if there may be
+    more, so a backlog doesn't hold the worker. Also runs on a beat schedule to
+    pick up retries.
+    """
+    outcomes = dispatch(limit=settings.PPA_DISPATCH_BATCH_SIZE)
+    if outcomes is not None and sum(outcomes.values()) >= settings.PPA_DISPATCH_BATCH_SIZE:
+        dispatch_ppa_submissions.delay()
 
 
 async def _submit_violation_report_discord(violation_id):
@@ -0,0 +1,67 @@
+import datetime
+import json
+
+from django.contrib.gis.geos import Point
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from lazer.models import ViolationReport, ViolationSubmission
+from lazer.rollups import rebuild_rollups
+from lazer.views import filter_map_queryset, map_tile
+
+
+class MapRollupTestCase(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.captured = [
+            ("Parked in a bike lane", now - datetime.timedelta(days=3)),
+            ("Parked in a bike lane", now - datetime.timedelta(days=1)),
+            ("Blocking a crosswalk", now - datetime.timedelta(days=1)),
+            ("Parked in a bike lane", now - datetime.timedelta(minutes=5)),
+        ]
+        for i, (violation, captured_at) in enumerate(self.captured):
+            submission = ViolationSubmission.objects.create(
+                captured_at=captured_at,
+                location=Point(-75.16 + i * 0.01, 39.95, srid=4326),
+                image="lazer/violations/test.jpg",
+            )
+            ViolationReport.objects.create(
+                submission=submission,
+                date_observed="",
+                time_observed="",
+                make="Honda",
+                body_style="Sedan",
+                vehicle_color="Black",
+                violation_observed=violation,
+                occurrence_frequency="Once",
+                block_number="1300",
+                street_name="Spruce St",
+                zip_code="19107",
+            )
+        ViolationReport.objects.update(submitted=now)
+        rebuild_rollups()
+
+    def tile_total(self, **params):
+        request = RequestFactory().get("/", params)
+        cells = json.loads(map_tile.__wrapped__(request, 0, 0, 0).content)["cells"]
+        return sum(total for _, _, total in cells)
+
+    def assertTileMatchesReports(self, **params):
+        request = RequestFactory().get("/", params)
+        self.assertEqual(self.tile_total(**params), filter_map_queryset(request).count())
+
+    def test_tiles_match_reports(self):
+        """Tiles built from rollups count the same reports as the raw queryset"""
+        days = [timezone.localdate(captured_at).isoformat() for _, captured_at in self.captured]
+        self.assertTileMatchesReports()
+        self.assertTileMatchesReports(violation="Parked")
+        self.assertTileMatchesReports(date=days[1])
+        self.assertTileMatchesReports(date_gte=days[1])
+        # date_lte=<day> on reports stops at midnight starting that day
+        self.assertTileMatchesReports(date_lte=days[1])
+        self.assertTileMatchesReports(violation="Parked", date_gte=days[0], date_lte=days[3])
+
+    def test_recent_reports_hidden_by_violation_filter(self):
+        """Filtering by violation hides reports captured in the last 15 minutes"""
+        self.assertEqual(self.tile_total(), 4)
+        self.assertEqual(self.tile_total(violation="Parked"), 2)
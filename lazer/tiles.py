@@ -0,0 +1,38 @@
+import math
+
+from django.contrib.gis.geos import Polygon
+
+# Cells per tile edge. Leaflet tiles are 256px, so each cell covers ~8px,
+# a bit smaller than the heatmap radius.
+CELLS_PER_TILE = 32
+
+# Never bin finer than roughly a city block, the same scale that
+# randomize_lat_long smears individual pins by.
+MIN_CELL_SIZE = 0.0005
+
+MAX_ZOOM = 20
+
+
+def tile_bounds(z, x, y):
+    """
+    Return (west, south, east, north) in degrees for slippy map tile z/x/y.
+    """
+    n = 2**z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return west, south, east, north
+
+
+def tile_polygon(z, x, y):
+    return Polygon.from_bbox(tile_bounds(z, x, y))
+
+
+def cell_size(z):
+    """Grid size in degrees used to bin points at zoom level z."""
+    return max(360.0 / 2**z / CELLS_PER_TILE, MIN_CELL_SIZE)
+
+
+def valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z
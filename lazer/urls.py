@@ -4,6 +4,11 @@ from lazer import views
 
 urlpatterns = [
     path("api/submit/", views.submission_api, name="violation_submission_api"),
+    path(
+        "api/submit/upload/",
+        views.submission_upload_api,
+        name="violation_submission_upload_api",
+    ),
     path("api/report/", views.report_api, name="violation_report_api"),
     path("api/login/", views.login_api, name="login_api"),
     path("api/logout/", views.logout_api, name="logout_api"),
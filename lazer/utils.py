@@ -5,13 +5,18 @@ import os
 import urllib.parse
 from io import BytesIO
 
-import cv2
 import interactions
-import numpy as np
 import requests
 from django.conf import settings
 from django.utils import timezone
-from PIL import Image, ImageDraw
+
+from lazer.redaction import (
+    decode_image,
+    detect_faces_in_array,
+    plate_boxes,
+    redact_image_bytes,
+)
+from lazer.rollups import record_violation_report
 
 
 def detect_faces(image_bytes, max_dimension=1920):
@@ -25,37 +30,10 @@ def detect_faces(image_bytes, max_dimension=1920):
     Returns:
         List of dicts with xmin, ymin, xmax, ymax keys (in original image coordinates)
     """
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    img = decode_image(image_bytes)
     if img is None:
         return []
-
-    original_height, original_width = img.shape[:2]
-    scale = 1.0
-
-    # Downsample if image is too large to prevent memory issues
-    if max(original_width, original_height) > max_dimension:
-        scale = max_dimension / max(original_width, original_height)
-        new_width = int(original_width * scale)
-        new_height = int(original_height * scale)
-        img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
-
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-    faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
-
-    # Scale coordinates back to original image size
-    return [
-        {
-            "xmin": int(x / scale),
-            "ymin": int(y / scale),
-            "xmax": int((x + w) / scale),
-            "ymax": int((y + h) / scale),
-        }
-        for (x, y, w, h) in faces
-    ]
+    return detect_faces_in_array(img, max_dimension=max_dimension)
 
 
 def redact_image(image_file, plate_recognizer_response):
@@ -64,78 +42,75 @@ def redact_image(image_file, plate_recognizer_response):
 
     Returns:
         BytesIO with redacted image, or None if nothing to redact
+
+    Raises:
+        RedactionError if there are plates to redact but the image can't be decoded
     """
     image_file.seek(0)
-    image_bytes = image_file.read()
-
-    boxes = []
-
-    if plate_recognizer_response:
-        for result in plate_recognizer_response.get("results", []):
-            if result.get("plate") and result["plate"].get("box"):
-                boxes.append(result["plate"]["box"])
+    redacted = redact_image_bytes(image_file.read(), plate_boxes(plate_recognizer_response))
+    if redacted is None:
+        return None
+    return BytesIO(redacted)
 
-    face_boxes = detect_faces(image_bytes)
-    boxes.extend(face_boxes)
 
-    if not boxes:
+def ppa_api_url():
+    """
+    The Power Automate trigger URL, PPA_API_URL if set (e.g. a local stub server),
+    or None in DEBUG mode when no override is configured.
+    """
+    if settings.PPA_API_URL:
+        return settings.PPA_API_URL
+    if settings.DEBUG:
         return None
 
-    image = Image.open(BytesIO(image_bytes))
-    if image.mode in ("RGBA", "P"):
-        image = image.convert("RGB")
+    domain = settings.PPA_API_DOMAIN
+    workflow = settings.PPA_API_WORKFLOW
+    sig = settings.PPA_API_SIG
 
-    draw = ImageDraw.Draw(image)
-    for box in boxes:
-        draw.rectangle(
-            [box["xmin"], box["ymin"], box["xmax"], box["ymax"]],
-            fill="black",
+    if not all([domain, workflow, sig]):
+        raise ValueError(
+            "PPA API settings (PPA_API_DOMAIN, PPA_API_WORKFLOW, PPA_API_SIG) "
+            "must be configured"
         )
 
-    output = BytesIO()
-    image.save(output, format=image.format or "JPEG")
-    output.seek(0)
-    return output
-
+    return (
+        f"https://{domain}:443/powerautomate/automations/direct/workflows/{workflow}"
+        f"/triggers/manual/paths/invoke?api-version=1"
+        f"&sp={urllib.parse.quote('/triggers/manual/run')}&sv=1.0&sig={sig}"
+    )
 
-def submit_violation_report_to_ppa(violation_report):
-    """Submit a violation report to PPA via Power Automate API."""
-    violation_report.screenshot_error.delete()
 
-    if not settings.DEBUG:
-        domain = settings.PPA_API_DOMAIN
-        workflow = settings.PPA_API_WORKFLOW
-        sig = settings.PPA_API_SIG
+def submit_violation_report_to_ppa(violation_report, session=None, timeout=None):
+    """
+    Submit a violation report to PPA via Power Automate API.
 
-        if not all([domain, workflow, sig]):
-            raise ValueError(
-                "PPA API settings (PPA_API_DOMAIN, PPA_API_WORKFLOW, PPA_API_SIG) "
-                "must be configured"
-            )
+    Pass a requests.Session to reuse connections across submissions.
+    """
+    violation_report.screenshot_error.delete()
 
-        url = (
-            f"https://{domain}:443/powerautomate/automations/direct/workflows/{workflow}"
-            f"/triggers/manual/paths/invoke?api-version=1"
-            f"&sp={urllib.parse.quote('/triggers/manual/run')}&sv=1.0&sig={sig}"
-        )
+    url = ppa_api_url()
 
     image = violation_report.submission.image
     image_name = os.path.basename(image.name)
     content_type = mimetypes.guess_type(image_name)[0] or "image/jpeg"
 
     plate_recognizer_response = violation_report.submission.plate_recognizer_response
-    redacted_image = redact_image(image, plate_recognizer_response)
-
-    if redacted_image:
-        from django.core.files.base import ContentFile
+    if violation_report.redacted_image:
+        # Already redacted, e.g. by the redact_violation_reports command
+        with violation_report.redacted_image.open("rb") as f:
+            redacted_image = BytesIO(f.read())
+    else:
+        redacted_image = redact_image(image, plate_recognizer_response)
+        if redacted_image:
+            from django.core.files.base import ContentFile
 
-        redacted_image.seek(0)
-        violation_report.redacted_image.save(
-            f"redacted_{image_name}",
-            ContentFile(redacted_image.read()),
-            save=True,
-        )
+            violation_report.redacted_image.save(
+                f"redacted_{image_name}",
+                ContentFile(redacted_image.getvalue()),
+                save=True,
+            )
 
+    if redacted_image:
         redacted_image.seek(0)
         image_content = base64.b64encode(redacted_image.read()).decode("utf-8")
     else:
@@ -172,7 +147,7 @@ def submit_violation_report_to_ppa(violation_report):
         f"Submitting violation report to PPA API (attachment size: {len(image_content)} bytes)"
     )
 
-    if settings.DEBUG:
+    if url is None:
         import json
 
         from django.core.files.base import ContentFile
@@ -219,17 +194,23 @@ def submit_violation_report_to_ppa(violation_report):
 
         return
 
-    response = requests.post(url, json=payload, headers=headers, timeout=60)
+    response = (session or requests).post(
+        url, json=payload, headers=headers, timeout=timeout or settings.PPA_API_TIMEOUT
+    )
     response.raise_for_status()
 
     response_data = response.json()
     service_id = response_data.get("itemId")
 
+    was_submitted = violation_report.submitted is not None
     violation_report.submitted = timezone.now()
     violation_report.service_id = service_id
     violation_report.submission_response = response_data
     violation_report.save()
 
+    if not was_submitted:
+        record_violation_report(violation_report)
+
 
 def build_embed(violation_report):
     embed = interactions.Embed(
@@ -2,18 +2,19 @@ import asyncio
 import base64
 import datetime
 import json
+import os
 import secrets
 from functools import wraps
-from importlib import import_module
 
 import pytz
 from asgiref.sync import sync_to_async
-from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model, logout
+from django.contrib.gis.db.models.functions import SnapToGrid
 from django.contrib.gis.geos import Point
 from django.core.files.base import ContentFile
 from django.core.paginator import Paginator
 from django.db import transaction
+from django.db.models import Count, Sum
 from django.http import JsonResponse
 from django.shortcuts import render
 from django.utils import timezone
@@ -22,14 +23,27 @@ from django.views.decorators.csrf import csrf_exempt
 
 from campaigns.admin import randomize_lat_long
 from facets.utils import reverse_geocode_point
-from lazer.forms import ReportForm, SubmissionForm
-from lazer.integrations.platerecognizer import read_plate
+from lazer import tiles
+from lazer.auth import (
+    asession_user,
+    end_session,
+    session_key_from_request,
+    session_user,
+)
+from lazer.forms import ReportForm, SubmissionForm, SubmissionUploadForm
+from lazer.integrations.platerecognizer import read_plate, read_plate_file
 from lazer.integrations.submit_form import MobilityAccessViolation
-from lazer.models import Banner, LazerWrapped, ViolationReport, ViolationSubmission
+from lazer.models import (
+    Banner,
+    LazerWrapped,
+    ViolationReport,
+    ViolationRollup,
+    ViolationSubmission,
+)
+from lazer.rollups import ROLLUP_CELL_SIZE
 from lazer.session_backend import SessionStore as LazerSessionStore
+from lazer.wrapped import wrapped_stats
 
-# Keep the default session store for backwards compatibility with existing sessions
-DjangoSessionStore = import_module(settings.SESSION_ENGINE).SessionStore
 User = get_user_model()
 
 
@@ -52,21 +66,13 @@ def api_auth(view_func):
     def _wrapped_view(request, *args, **kwargs):
         if request.user.is_authenticated:
             return view_func(request, *args, **kwargs)
-        if "Authorization" in request.headers and request.headers["Authorization"].startswith(
-            "Session: "
-        ):
-            session_key = request.headers["Authorization"].split("Session: ")[1]
-            # Try LazerSessionStore first, then fall back to Django's session store
-            for store_class in (LazerSessionStore, DjangoSessionStore):
-                session = store_class(session_key=session_key)
-                user_id = session.get("_auth_user_id")
-                if user_id:
-                    try:
-                        request.user = User.objects.get(id=user_id)
-                        request.session = session
-                        return view_func(request, *args, **kwargs)
-                    except User.DoesNotExist:
-                        pass
+        session_key = session_key_from_request(request)
+        if session_key:
+            user, session = session_user(session_key)
+            if user is not None:
+                request.user = user
+                request.session = session
+                return view_func(request, *args, **kwargs)
         return JsonResponse({"error": "invalid auth"}, status=403)
 
     return _wrapped_view
@@ -78,26 +84,38 @@ def aapi_auth(view_func):
         _user = await request.auser()
         if _user.is_authenticated:
             return await view_func(request, *args, **kwargs)
-        if "Authorization" in request.headers and request.headers["Authorization"].startswith(
-            "Session: "
-        ):
-            session_key = request.headers["Authorization"].split("Session: ")[1]
-            # Try LazerSessionStore first, then fall back to Django's session store
-            for store_class in (LazerSessionStore, DjangoSessionStore):
-                session = store_class(session_key=session_key)
-                user_id = await session.aget("_auth_user_id")
-                if user_id:
-                    try:
-                        request.user = await User.objects.aget(id=user_id)
-                        request.session = session
-                        return await view_func(request, *args, **kwargs)
-                    except User.DoesNotExist:
-                        pass
+        session_key = session_key_from_request(request)
+        if session_key:
+            user, session = await asession_user(session_key)
+            if user is not None:
+                request.user = user
+                request.session = session
+                return await view_func(request, *args, **kwargs)
         return JsonResponse({"error": "invalid auth"}, status=403)
 
     return _wrapped_view
 
 
+def _submission_response(form, submission, data, addresses):
+    vehicles = data.get("results", [])
+    return JsonResponse(
+        {
+            "vehicles": (
+                sorted(
+                    [v for v in vehicles if v.get("vehicle") is not None],
+                    key=lambda x: x.get("vehicle", {}).get("score", 0),
+                    reverse=True,
+                )[:4]
+            ),
+            "addresses": [address.address for address in addresses],
+            "address": addresses[0].address,
+            "timestamp": form.cleaned_data["datetime"],
+            "submissionId": submission.submission_id,
+        },
+        status=200,
+    )
+
+
 @aapi_auth
 @csrf_exempt
 @transaction.non_atomic_requests
@@ -134,23 +152,56 @@ async def submission_api(request):
             submission.plate_recognizer_response = data
             await submission.asave()
 
-            vehicles = data.get("results", [])
-            return JsonResponse(
-                {
-                    "vehicles": (
-                        sorted(
-                            [v for v in vehicles if v.get("vehicle") is not None],
-                            key=lambda x: x.get("vehicle", {}).get("score", 0),
-                            reverse=True,
-                        )[:4]
-                    ),
-                    "addresses": [address.address for address in addresses],
-                    "address": addresses[0].address,
-                    "timestamp": form.cleaned_data["datetime"],
-                    "submissionId": submission.submission_id,
-                },
-                status=200,
+            return _submission_response(form, submission, data, addresses)
+        else:
+            return JsonResponse({}, status=400)
+
+
+@aapi_auth
+@csrf_exempt
+@transaction.non_atomic_requests
+async def submission_upload_api(request):
+    """
+    Binary upload variant of submission_api.
+
+    The photo arrives as a multipart file, which Django spools to disk in
+    chunks instead of holding a base64 copy in memory. It is streamed to
+    storage, and sent on to Plate Recognizer from the local upload rather than
+    read back from storage.
+    """
+    if request.method == "POST":
+        form = SubmissionUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["image"]
+            if not (upload.content_type or "").startswith("image/"):
+                return JsonResponse({"error": "image must be an image"}, status=400)
+            upload.name = f"{secrets.token_hex(20)}{os.path.splitext(upload.name)[1].lower()}"
+            user = await get_user_from_request(request)
+
+            submission = ViolationSubmission(
+                image=upload,
+                location=Point(
+                    float(form.cleaned_data["longitude"]), float(form.cleaned_data["latitude"])
+                ),
+                captured_at=form.cleaned_data["datetime"],
+                created_by=user,
+            )
+            await submission.asave()
+            await submission.arefresh_from_db()
+
+            data, addresses = await asyncio.gather(
+                read_plate_file(upload, datetime.datetime.now(datetime.timezone.utc)),
+                reverse_geocode_point(
+                    f"{form.cleaned_data['latitude']}, {form.cleaned_data['longitude']}",
+                    exactly_one=False,
+                ),
             )
+
+            # Store the Plate Recognizer response for later use (e.g., redacting plates)
+            submission.plate_recognizer_response = data
+            await submission.asave()
+
+            return _submission_response(form, submission, data, addresses)
         else:
             return JsonResponse({}, status=400)
 
@@ -216,39 +267,89 @@ async def report_api(request):
             return JsonResponse({"submitted": False}, status=400)
 
 
-@cache_page(30)
-def map_data(request):
+def _parse_map_date(value):
+    return (
+        datetime.datetime.strptime(value, "%Y-%m-%d")
+        .astimezone(pytz.timezone("America/New_York"))
+        .date()
+    )
+
+
+# Filtering the heatmap by violation hides reports captured within this long
+MAP_VIOLATION_DELAY = datetime.timedelta(minutes=15)
+
+
+def filter_map_queryset(request):
+    """Apply the heatmap's violation/date query parameters to submitted reports."""
     violation_filter = request.GET.get("violation", None)
     date_gte = request.GET.get("date_gte", None)
     date_lte = request.GET.get("date_lte", None)
     date = request.GET.get("date", None)
 
-    pins = []
-    queryset = ViolationReport.objects.filter(submitted__isnull=False).select_related("submission")
+    queryset = ViolationReport.objects.filter(submitted__isnull=False)
     if violation_filter:
         queryset = queryset.filter(violation_observed__startswith=violation_filter).filter(
-            submission__captured_at__lt=timezone.now() - datetime.timedelta(minutes=15)
+            submission__captured_at__lt=timezone.now() - MAP_VIOLATION_DELAY
         )
 
     if date:
+        queryset = queryset.filter(submission__captured_at__date=_parse_map_date(date))
+    else:
+        if date_gte:
+            queryset = queryset.filter(submission__captured_at__gte=_parse_map_date(date_gte))
+        if date_lte:
+            queryset = queryset.filter(submission__captured_at__lte=_parse_map_date(date_lte))
+
+    return queryset
+
+
+def _delayed_day():
+    """First day that may have reports a violation filter still hides."""
+    return timezone.localdate(timezone.now() - MAP_VIOLATION_DELAY)
+
+
+def filter_map_rollups(request):
+    """
+    Apply the same query parameters as filter_map_queryset to the daily rollups.
+
+    With a violation filter, days that may have reports captured too recently to
+    show are left out, as rollups can't tell those apart. Counts for those days
+    come from filter_map_recent_reports instead.
+    """
+    violation_filter = request.GET.get("violation", None)
+    date_gte = request.GET.get("date_gte", None)
+    date_lte = request.GET.get("date_lte", None)
+    date = request.GET.get("date", None)
+
+    queryset = ViolationRollup.objects.all()
+    if violation_filter:
         queryset = queryset.filter(
-            submission__captured_at__date=datetime.datetime.strptime(date, "%Y-%m-%d")
-            .astimezone(pytz.timezone("America/New_York"))
-            .date()
+            violation_observed__startswith=violation_filter, day__lt=_delayed_day()
         )
+
+    if date:
+        queryset = queryset.filter(day=_parse_map_date(date))
     else:
         if date_gte:
-            queryset = queryset.filter(
-                submission__captured_at__gte=datetime.datetime.strptime(date_gte, "%Y-%m-%d")
-                .astimezone(pytz.timezone("America/New_York"))
-                .date()
-            )
+            queryset = queryset.filter(day__gte=_parse_map_date(date_gte))
         if date_lte:
-            queryset = queryset.filter(
-                submission__captured_at__lte=datetime.datetime.strptime(date_lte, "%Y-%m-%d")
-                .astimezone(pytz.timezone("America/New_York"))
-                .date()
-            )
+            # captured_at__lte=<date> on reports stops at midnight starting that day
+            queryset = queryset.filter(day__lt=_parse_map_date(date_lte))
+
+    return queryset
+
+
+def filter_map_recent_reports(request):
+    """The reports filter_map_rollups leaves out, on the days it skips."""
+    if not request.GET.get("violation", None):
+        return ViolationReport.objects.none()
+    return filter_map_queryset(request).filter(submission__captured_at__date__gte=_delayed_day())
+
+
+@cache_page(30)
+def map_data(request):
+    pins = []
+    queryset = filter_map_queryset(request).select_related("submission")
 
     # Count unique users who submitted violations
     unique_users = set()
@@ -263,6 +364,55 @@ def map_data(request):
     return JsonResponse({"pins": pins, "unique_users_count": len(unique_users)}, safe=False)
 
 
+@cache_page(30)
+def map_tile(request, z, x, y):
+    """
+    Return report counts binned to a grid for slippy map tile z/x/y.
+
+    Reads the daily rollups and re-bins their cells in PostGIS, so the work
+    depends on the number of occupied cells rather than the number of reports.
+    Reports on days the rollups can't be used for are snapped to rollup cells
+    and binned alongside them.
+    """
+    if not tiles.valid_tile(z, x, y):
+        return JsonResponse({"error": "invalid tile"}, status=400)
+
+    tile = tiles.tile_polygon(z, x, y)
+    size = tiles.cell_size(z)
+    rollups = (
+        filter_map_rollups(request)
+        .filter(cell__contained=tile)
+        .annotate(bin=SnapToGrid("cell", size))
+        .values("bin")
+        .annotate(total=Sum("count"))
+        .order_by()
+    )
+    recent = (
+        filter_map_recent_reports(request)
+        .annotate(cell=SnapToGrid("submission__location", ROLLUP_CELL_SIZE))
+        .filter(cell__contained=tile)
+        .annotate(bin=SnapToGrid("cell", size))
+        .values("bin")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+
+    totals = {}
+    for cell in [*rollups, *recent]:
+        key = (cell["bin"].y, cell["bin"].x)
+        totals[key] = totals.get(key, 0) + cell["total"]
+    return JsonResponse({"cells": [[lat, lng, total] for (lat, lng), total in totals.items()]})
+
+
+@cache_page(30)
+def map_stats(request):
+    stats = filter_map_queryset(request).aggregate(
+        count=Count("id"),
+        unique_users_count=Count("submission__created_by", distinct=True),
+    )
+    return JsonResponse(stats)
+
+
 def map(request):
     return render(request, "heatmap.html")
 
@@ -353,6 +503,9 @@ def check_login(request):
 
 
 def logout_api(request):
+    session_key = session_key_from_request(request)
+    if session_key:
+        end_session(session_key)
     logout(request)
     return JsonResponse({"success": "ok"}, status=200)
 
@@ -373,191 +526,7 @@ def banner_api(request):
 
 def calculate_wrapped_stats(user, year):
     """Calculate all wrapped statistics for a user and year."""
-    from collections import Counter
-
-    from django.db.models import Count
-
-    # Get all submitted reports for this user in the given year
-    reports = ViolationReport.objects.filter(
-        submission__created_by=user,
-        submitted__isnull=False,
-        submission__captured_at__year=year,
-    ).select_related("submission")
-
-    total_reports = reports.count()
-    if total_reports == 0:
-        return None
-
-    # Calculate community stats for comparison
-    user_report_counts = (
-        ViolationReport.objects.filter(
-            submitted__isnull=False,
-            submission__captured_at__year=year,
-            submission__created_by__isnull=False,
-        )
-        .values("submission__created_by")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-
-    all_counts = [u["count"] for u in user_report_counts]
-    total_users = len(all_counts)
-    total_community_reports = sum(all_counts)
-    avg_reports = total_community_reports / total_users if total_users > 0 else 0
-
-    # Find user's rank
-    rank = 1
-    for u in user_report_counts:
-        if u["submission__created_by"] == user.id:
-            break
-        rank += 1
-
-    # Calculate percentile (what percentage of users they beat)
-    percentile = int(((total_users - rank) / total_users) * 100) if total_users > 0 else 0
-
-    # Calculate what percentage of total reports this user contributed
-    percent_of_total = (
-        round((total_reports / total_community_reports) * 100, 1)
-        if total_community_reports > 0
-        else 0
-    )
-
-    # Total submissions (unique images submitted)
-    total_submissions = (
-        ViolationSubmission.objects.filter(created_by=user, captured_at__year=year)
-        .distinct()
-        .count()
-    )
-
-    # Violations by type
-    violation_counts = Counter()
-    street_counts = Counter()
-    zip_counts = Counter()
-    month_counts = Counter()
-    first_date = None
-
-    day_counts = Counter()
-
-    for report in reports:
-        # Count violation types (use short form)
-        violation_type = report.violation_observed.split(" (")[0]
-        violation_counts[violation_type] += 1
-
-        # Count streets
-        street_counts[report.street_name] += 1
-
-        # Count zip codes
-        zip_counts[report.zip_code] += 1
-
-        # Count by month
-        month = report.submission.captured_at.month
-        month_counts[month] += 1
-
-        # Count by day
-        report_date = report.submission.captured_at.date()
-        day_counts[report_date] += 1
-
-        # Track first report date
-        if first_date is None or report_date < first_date:
-            first_date = report_date
-
-    # Calculate longest streak
-    sorted_days = sorted(day_counts.keys())
-    longest_streak = 0
-    longest_streak_start = None
-    longest_streak_end = None
-    longest_streak_reports = 0
-
-    current_streak = 1
-    current_streak_start = sorted_days[0] if sorted_days else None
-    current_streak_reports = day_counts[sorted_days[0]] if sorted_days else 0
-
-    for i in range(1, len(sorted_days)):
-        if (sorted_days[i] - sorted_days[i - 1]).days == 1:
-            current_streak += 1
-            current_streak_reports += day_counts[sorted_days[i]]
-        else:
-            if current_streak > longest_streak:
-                longest_streak = current_streak
-                longest_streak_start = current_streak_start
-                longest_streak_end = sorted_days[i - 1]
-                longest_streak_reports = current_streak_reports
-            current_streak = 1
-            current_streak_start = sorted_days[i]
-            current_streak_reports = day_counts[sorted_days[i]]
-
-    # Check final streak
-    if current_streak > longest_streak:
-        longest_streak = current_streak
-        longest_streak_start = current_streak_start
-        longest_streak_end = sorted_days[-1] if sorted_days else None
-        longest_streak_reports = current_streak_reports
-
-    # Find top day
-    top_day_date = None
-    top_day_count = 0
-    if day_counts:
-        top_day_date, top_day_count = day_counts.most_common(1)[0]
-
-    # Calculate top 3 reported car make/models for this user
-    user_make_model_counts = Counter()
-    for report in reports:
-        if report.make:
-            # Combine make and model, handle cases where model is None/blank
-            make_model = f"{report.make} {report.model}".strip() if report.model else report.make
-            # Add descriptor for Genesis Unknown (box trucks)
-            if make_model == "Genesis Unknown":
-                make_model = "Genesis Unknown (Box truck)"
-            user_make_model_counts[make_model] += 1
-
-    top_user_vehicles = [
-        {"vehicle": vehicle, "count": count}
-        for vehicle, count in user_make_model_counts.most_common(3)
-    ]
-
-    # Calculate top 3 reported car make/models across all users for this year
-    community_reports = ViolationReport.objects.filter(
-        submitted__isnull=False,
-        submission__captured_at__year=year,
-    ).select_related("submission")
-
-    community_make_model_counts = Counter()
-    for report in community_reports:
-        if report.make:
-            make_model = f"{report.make} {report.model}".strip() if report.model else report.make
-            # Add descriptor for Genesis Unknown (box trucks)
-            if make_model == "Genesis Unknown":
-                make_model = "Genesis Unknown (Box truck)"
-            community_make_model_counts[make_model] += 1
-
-    top_community_vehicles = [
-        {"vehicle": vehicle, "count": count}
-        for vehicle, count in community_make_model_counts.most_common(3)
-    ]
-
-    return {
-        "total_submissions": total_submissions,
-        "total_reports": total_reports,
-        "violations_by_type": dict(violation_counts.most_common()),
-        "top_streets": [{"street": s, "count": c} for s, c in street_counts.most_common(5)],
-        "top_zip_codes": [{"zip": z, "count": c} for z, c in zip_counts.most_common(5)],
-        "reports_by_month": dict(month_counts),
-        "first_report_date": first_date,
-        "longest_streak": longest_streak,
-        "longest_streak_start": longest_streak_start,
-        "longest_streak_end": longest_streak_end,
-        "longest_streak_reports": longest_streak_reports,
-        "top_day_date": top_day_date,
-        "top_day_count": top_day_count,
-        "top_user_vehicles": top_user_vehicles,
-        "top_community_vehicles": top_community_vehicles,
-        "rank": rank,
-        "total_users": total_users,
-        "percentile": percentile,
-        "avg_reports": round(avg_reports, 1),
-        "total_community_reports": total_community_reports,
-        "percent_of_total": percent_of_total,
-    }
+    return wrapped_stats(year, user_ids=[user.id]).get(user.id)
 
 
 @api_auth
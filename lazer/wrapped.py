@@ -0,0 +1,265 @@
+import datetime
+from collections import Counter, defaultdict
+
+from django.db.models import Count, Min
+from django.db.models.functions import ExtractMonth, TruncDate
+from django.utils import timezone
+
+from lazer.models import LazerWrapped, ViolationReport, ViolationSubmission
+
+# Report days and months are taken from captured_at in UTC, as loaded from the database.
+UTC = datetime.timezone.utc
+
+WRAPPED_STATS_FIELDS = (
+    "total_submissions",
+    "total_reports",
+    "violations_by_type",
+    "top_streets",
+    "top_zip_codes",
+    "reports_by_month",
+    "first_report_date",
+    "longest_streak",
+    "longest_streak_start",
+    "longest_streak_end",
+    "longest_streak_reports",
+    "top_day_date",
+    "top_day_count",
+    "top_user_vehicles",
+    "top_community_vehicles",
+    "rank",
+    "total_users",
+    "percentile",
+    "avg_reports",
+    "total_community_reports",
+    "percent_of_total",
+)
+
+
+def vehicle_name(make, model):
+    if not make:
+        return None
+    # Combine make and model, handle cases where model is None/blank
+    make_model = f"{make} {model}".strip() if model else make
+    # Add descriptor for Genesis Unknown (box trucks)
+    if make_model == "Genesis Unknown":
+        make_model = "Genesis Unknown (Box truck)"
+    return make_model
+
+
+def violation_type(violation_observed):
+    return violation_observed.split(" (")[0]
+
+
+def submitted_reports(year):
+    return ViolationReport.objects.filter(
+        submitted__isnull=False,
+        submission__captured_at__year=year,
+    )
+
+
+def count_reports(reports, fields, key, by_user=True):
+    """
+    Count reports by key(*fields) in one grouped query.
+
+    Keys are inserted into each Counter in the order a walk over the reports by id
+    first reaches them, so most_common() breaks ties consistently. Rows whose key
+    is None are skipped. Returns {user_id: Counter}, or a Counter if not by_user.
+    """
+    group_by = ["submission__created_by", *fields] if by_user else list(fields)
+    rows = (
+        reports.values(*group_by)
+        .annotate(count=Count("id"), first_id=Min("id"))
+        .order_by("first_id")
+    )
+
+    counters = defaultdict(Counter)
+    for row in rows:
+        value = key(*[row[field] for field in fields])
+        if value is not None:
+            counters[row["submission__created_by"] if by_user else None][value] += row["count"]
+    return counters if by_user else counters[None]
+
+
+def longest_streak(day_counts):
+    """Longest run of consecutive days as (days, start, end, reports)."""
+    sorted_days = sorted(day_counts.keys())
+    longest = (0, None, None, 0)
+    if not sorted_days:
+        return longest
+
+    current_streak = 1
+    current_streak_start = sorted_days[0]
+    current_streak_reports = day_counts[sorted_days[0]]
+
+    for i in range(1, len(sorted_days)):
+        if (sorted_days[i] - sorted_days[i - 1]).days == 1:
+            current_streak += 1
+            current_streak_reports += day_counts[sorted_days[i]]
+        else:
+            if current_streak > longest[0]:
+                longest = (
+                    current_streak,
+                    current_streak_start,
+                    sorted_days[i - 1],
+                    current_streak_reports,
+                )
+            current_streak = 1
+            current_streak_start = sorted_days[i]
+            current_streak_reports = day_counts[sorted_days[i]]
+
+    # Check final streak
+    if current_streak > longest[0]:
+        longest = (current_streak, current_streak_start, sorted_days[-1], current_streak_reports)
+    return longest
+
+
+def community_stats(year):
+    """Rankings and totals across all users for a year, computed once."""
+    user_report_counts = (
+        submitted_reports(year)
+        .filter(submission__created_by__isnull=False)
+        .values("submission__created_by")
+        .annotate(count=Count("id"))
+        .order_by("-count", "submission__created_by")
+    )
+
+    ranks = {}
+    total_community_reports = 0
+    for rank, row in enumerate(user_report_counts, start=1):
+        ranks[row["submission__created_by"]] = rank
+        total_community_reports += row["count"]
+    total_users = len(ranks)
+
+    vehicle_counts = count_reports(
+        submitted_reports(year), ["make", "model"], vehicle_name, by_user=False
+    )
+
+    return {
+        "ranks": ranks,
+        "total_users": total_users,
+        "total_community_reports": total_community_reports,
+        "avg_reports": total_community_reports / total_users if total_users > 0 else 0,
+        "top_community_vehicles": [
+            {"vehicle": vehicle, "count": count}
+            for vehicle, count in vehicle_counts.most_common(3)
+        ],
+    }
+
+
+def wrapped_stats(year, user_ids=None, community=None):
+    """
+    Wrapped statistics for every user with submitted reports in a year, or just
+    those in user_ids, as {user_id: stats}.
+
+    Per-user aggregates come from a handful of grouped queries over all users at
+    once, and community stats are computed once and shared.
+    """
+    community = community or community_stats(year)
+
+    reports = submitted_reports(year).filter(submission__created_by__isnull=False)
+    submissions = ViolationSubmission.objects.filter(captured_at__year=year)
+    if user_ids is not None:
+        reports = reports.filter(submission__created_by__in=user_ids)
+        submissions = submissions.filter(created_by__in=user_ids)
+
+    reports = reports.annotate(
+        day=TruncDate("submission__captured_at", tzinfo=UTC),
+        month=ExtractMonth("submission__captured_at", tzinfo=UTC),
+    )
+
+    def same(value):
+        return value
+
+    day_counts = count_reports(reports, ["day"], same)
+    violation_counts = count_reports(reports, ["violation_observed"], violation_type)
+    street_counts = count_reports(reports, ["street_name"], same)
+    zip_counts = count_reports(reports, ["zip_code"], same)
+    month_counts = count_reports(reports, ["month"], same)
+    vehicle_counts = count_reports(reports, ["make", "model"], vehicle_name)
+
+    submission_counts = dict(
+        submissions.values_list("created_by").annotate(count=Count("id")).order_by()
+    )
+
+    total_users = community["total_users"]
+    total_community_reports = community["total_community_reports"]
+
+    stats = {}
+    for user_id, days in day_counts.items():
+        total_reports = sum(days.values())
+        rank = community["ranks"].get(user_id, total_users + 1)
+        streak, streak_start, streak_end, streak_reports = longest_streak(days)
+        top_day_date, top_day_count = days.most_common(1)[0]
+
+        stats[user_id] = {
+            "total_submissions": submission_counts.get(user_id, 0),
+            "total_reports": total_reports,
+            "violations_by_type": dict(violation_counts[user_id].most_common()),
+            "top_streets": [
+                {"street": s, "count": c} for s, c in street_counts[user_id].most_common(5)
+            ],
+            "top_zip_codes": [
+                {"zip": z, "count": c} for z, c in zip_counts[user_id].most_common(5)
+            ],
+            "reports_by_month": dict(month_counts[user_id]),
+            "first_report_date": min(days),
+            "longest_streak": streak,
+            "longest_streak_start": streak_start,
+            "longest_streak_end": streak_end,
+            "longest_streak_reports": streak_reports,
+            "top_day_date": top_day_date,
+            "top_day_count": top_day_count,
+            "top_user_vehicles": [
+                {"vehicle": vehicle, "count": count}
+                for vehicle, count in vehicle_counts[user_id].most_common(3)
+            ],
+            "top_community_vehicles": community["top_community_vehicles"],
+            "rank": rank,
+            "total_users": total_users,
+            # What percentage of users they beat
+            "percentile": (
+                int(((total_users - rank) / total_users) * 100) if total_users > 0 else 0
+            ),
+            "avg_reports": round(community["avg_reports"], 1),
+            "total_community_reports": total_community_reports,
+            "percent_of_total": (
+                round((total_reports / total_community_reports) * 100, 1)
+                if total_community_reports > 0
+                else 0
+            ),
+        }
+    return stats
+
+
+def save_wrapped(year, stats, existing=None, batch_size=500):
+    """
+    Write {user_id: stats} to LazerWrapped rows in bulk.
+
+    existing maps user_id to LazerWrapped rows already fetched for the year; rows
+    for any other users are looked up. Returns (created, updated) counts.
+    """
+    if existing is None:
+        existing = {
+            wrapped.user_id: wrapped
+            for wrapped in LazerWrapped.objects.filter(year=year, user_id__in=list(stats))
+        }
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for user_id, user_stats in stats.items():
+        wrapped = existing.get(user_id)
+        if wrapped is None:
+            to_create.append(LazerWrapped(user_id=user_id, year=year, **user_stats))
+        else:
+            for field in WRAPPED_STATS_FIELDS:
+                setattr(wrapped, field, user_stats[field])
+            # bulk_update skips auto_now
+            wrapped.updated_at = now
+            to_update.append(wrapped)
+
+    LazerWrapped.objects.bulk_create(to_create, batch_size=batch_size)
+    LazerWrapped.objects.bulk_update(
+        to_update, [*WRAPPED_STATS_FIELDS, "updated_at"], batch_size=batch_size
+    )
+    return len(to_create), len(to_update)
@@ -183,7 +183,9 @@ class Command(BaseCommand):
         )
 
         # Get all users matching the criteria
-        members = User.objects.filter(members_query).select_related("profile").distinct()
+        members = (
+            User.objects.filter(members_query).select_related("profile__facet_district").distinct()
+        )
 
         self.stdout.write(f"\nTotal users in database: {User.objects.count()}")
         self.stdout.write(f"Members as of {date_obj}: {members.count()}")
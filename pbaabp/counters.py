@@ -0,0 +1,35 @@
+"""
+Process-shared counters kept in the default cache.
+
+The async cache API implements incr as a non-atomic get/set, so these use the
+sync API (INCR on django-redis) and are wrapped for async callers.
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+def _key(prefix, name):
+    return f"{prefix}:stats:{name}"
+
+
+def incr(prefix, name, amount=1):
+    key = _key(prefix, name)
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, amount)
+    except Exception:
+        logger.exception("Failed to record counter %s", key)
+
+
+def get_counters(prefix, names):
+    values = cache.get_many([_key(prefix, name) for name in names])
+    return {name: values.get(_key(prefix, name), 0) for name in names}
+
+
+aincr = sync_to_async(incr)
+aget_counters = sync_to_async(get_counters)
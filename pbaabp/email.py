@@ -1,18 +1,43 @@
+import functools
+import hashlib
 import os
+import re
+import threading
+from dataclasses import dataclass
+from email.mime.image import MIMEImage
+from email.utils import parseaddr
 
 import markdown
 import pynliner
-from anymail.message import attach_inline_image_file
 from bs4 import BeautifulSoup
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
 from django.template.loader import get_template
+from django.utils.html import escape
+from email_log.models import Email
 
-from profiles.models import DoNotEmail
+from pbaabp.integrations.mailgun import Mailgun
+from profiles.models import EmailRecipient
+from profiles.suppression import filter_suppressed
 
 EMAIL_IMAGE_PATH = "templates/email"
 
+# Compiled email bodies kept in each process, see compile_email
+COMPILED_EMAIL_CACHE_SIZE = 128
+# Stands in for a merge field's value while a body is compiled
+MERGE_TOKEN = "pbamergefield{}x"
+# Merge values that markdown or the HTML serializer might not pass through as
+# plain text: markdown syntax, line structure, HTML, entities and double quotes
+UNSAFE_MERGE_VALUE = re.compile(r'[\\`*_\[\]<>|~"\n\r\t]|&#?\w+;|^\s|\s$')
+# Values that could start a list, heading, quote or rule if they begin a line
+UNSAFE_LINE_START = re.compile(r"[-+#>=\d]")
+LINE_START_TOKEN = re.compile(r"^[ \t]*(" + MERGE_TOKEN.format(r"\d+") + ")", re.MULTILINE)
+
+# {path: ((mtime_ns, size), InlineImage)}, see inline_image
+_inline_images = {}
+_inline_images_lock = threading.Lock()
+
 HEADER = """
     <div class="email-header">
       <a href="https://bikeaction.org/"
@@ -75,6 +100,7 @@ FOOTER = """
 """
 
 
+@functools.lru_cache(maxsize=COMPILED_EMAIL_CACHE_SIZE)
 def template_from_string(template_string, using=None):
     """
     Convert a string into a template object,
@@ -97,10 +123,14 @@ def _build_email_soup(message):
     return BeautifulSoup(html, "html.parser")
 
 
-def _inline_css_and_wrap(soup):
-    inliner = pynliner.Pynliner().from_string(str(soup))
+@functools.lru_cache(maxsize=1)
+def _email_css():
     with open(os.path.join(os.path.dirname(__file__), "email.css")) as css:
-        inliner = inliner.with_cssString(css.read())
+        return css.read()
+
+
+def _inline_css_and_wrap(soup):
+    inliner = pynliner.Pynliner().from_string(str(soup)).with_cssString(_email_css())
     html = inliner.run()
 
     return (
@@ -123,51 +153,159 @@ def render_email_html(message, for_preview=False):
     return _inline_css_and_wrap(soup)
 
 
-def send_email_message(
-    template_name,
-    from_,
-    to,
-    context,
-    subject_template=None,
-    message=None,
-    subject=None,
-    attachments=None,
-    reply_to=None,
-):
+@dataclass(frozen=True)
+class CompiledEmail:
+    """An email body rendered to inlined HTML, with merge tokens still in place."""
+
+    text: str
+    html: str
+    # Inline image paths, to be attached and swapped for content IDs per message
+    images: tuple
+
+
+@functools.lru_cache(maxsize=COMPILED_EMAIL_CACHE_SIZE)
+def compile_email(message):
     """
-    Send an email message.
+    Markdown, wrap and inline a rendered email body, once per distinct body.
+    Bodies are kept in an LRU of COMPILED_EMAIL_CACHE_SIZE entries.
+    """
+    soup = _build_email_soup(message)
+    images = tuple(dict.fromkeys(img["src"] for img in soup.findAll("img")))
+    return CompiledEmail(message, _inline_css_and_wrap(soup), images)
 
-    :param template_name: Use to construct the real template names for the
-    subject and body like this: "email/%(template_name)s/subject.txt"
-    and "email/%(template_name)s/body.txt"
-    :param from_: From address to use
-    :param to: List of addresses to send to
-    :param context: Dictionary with context to use when rendering the
-    templates.
-    :param subject_template: optional string to use as the subject template, in place of
-       email/{{ template_name }}/subject.txt
+
+def _substitute(text, tokens, values):
+    for key, token in tokens.items():
+        text = text.replace(token, values[key])
+    return text
+
+
+@functools.lru_cache(maxsize=COMPILED_EMAIL_CACHE_SIZE)
+def _line_start_tokens(skeleton):
+    """Merge tokens that begin a line of a body."""
+    return frozenset(LINE_START_TOKEN.findall(skeleton))
+
+
+def _mergeable(skeleton, tokens, raw):
     """
-    # Filter out emails in DoNotEmail list
-    filtered_to = []
-    for email in to:
-        try:
-            DoNotEmail.objects.get(email=email)
-            # Email is in DoNotEmail list, skip it
-            continue
-        except DoNotEmail.DoesNotExist:
-            # Email not in do-not-email list, include it
-            filtered_to.append(email)
+    Whether markdown would treat each value as plain text in place of its token.
+    Values matching UNSAFE_MERGE_VALUE never are, and those matching
+    UNSAFE_LINE_START aren't at the start of a line.
+    """
+    if any(UNSAFE_MERGE_VALUE.search(value) for value in raw.values()):
+        return False
+    line_start = _line_start_tokens(skeleton)
+    return not any(
+        tokens[key] in line_start and UNSAFE_LINE_START.match(value) for key, value in raw.items()
+    )
 
-    # If all emails were filtered out, don't send anything
-    if not filtered_to:
-        return
 
-    # Update the to list to only include allowed emails
-    to = filtered_to
+def _html_text(value):
+    """A plain text value as the compiled HTML serializes it."""
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
-    if from_ is None:
-        from_ = settings.DEFAULT_FROM_EMAIL
 
+@dataclass(frozen=True)
+class RenderedEmail:
+    """
+    A body rendered for one recipient. merge maps each token in compiled.html to
+    the recipient's value as HTML text, and text_merge each token in
+    compiled.text to the value as it appears in text.
+    """
+
+    text: str
+    compiled: CompiledEmail
+    merge: dict
+    text_merge: dict
+
+
+def render_email(template, context):
+    """
+    Render a body template for one recipient, as a RenderedEmail.
+
+    The template is also rendered with a token in place of each string or number
+    in the context. If substituting the values back (escaped or not, depending on
+    the template's autoescaping) gives the same text, every recipient shares one
+    compiled body and only the merge differs. Otherwise, as when a template
+    branches on a value, or when a value might compile differently in place
+    (see _mergeable), this recipient's body is compiled as is.
+    """
+    context = context or {}
+    message = template.render(context)
+    tokens = {
+        key: MERGE_TOKEN.format(i)
+        for i, (key, value) in enumerate(sorted(context.items()))
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool)
+    }
+    raw = {key: str(context[key]) for key in tokens}
+    if tokens:
+        skeleton = template.render({**context, **tokens})
+        if not _mergeable(skeleton, tokens, raw):
+            return RenderedEmail(message, compile_email(message), {}, {})
+        escaped = {key: escape(value) for key, value in raw.items()}
+        for values in (escaped, raw):
+            if _substitute(skeleton, tokens, values) == message:
+                return RenderedEmail(
+                    message,
+                    compile_email(skeleton),
+                    {token: _html_text(raw[key]) for key, token in tokens.items()},
+                    {token: values[key] for key, token in tokens.items()},
+                )
+    return RenderedEmail(message, compile_email(message), {}, {})
+
+
+def merge_email(compiled, merge):
+    html = compiled.html
+    for token, value in merge.items():
+        html = html.replace(token, value)
+    return html
+
+
+def merge_text(compiled, text_merge):
+    text = compiled.text
+    for token, value in text_merge.items():
+        text = text.replace(token, value)
+    return text
+
+
+@dataclass(frozen=True)
+class InlineImage:
+    content_id: str
+    part: MIMEImage
+
+
+def inline_image(path):
+    """
+    MIME part for an inline image, read once per process and again only when the
+    file changes. The content ID is derived from the image's bytes, so it is the
+    same in every message and every process.
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _inline_images.get(path)
+    if cached is None or cached[0] != version:
+        with open(path, "rb") as f:
+            content = f.read()
+        # "inline" rather than a hostname, as some ESPs use the Content-ID as a
+        # filename and Gmail blocks filenames ending in .com
+        content_id = f"{hashlib.sha256(content).hexdigest()[:16]}@inline"
+        part = MIMEImage(content)
+        part.add_header("Content-Disposition", "inline", filename=os.path.basename(path))
+        part.add_header("Content-ID", f"<{content_id}>")
+        cached = (version, InlineImage(content_id, part))
+        with _inline_images_lock:
+            _inline_images[path] = cached
+    return cached[1]
+
+
+def attach_inline_image(mail, path):
+    """Attach a cached inline image to a message, and return its content ID."""
+    image = inline_image(path)
+    mail.attach(image.part)
+    return image.content_id
+
+
+def _render_subject(template_name, context, subject_template, subject, subject_prefix):
     if subject is None:
         if subject_template is not None:
             subject_template = get_template(subject_template)
@@ -176,45 +314,206 @@ def send_email_message(
             subject_template = get_template(name)
 
         subject = subject_template.render(context)
-    else:
-        subject = subject
 
     subject = " ".join(subject.splitlines()).strip()
 
-    if hasattr(settings, "EMAIL_SUBJECT_PREFIX"):
+    if subject_prefix and hasattr(settings, "EMAIL_SUBJECT_PREFIX"):
         subject = f"{settings.EMAIL_SUBJECT_PREFIX} {subject}"
+    return subject
 
-    if message is None:
-        try:
-            _ = get_template(template_name)
-        except TemplateDoesNotExist:
-            _ = get_template(f"email/{template_name}/body.txt")
-            template_name = f"email/{template_name}/body.txt"
 
-        message = get_template(template_name).render(context)
-    else:
-        message = template_from_string(message).render(context)
+def _body_template(template_name, message):
+    if message is not None:
+        return template_from_string(message)
+    try:
+        return get_template(template_name)
+    except TemplateDoesNotExist:
+        return get_template(f"email/{template_name}/body.txt")
 
-    soup = _build_email_soup(message)
 
+def _build_message(subject, rendered, from_, to, reply_to):
     mail = EmailMultiAlternatives(
         subject,
-        message,
+        rendered.text,
         from_,
         to,
         reply_to=reply_to,
     )
     mail.mixed_subtype = "related"
 
-    for img in soup.findAll("img"):
-        cid = attach_inline_image_file(mail, img["src"])
-        img["src"] = "cid:" + cid
-
-    html = _inline_css_and_wrap(soup)
+    html = merge_email(rendered.compiled, rendered.merge)
+    for src in rendered.compiled.images:
+        cid = attach_inline_image(mail, src)
+        html = html.replace(f'src="{escape(src)}"', f'src="cid:{cid}"')
     mail.attach_alternative(html, "text/html")
+    return mail
+
+
+def send_email_message(
+    template_name,
+    from_,
+    to,
+    context,
+    subject_template=None,
+    message=None,
+    subject=None,
+    attachments=None,
+    reply_to=None,
+    subject_prefix=True,
+):
+    """
+    Send an email message.
+
+    :param template_name: Use to construct the real template names for the
+    subject and body like this: "email/%(template_name)s/subject.txt"
+    and "email/%(template_name)s/body.txt"
+    :param from_: From address to use
+    :param to: List of addresses to send to
+    :param context: Dictionary with context to use when rendering the
+    templates.
+    :param subject_template: optional string to use as the subject template, in place of
+       email/{{ template_name }}/subject.txt
+    :param subject_prefix: whether to prefix the subject with EMAIL_SUBJECT_PREFIX
+    """
+    # Filter out emails in DoNotEmail list
+    to = filter_suppressed(to)
+
+    # If all emails were filtered out, don't send anything
+    if not to:
+        return
+
+    if from_ is None:
+        from_ = settings.DEFAULT_FROM_EMAIL
+
+    subject = _render_subject(template_name, context, subject_template, subject, subject_prefix)
+    rendered = render_email(_body_template(template_name, message), context)
+    mail = _build_message(subject, rendered, from_, to, reply_to)
 
     if attachments is not None:
         for attachment in attachments:
             mail.attach(*attachment)
 
     mail.send()
+
+
+class BatchSendError(Exception):
+    """
+    Raised when send_batch_email_message fails partway, from the original error.
+    sent lists the addresses that went out before the failure, unsent the rest.
+    """
+
+    def __init__(self, sent, unsent):
+        super().__init__(f"Failed after sending to {len(sent)}, {len(unsent)} unsent")
+        self.sent = sent
+        self.unsent = unsent
+
+
+def _mailgun_batch(mailgun, subject, compiled, batch, from_, reply_to):
+    """Send a batch of (address, RenderedEmail) sharing a compiled body, and log it."""
+    # Each merge token becomes a pair of recipient variables, for the text and html
+    names = {token: f"v{i}" for i, token in enumerate(sorted(batch[0][1].merge))}
+    text, html = compiled.text, compiled.html
+    for token, name in names.items():
+        text = text.replace(token, f"%recipient.{name}_text%")
+        html = html.replace(token, f"%recipient.{name}%")
+
+    inline = []
+    for src in compiled.images:
+        image = inline_image(src)
+        html = html.replace(f'src="{escape(src)}"', f'src="cid:{image.content_id}"')
+        inline.append(
+            (image.content_id, image.part.get_payload(decode=True), image.part.get_content_type())
+        )
+
+    recipient_variables = {}
+    emails = []
+    for address, rendered in batch:
+        variables = {}
+        for token, name in names.items():
+            variables[name] = rendered.merge[token]
+            variables[f"{name}_text"] = rendered.text_merge[token]
+        recipient_variables[address] = variables
+
+        logged_html = html
+        for name, value in variables.items():
+            logged_html = logged_html.replace(f"%recipient.{name}%", value)
+        emails.append(
+            Email(
+                from_email=from_,
+                recipients=address,
+                subject=subject,
+                body=rendered.text,
+                html_message=logged_html,
+            )
+        )
+
+    emails = Email.objects.bulk_create(emails)
+    mailgun.send_batch(from_, subject, text, html, recipient_variables, inline, reply_to)
+    Email.objects.filter(pk__in=[email.pk for email in emails]).update(ok=True)
+    EmailRecipient.index(emails)
+
+
+def send_batch_email_message(
+    template_name,
+    from_,
+    recipients,
+    subject_template=None,
+    message=None,
+    subject=None,
+    reply_to=None,
+    subject_prefix=True,
+):
+    """
+    Send one email to many recipients, given as (address, context) pairs, each
+    merged from a body compiled once (see render_email). Suppressed and repeated
+    addresses are skipped. Returns the addresses sent to, or if sending fails
+    partway, raises BatchSendError saying which were and weren't.
+
+    With MAILGUN_BATCH_SENDING, recipients sharing a body and subject are sent
+    MAILGUN_BATCH_SIZE at a time, one Mailgun API call each, personalized with
+    recipient-variables and logged to email_log here. Otherwise each message goes
+    through EMAIL_BACKEND in turn, over a single connection.
+    """
+    if from_ is None:
+        from_ = settings.DEFAULT_FROM_EMAIL
+    allowed = set(filter_suppressed([address for address, _ in recipients]))
+    template = _body_template(template_name, message)
+
+    groups = {}
+    for address, context in recipients:
+        if address not in allowed:
+            continue
+        allowed.discard(address)
+        rendered = render_email(template, context)
+        rendered_subject = _render_subject(
+            template_name, context, subject_template, subject, subject_prefix
+        )
+        key = (rendered_subject, rendered.compiled, tuple(sorted(rendered.merge)))
+        groups.setdefault(key, []).append((address, rendered))
+
+    sent = []
+    try:
+        if settings.MAILGUN_BATCH_SENDING:
+            domain = settings.MAILGUN_SENDER_DOMAIN or parseaddr(from_)[1].rpartition("@")[2]
+            mailgun = Mailgun(domain)
+            for (group_subject, compiled, _), group in groups.items():
+                for start in range(0, len(group), settings.MAILGUN_BATCH_SIZE):
+                    batch = group[start : start + settings.MAILGUN_BATCH_SIZE]
+                    _mailgun_batch(mailgun, group_subject, compiled, batch, from_, reply_to)
+                    sent.extend(address for address, _ in batch)
+        else:
+            # One message per send_messages call, so a failure can't hide which went out
+            with get_connection() as connection:
+                for (group_subject, _, _), group in groups.items():
+                    for address, rendered in group:
+                        connection.send_messages(
+                            [_build_message(group_subject, rendered, from_, [address], reply_to)]
+                        )
+                        sent.append(address)
+    except Exception as e:
+        done = set(sent)
+        unsent = [
+            address for group in groups.values() for address, _ in group if address not in done
+        ]
+        raise BatchSendError(sent, unsent) from e
+    return sent
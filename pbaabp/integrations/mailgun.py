@@ -0,0 +1,40 @@
+import json
+
+import requests
+from django.conf import settings
+
+
+class Mailgun:
+
+    def __init__(self, domain):
+        self.base_url = f"{settings.MAILGUN_API_URL.rstrip('/')}/{domain}"
+        self.auth = ("api", settings.MAILGUN_API_KEY)
+
+    def send_batch(
+        self, from_, subject, text, html, recipient_variables, inline=(), reply_to=None
+    ):
+        """
+        Send one message to every address in recipient_variables, {address: {...}},
+        with a single API call. Each recipient gets their own copy, with
+        %recipient.<name>% in the subject, text and html replaced by their variables.
+
+        inline is a list of (content_id, bytes, mimetype) images, referenced from
+        the html as cid:<content_id>.
+        """
+        data = [
+            ("from", from_),
+            ("subject", subject),
+            ("text", text),
+            ("html", html),
+            ("recipient-variables", json.dumps(recipient_variables)),
+        ]
+        data.extend(("to", address) for address in recipient_variables)
+        if reply_to:
+            data.append(("h:Reply-To", ", ".join(reply_to)))
+        files = [("inline", image) for image in inline]
+
+        response = requests.post(
+            f"{self.base_url}/messages", auth=self.auth, data=data, files=files, timeout=60
+        )
+        response.raise_for_status()
+        return response.json()
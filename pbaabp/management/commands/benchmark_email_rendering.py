@@ -0,0 +1,70 @@
+import os
+import time
+
+import pynliner
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+
+from pbaabp import email
+
+
+def render_uncached(template, context):
+    """Body HTML as send_email_message built it for every recipient before compiling."""
+    soup = email._build_email_soup(template.render(context))
+    inliner = pynliner.Pynliner().from_string(str(soup))
+    with open(os.path.join(os.path.dirname(email.__file__), "email.css")) as css:
+        inliner = inliner.with_cssString(css.read())
+    return inliner.run()
+
+
+class Command(BaseCommand):
+    help = "Compare email body rendering throughput with and without compiled templates"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--template",
+            default="lz-hearing/d3",
+            help="Email template to render (default: lz-hearing/d3)",
+        )
+        parser.add_argument(
+            "--recipients",
+            type=int,
+            default=5000,
+            help="Recipients to render for (default: 5000)",
+        )
+        parser.add_argument(
+            "--baseline-sample",
+            type=int,
+            default=100,
+            help="Recipients to render without compiling, to estimate its rate (default: 100)",
+        )
+
+    def handle(self, *args, **options):
+        template = get_template(f"email/{options['template']}/body.txt")
+        contexts = [
+            {"first_name": f"Recipient {i}", "last_name": f"Number {i}"}
+            for i in range(options["recipients"])
+        ]
+
+        sample = contexts[: options["baseline_sample"]]
+        start = time.perf_counter()
+        for context in sample:
+            render_uncached(template, context)
+        uncached = len(sample) / (time.perf_counter() - start)
+
+        email.compile_email.cache_clear()
+        start = time.perf_counter()
+        for context in contexts:
+            rendered = email.render_email(template, context)
+            email.merge_email(rendered.compiled, rendered.merge)
+        compiled = len(contexts) / (time.perf_counter() - start)
+
+        self.stdout.write(f"Uncached: {uncached:,.0f} messages/s (sampled {len(sample)})")
+        self.stdout.write(f"Compiled: {compiled:,.0f} messages/s ({len(contexts)} recipients)")
+        self.stdout.write(f"Compile cache: {email.compile_email.cache_info()}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{options['recipients']} recipients: {len(contexts) / uncached:,.1f}s uncached, "
+                f"{len(contexts) / compiled:,.1f}s compiled"
+            )
+        )
@@ -0,0 +1,52 @@
+import time
+
+from anymail.message import attach_inline_image_file
+from django.core.mail import EmailMultiAlternatives
+from django.core.management.base import BaseCommand
+
+from pbaabp import email
+
+
+def read_io():
+    """(bytes read, read syscalls) so far by this process, from /proc/self/io."""
+    with open("/proc/self/io") as f:
+        counters = dict(line.split(": ") for line in f.read().splitlines())
+    return int(counters["rchar"]), int(counters["syscr"])
+
+
+class Command(BaseCommand):
+    help = "Measure file I/O for attaching the header and footer images, with and without caching"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sends",
+            type=int,
+            default=1000,
+            help="Messages to attach images to (default: 1000)",
+        )
+
+    def measure(self, attach, sends, images):
+        start_io = read_io()
+        start = time.perf_counter()
+        for _ in range(sends):
+            mail = EmailMultiAlternatives("Subject", "Body", to=["test@example.com"])
+            for path in images:
+                attach(mail, path)
+        elapsed = time.perf_counter() - start
+        end_io = read_io()
+        return end_io[0] - start_io[0], end_io[1] - start_io[1], elapsed
+
+    def handle(self, *args, **options):
+        sends = options["sends"]
+        images = email.compile_email("Hello").images
+        self.stdout.write(f"{len(images)} inline images per message, {sends} messages")
+
+        for label, attach in [
+            ("Uncached", attach_inline_image_file),
+            ("Cached", email.attach_inline_image),
+        ]:
+            read, syscalls, elapsed = self.measure(attach, sends, images)
+            self.stdout.write(
+                f"{label:9} {read / 1024:,.0f}KiB read in {syscalls:,} read calls, "
+                f"{elapsed * 1000:,.0f}ms"
+            )
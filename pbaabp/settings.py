@@ -311,7 +311,12 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Celery
 CELERY_BROKER_URL = _REDIS_URL
 CELERY_RESULT_BACKEND = _REDIS_URL
-CELERY_BEAT_SCHEDULE = {}
+CELERY_BEAT_SCHEDULE = {
+    "dispatch-ppa-submissions": {
+        "task": "lazer.tasks.dispatch_ppa_submissions",
+        "schedule": 60.0,
+    },
+}
 
 # MAIL
 # ------------------------------------------------------------------------------
@@ -335,6 +340,15 @@ else:
     EMAIL_HOST_USER = env("DJANGO_EMAIL_HOST_USER", default=None)
     EMAIL_HOST_PASSWORD = env("DJANGO_EMAIL_HOST_PASSWORD", default=None)
 
+# Bulk sends through the Mailgun API, up to MAILGUN_BATCH_SIZE recipients per call
+# (see pbaabp.email.send_batch_email_message)
+MAILGUN_API_URL = env("MAILGUN_API_URL", default="https://api.mailgun.net/v3")
+MAILGUN_SENDER_DOMAIN = env("MAILGUN_SENDER_DOMAIN", default=None)
+MAILGUN_BATCH_SIZE = env.int("MAILGUN_BATCH_SIZE", default=1000)
+MAILGUN_BATCH_SENDING = env.bool(
+    "MAILGUN_BATCH_SENDING", default=MAILGUN_API_KEY is not None and MAILGUN_EMAIL is not None
+)
+
 
 # https://docs.djangoproject.com/en/dev/ref/settings/#default-from-email
 DEFAULT_FROM_EMAIL = env(
@@ -457,6 +471,14 @@ DISCORD_CONNECTED_ROLE_ID = env("DISCORD_CONNECTED_ROLE_ID", default=None)
 # Google Maps
 GOOGLE_MAPS_API_KEY = env("GOOGLE_MAPS_API_KEY", default=None)
 
+# Bulk geocoding backfills; the rate limit defaults to the provider's (see facets.backfill)
+GEOCODE_RATE_LIMIT = env.float("GEOCODE_RATE_LIMIT", default=None)
+GEOCODE_CONCURRENCY = env.int("GEOCODE_CONCURRENCY", default=8)
+GEOCODE_BACKFILL_CHUNK_SIZE = env.int("GEOCODE_BACKFILL_CHUNK_SIZE", default=200)
+
+# Deliveries per Celery task when sending a bulk Mailing
+MAILING_BATCH_SIZE = env.int("MAILING_BATCH_SIZE", default=1000)
+
 # https://app.platerecognizer.com/service/snapshot-cloud/
 PLATERECOGNIZER_API_KEY = env("PLATERECOGNIZER_API_KEY", default=None)
 
@@ -467,6 +489,16 @@ NEW_LASER_VIOLATION_CHANNEL_ID = env("NEW_LASER_VIOLATION_CHANNEL_ID", default=N
 PPA_API_DOMAIN = env("PPA_API_DOMAIN", default=None)
 PPA_API_WORKFLOW = env("PPA_API_WORKFLOW", default=None)
 PPA_API_SIG = env("PPA_API_SIG", default=None)
+# Full trigger URL override, e.g. http://localhost:8765/ for the ppa_stub_server command
+PPA_API_URL = env("PPA_API_URL", default=None)
+PPA_API_TIMEOUT = env.float("PPA_API_TIMEOUT", default=60.0)
+# Token bucket for the submission dispatcher: sustained requests per second and burst size
+PPA_RATE_LIMIT = env.float("PPA_RATE_LIMIT", default=0.5)
+PPA_RATE_BURST = env.int("PPA_RATE_BURST", default=2)
+PPA_CONCURRENCY = env.int("PPA_CONCURRENCY", default=2)
+PPA_MAX_ATTEMPTS = env.int("PPA_MAX_ATTEMPTS", default=6)
+PPA_RETRY_BACKOFF = env.float("PPA_RETRY_BACKOFF", default=60.0)
+PPA_DISPATCH_BATCH_SIZE = env.int("PPA_DISPATCH_BATCH_SIZE", default=20)
 
 # django-admin-csvexport
 # https://github.com/thomst/django-admin-csvexport/issues/3
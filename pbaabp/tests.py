@@ -0,0 +1,156 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from email_log.models import Email
+
+from pbaabp.email import (
+    BatchSendError,
+    merge_email,
+    render_email,
+    render_email_html,
+    send_batch_email_message,
+    template_from_string,
+)
+from profiles.models import DoNotEmail, EmailRecipient
+
+
+class RenderEmailTestCase(SimpleTestCase):
+    values = [
+        "Ada",
+        "José",
+        "O'Brien",
+        'Say "hi"',
+        "AT&T",
+        "<b>bold</b>",
+        "*starred*",
+        "snake_case_name",
+        "# Heading",
+        "1. First",
+        "Line one\n\nLine two",
+        "  indented",
+    ]
+
+    def assertMergeMatchesRender(self, template_string, values):
+        template = template_from_string(template_string)
+        for value in values:
+            with self.subTest(value=value):
+                rendered = render_email(template, {"first_name": value})
+                self.assertEqual(
+                    merge_email(rendered.compiled, rendered.merge),
+                    render_email_html(rendered.text),
+                )
+
+    def test_merged_html_matches_rendered_html(self):
+        """Merging a value into a shared body gives the same HTML as rendering it"""
+        self.assertMergeMatchesRender("Hi {{ first_name }}, thanks!", self.values)
+        self.assertMergeMatchesRender("Hi!\n\n{{ first_name }}. Thanks!", self.values)
+        self.assertMergeMatchesRender(
+            "{% autoescape off %}Hi {{ first_name }}, thanks!{% endautoescape %}", self.values
+        )
+
+    def test_plain_values_share_a_compiled_body(self):
+        """Recipients with plain values share one compiled body"""
+        template = template_from_string("Hi {{ first_name }}, thanks!")
+        ada = render_email(template, {"first_name": "Ada"})
+        obrien = render_email(template, {"first_name": "O'Brien"})
+        starred = render_email(template, {"first_name": "*starred*"})
+
+        self.assertIs(ada.compiled, obrien.compiled)
+        self.assertIn("O'Brien", merge_email(obrien.compiled, obrien.merge))
+        self.assertEqual(starred.merge, {})
+        self.assertIn("<em>starred</em>", starred.compiled.html)
+
+    def test_branching_template_falls_back_to_compiling_each_body(self):
+        """A template that branches on a value compiles each recipient's own body"""
+        template = template_from_string(
+            "{% if first_name == 'Ada' %}Hi **Ada**{% else %}Hello {{ first_name }}{% endif %}"
+        )
+        ada = render_email(template, {"first_name": "Ada"})
+        bob = render_email(template, {"first_name": "Bob"})
+
+        self.assertEqual(ada.merge, {})
+        self.assertNotIn("pbamergefield", ada.compiled.html)
+        self.assertEqual(merge_email(ada.compiled, ada.merge), render_email_html("Hi **Ada**"))
+        self.assertEqual(merge_email(bob.compiled, bob.merge), render_email_html("Hello Bob"))
+
+
+class MailgunStub(BaseHTTPRequestHandler):
+    """Records API requests and accepts every message, like Mailgun's messages endpoint."""
+
+    requests = []
+    # Requests after this many are answered with a server error
+    fail_after = None
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.requests.append((self.path, body))
+        if self.fail_after is not None and len(self.requests) > self.fail_after:
+            self.send_error(500)
+            return
+        response = json.dumps({"id": "<stub@mg.example.com>", "message": "Queued"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+class MailgunBatchSendTestCase(TestCase):
+    def setUp(self):
+        MailgunStub.requests = []
+        MailgunStub.fail_after = None
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), MailgunStub)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        settings = override_settings(
+            MAILGUN_BATCH_SENDING=True,
+            MAILGUN_API_URL=f"http://127.0.0.1:{self.server.server_port}/v3",
+            MAILGUN_API_KEY="key-test",
+            MAILGUN_SENDER_DOMAIN="mg.example.com",
+            MAILGUN_BATCH_SIZE=2,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_recipients_are_batched_and_logged(self):
+        """Recipients go out in batches, personalized, and each one is logged"""
+        with self.captureOnCommitCallbacks(execute=True):
+            DoNotEmail.objects.create(
+                email="blocked@example.com", reason=DoNotEmail.Reason.KNOWN_OPPONENT
+            )
+        recipients = [
+            (f"person{i}@example.com", {"first_name": f"Person {i}"}) for i in range(3)
+        ] + [("Blocked@example.com", {"first_name": "Blocked"})]
+
+        sent = send_batch_email_message("lz-hearing/d3", None, recipients)
+
+        self.assertEqual(sent, [f"person{i}@example.com" for i in range(3)])
+        self.assertEqual(len(MailgunStub.requests), 2)
+        path, body = MailgunStub.requests[0]
+        self.assertEqual(path, "/v3/mg.example.com/messages")
+        self.assertIn(b"%recipient.v0%", body)
+        self.assertIn(b"Person 1", body)
+        self.assertNotIn(b"Blocked", MailgunStub.requests[1][1])
+
+        self.assertEqual(Email.objects.filter(ok=True).count(), 3)
+        self.assertIn("Person 2", Email.objects.get(recipients="person2@example.com").body)
+        self.assertEqual(EmailRecipient.objects.count(), 3)
+
+    def test_failed_batch_reports_recipients_already_sent(self):
+        """A failed API call raises with the recipients of earlier calls as sent"""
+        MailgunStub.fail_after = 1
+        recipients = [(f"person{i}@example.com", {"first_name": f"Person {i}"}) for i in range(3)]
+
+        with self.assertRaises(BatchSendError) as raised:
+            send_batch_email_message("lz-hearing/d3", None, recipients)
+
+        self.assertEqual(raised.exception.sent, ["person0@example.com", "person1@example.com"])
+        self.assertEqual(raised.exception.unsent, ["person2@example.com"])
+        self.assertEqual(Email.objects.filter(ok=True).count(), 2)
@@ -20,6 +20,8 @@ from events.sitemap import ScheduledEventSitemap
 # from lazer.views import list as laser_list
 from lazer.views import map as laser_map
 from lazer.views import map_data as laser_map_data
+from lazer.views import map_stats as laser_map_stats
+from lazer.views import map_tile as laser_map_tile
 from lazer.views import my_wrapped as laser_my_wrapped
 from lazer.views import wrapped as laser_wrapped
 from pbaabp.admin import organizer_admin
@@ -75,6 +77,8 @@ urlpatterns = [
     ),
     path("tools/laser/map/", laser_map),
     path("tools/laser/map_data/", laser_map_data),
+    path("tools/laser/map_stats/", laser_map_stats),
+    path("tools/laser/map_tiles/<int:z>/<int:x>/<int:y>/", laser_map_tile),
     # path("tools/laser/list/", laser_list),
     path("tools/laser/wrapped/", laser_my_wrapped, name="laser_my_wrapped"),
     path("tools/laser/wrapped/<str:share_token>/", laser_wrapped, name="laser_wrapped"),
@@ -17,10 +17,10 @@ class AccountAdapter(DefaultAccountAdapter):
         """
         email = super().clean_email(email)
 
-        from profiles.models import DoNotEmail
+        from profiles.models import DoNotEmail, normalize_address
 
         try:
-            do_not_email = DoNotEmail.objects.get(email=email)
+            do_not_email = DoNotEmail.objects.get(email=normalize_address(email))
 
             if do_not_email.reason == DoNotEmail.Reason.ACCOUNT_DELETION:
                 # User previously deleted their account, allow re-signup and remove from list
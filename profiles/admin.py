@@ -7,7 +7,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Value
-from django.db.models.functions import Coalesce
+from django.db.models.functions import Coalesce, Lower, TruncDate
 from django.http import HttpResponse
 from django.utils import timezone
 from django.utils.safestring import mark_safe
@@ -19,7 +19,16 @@ from reportlab.pdfgen import canvas
 from facets.models import District, RegisteredCommunityOrganization
 from membership.models import Membership
 from pbaabp.admin import ReadOnlyLeafletGeoAdminMixin, organizer_admin
-from profiles.models import DiscordActivity, DoNotEmail, Profile, ShirtOrder
+from profiles.mailings import mailing_progress
+from profiles.models import (
+    DiscordActivity,
+    DoNotEmail,
+    EmailRecipient,
+    Mailing,
+    MailingDelivery,
+    Profile,
+    ShirtOrder,
+)
 
 
 class DistrictOrganizerFilter(admin.SimpleListFilter):
@@ -290,9 +299,9 @@ class EmailHistory:
 
     def get_emails(self):
         if self.profile and self.profile.user.email:
-            return Email.objects.filter(recipients__icontains=self.profile.user.email).order_by(
-                "-date_sent"
-            )[
+            return Email.objects.filter(
+                recipient_index__address=self.profile.user.email.lower()
+            ).order_by("-date_sent")[
                 :50
             ]  # Show last 50 emails
         return Email.objects.none()
@@ -354,17 +363,18 @@ class ProfileAdmin(ReadOnlyLeafletGeoAdminMixin, admin.ModelAdmin):
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        queryset = queryset.select_related("user")
+        queryset = queryset.select_related("user", "facet_district")
 
         # Use a subquery to count emails efficiently
         thirty_days_ago = timezone.now() - datetime.timedelta(days=30)
 
         # Create subquery that counts emails for each user
         email_count_subquery = Subquery(
-            Email.objects.filter(
-                recipients__icontains=OuterRef("user__email"), date_sent__gte=thirty_days_ago
+            EmailRecipient.objects.filter(
+                address=Lower(OuterRef("user__email")), date_sent__gte=thirty_days_ago
             )
-            .values("recipients")
+            .order_by()
+            .values("address")
             .annotate(count=Count("*"))
             .values("count")[:1],
             output_field=IntegerField(),
@@ -549,15 +559,15 @@ class ProfileAdmin(ReadOnlyLeafletGeoAdminMixin, admin.ModelAdmin):
 
         # Query emails for the last 90 days
         ninety_days_ago = timezone.now().date() - datetime.timedelta(days=90)
-        emails = Email.objects.filter(
-            recipients__icontains=obj.user.email, date_sent__gte=ninety_days_ago
-        ).values_list("date_sent", flat=True)
-
-        # Count emails by date
-        email_dates = [email.date() if hasattr(email, "date") else email for email in emails]
-        counts_by_date = {}
-        for date in email_dates:
-            counts_by_date[date] = counts_by_date.get(date, 0) + 1
+        counts_by_date = dict(
+            EmailRecipient.objects.filter(
+                address=obj.user.email.lower(), date_sent__gte=ninety_days_ago
+            )
+            .annotate(date=TruncDate("date_sent", tzinfo=datetime.timezone.utc))
+            .values_list("date")
+            .annotate(count=Count("*"))
+            .order_by()
+        )
 
         # Build counts for sparklines
         counts_prev_60 = ",".join(
@@ -599,9 +609,9 @@ class ProfileAdmin(ReadOnlyLeafletGeoAdminMixin, admin.ModelAdmin):
         if obj is None or not obj.user.email:
             return "No emails found"
 
-        emails = Email.objects.filter(recipients__icontains=obj.user.email).order_by("-date_sent")[
-            :20
-        ]
+        emails = Email.objects.filter(recipient_index__address=obj.user.email.lower()).order_by(
+            "-date_sent"
+        )[:20]
 
         if not emails:
             return "No emails found"
@@ -1144,3 +1154,24 @@ class DoNotEmailAdmin(admin.ModelAdmin):
 
 
 admin.site.register(DoNotEmail, DoNotEmailAdmin)
+
+
+class MailingAdmin(admin.ModelAdmin):
+    list_display = ["name", "created_at", "started_at", "finished_at"]
+    search_fields = ["name"]
+    readonly_fields = ["created_at", "started_at", "finished_at", "progress"]
+
+    def progress(self, obj):
+        return str(mailing_progress(obj))
+
+
+class MailingDeliveryAdmin(admin.ModelAdmin):
+    list_display = ["address", "mailing", "segment", "status", "sent_at"]
+    list_filter = ["mailing", "status"]
+    search_fields = ["address"]
+    raw_id_fields = ["profile"]
+    readonly_fields = ["updated_at"]
+
+
+admin.site.register(Mailing, MailingAdmin)
+admin.site.register(MailingDelivery, MailingDeliveryAdmin)
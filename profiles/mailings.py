@@ -0,0 +1,295 @@
+"""
+Segmented bulk mailings.
+
+A Mailing is sent in steps that are each safe to repeat:
+
+plan_mailing resolves each segment's audience with one query and records a
+pending MailingDelivery per address, earlier segments taking precedence.
+dispatch_mailing queues pending deliveries to Celery in batches, and
+send_mailing_batch claims each delivery before sending it, so an address is
+sent to at most once however many times its batch is queued. Rerunning a
+mailing after an interruption picks up where the last run stopped.
+
+The exception is a worker dying mid-send, which leaves its claimed deliveries
+sending for good. reset_stalled returns them to pending once they've been
+sending for a while, but as there's no telling whether they went out before
+the worker died, resetting them may send some twice.
+"""
+
+import datetime
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import transaction
+from django.db.models import Count, Exists, Max, OuterRef, Q
+from django.utils import timezone
+from djstripe.models import Subscription
+
+from facets.models import RegisteredCommunityOrganization
+from membership.models import Membership
+from pbaabp.email import BatchSendError, send_batch_email_message
+from profiles.models import DiscordActivity, Mailing, MailingDelivery, Profile
+from profiles.suppression import exclude_suppressed
+
+# Audience filters matching a profile's stored facets by name
+FACET_FILTERS = {
+    "districts": "facet_district__name__in",
+    "wards": "facet_ward__name__in",
+    "zip_codes": "facet_zip_code__name__in",
+    "state_house_districts": "facet_state_house_district__name__in",
+    "state_senate_districts": "facet_state_senate_district__name__in",
+}
+AUDIENCE_FILTERS = {*FACET_FILTERS, "rcos", "newsletter_opt_in", "members"}
+
+UNFINISHED = [
+    MailingDelivery.Status.PENDING,
+    MailingDelivery.Status.QUEUED,
+    MailingDelivery.Status.SENDING,
+]
+# Deliveries sending for longer than this are assumed to have lost their worker
+STALLED_AFTER = datetime.timedelta(minutes=30)
+
+
+def is_member():
+    """Whether a profile is a PBA member, with the same rules as the profile admin."""
+    today = timezone.now().date()
+    return (
+        Exists(Subscription.objects.filter(customer__subscriber=OuterRef("user"), status="active"))
+        | Exists(
+            DiscordActivity.objects.filter(
+                profile=OuterRef("pk"),
+                date__gte=today - datetime.timedelta(days=30),
+                profile__user__socialaccount__provider="discord",
+            )
+        )
+        | Exists(
+            Membership.objects.filter(user=OuterRef("user"), start_date__lte=today).filter(
+                Q(end_date__isnull=True) | Q(end_date__gte=today)
+            )
+        )
+    )
+
+
+def resolve_audience(audience):
+    """
+    Profiles matching a segment's audience filters, all optional and combined:
+
+    - districts, wards, zip_codes, state_house_districts, state_senate_districts,
+      rcos: lists of facet names, matched against stored facet membership
+    - newsletter_opt_in, members: booleans
+
+    Profiles without an email address or on the DoNotEmail list are excluded.
+    """
+    unknown = set(audience) - AUDIENCE_FILTERS
+    if unknown:
+        raise ValueError(f"Unknown audience filters: {', '.join(sorted(unknown))}")
+
+    profiles = Profile.objects.exclude(user__email="")
+    for key, lookup in FACET_FILTERS.items():
+        if key in audience:
+            profiles = profiles.filter(**{lookup: audience[key]})
+    if "rcos" in audience:
+        rco_ids = RegisteredCommunityOrganization.objects.filter(name__in=audience["rcos"]).values(
+            "id"
+        )
+        profiles = profiles.filter(facet_rco_ids__overlap=ArraySubquery(rco_ids))
+    if "newsletter_opt_in" in audience:
+        profiles = profiles.filter(newsletter_opt_in=audience["newsletter_opt_in"])
+    if "members" in audience:
+        profiles = profiles.filter(is_member() if audience["members"] else ~is_member())
+
+    return exclude_suppressed(profiles, "user__email")
+
+
+def plan_mailing(mailing, batch_size=1000):
+    """
+    Record a pending delivery for every address in the mailing's audience that
+    doesn't have one yet. Returns the number of profiles in each segment.
+    """
+    sizes = []
+    for number, segment in enumerate(mailing.segments):
+        rows = (
+            resolve_audience(segment.get("audience", {}))
+            .order_by()
+            .values_list("pk", "user__email", "user__first_name", "user__last_name")
+        )
+        deliveries = [
+            MailingDelivery(
+                mailing=mailing,
+                profile_id=pk,
+                address=email.strip().lower(),
+                segment=number,
+                template_name=segment["template"],
+                context={"first_name": first_name, "last_name": last_name},
+            )
+            for pk, email, first_name, last_name in rows
+        ]
+        MailingDelivery.objects.bulk_create(
+            deliveries, batch_size=batch_size, ignore_conflicts=True
+        )
+        sizes.append(len(deliveries))
+    return sizes
+
+
+def dispatch_mailing(mailing, batch_size=None, requeue=False):
+    """
+    Queue pending deliveries in batches of batch_size, one Celery task each.
+    With requeue, deliveries already queued are queued again, for when the broker
+    has lost tasks. Returns the number of deliveries queued.
+    """
+    from profiles.tasks import send_mailing_batch
+
+    batch_size = batch_size or settings.MAILING_BATCH_SIZE
+    statuses = [MailingDelivery.Status.PENDING]
+    if requeue:
+        statuses.append(MailingDelivery.Status.QUEUED)
+
+    if mailing.started_at is None:
+        mailing.started_at = timezone.now()
+        mailing.save(update_fields=["started_at"])
+
+    ids = list(
+        mailing.deliveries.filter(status__in=statuses).order_by("pk").values_list("pk", flat=True)
+    )
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start : start + batch_size]
+        MailingDelivery.objects.filter(pk__in=batch, status__in=statuses).update(
+            status=MailingDelivery.Status.QUEUED
+        )
+        send_mailing_batch.delay(batch)
+    return len(ids)
+
+
+def _claim(delivery_ids):
+    """
+    Mark the queued deliveries among delivery_ids as sending, and return them.
+    Rows are locked while they are claimed, so a delivery in a batch that was
+    queued twice is only claimed, and sent, once.
+    """
+    with transaction.atomic():
+        deliveries = list(
+            MailingDelivery.objects.filter(
+                pk__in=delivery_ids, status=MailingDelivery.Status.QUEUED
+            )
+            .select_for_update(skip_locked=True, of=("self",))
+            .select_related("mailing")
+        )
+        MailingDelivery.objects.filter(pk__in=[delivery.pk for delivery in deliveries]).update(
+            status=MailingDelivery.Status.SENDING, updated_at=timezone.now()
+        )
+    return deliveries
+
+
+def stalled_deliveries(mailing, stalled_after=STALLED_AFTER):
+    """Deliveries of a mailing claimed for sending more than stalled_after ago."""
+    return mailing.deliveries.filter(
+        status=MailingDelivery.Status.SENDING, updated_at__lt=timezone.now() - stalled_after
+    )
+
+
+def reset_stalled(mailing, stalled_after=STALLED_AFTER):
+    """
+    Return stalled deliveries to pending, so the next dispatch sends them. Any
+    that went out before their worker died will be sent again. Returns the number
+    of deliveries reset.
+    """
+    return stalled_deliveries(mailing, stalled_after).update(
+        status=MailingDelivery.Status.PENDING, updated_at=timezone.now()
+    )
+
+
+def _finish(deliveries, status, error=""):
+    MailingDelivery.objects.filter(pk__in=[delivery.pk for delivery in deliveries]).update(
+        status=status,
+        error=error,
+        sent_at=timezone.now() if status == MailingDelivery.Status.SENT else None,
+        updated_at=timezone.now(),
+    )
+
+
+def send_batch(delivery_ids):
+    """
+    Claim and send queued deliveries, one send_batch_email_message call for each
+    mailing and template, so with Mailgun batch sending a whole batch usually goes
+    out in one API call.
+    """
+    groups = {}
+    for delivery in _claim(delivery_ids):
+        groups.setdefault((delivery.mailing, delivery.template_name), []).append(delivery)
+
+    for (mailing, template_name), deliveries in groups.items():
+        try:
+            sent = send_batch_email_message(
+                template_name,
+                mailing.from_address,
+                [(delivery.address, delivery.context) for delivery in deliveries],
+                subject=mailing.subject or None,
+                reply_to=[mailing.reply_to] if mailing.reply_to else None,
+                subject_prefix=mailing.subject_prefix,
+            )
+        except BatchSendError as e:
+            # Only deliveries that didn't go out are failed, so retrying them
+            # doesn't send anyone the mailing twice
+            sent, unsent = set(e.sent), set(e.unsent)
+            _finish([d for d in deliveries if d.address in sent], MailingDelivery.Status.SENT)
+            _finish(
+                [d for d in deliveries if d.address in unsent],
+                MailingDelivery.Status.FAILED,
+                repr(e.__cause__),
+            )
+            _finish(
+                [d for d in deliveries if d.address not in sent | unsent],
+                MailingDelivery.Status.SUPPRESSED,
+            )
+            continue
+        except Exception as e:
+            _finish(deliveries, MailingDelivery.Status.FAILED, repr(e))
+            continue
+        # Addresses may have been suppressed since the mailing was planned
+        sent = set(sent)
+        _finish([d for d in deliveries if d.address in sent], MailingDelivery.Status.SENT)
+        _finish(
+            [d for d in deliveries if d.address not in sent], MailingDelivery.Status.SUPPRESSED
+        )
+
+    for mailing in {mailing for mailing, _ in groups}:
+        if not mailing.deliveries.filter(status__in=UNFINISHED).exists():
+            Mailing.objects.filter(pk=mailing.pk, finished_at__isnull=True).update(
+                finished_at=timezone.now()
+            )
+
+
+@dataclass
+class MailingProgress:
+    counts: dict
+    rate: float
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def unfinished(self):
+        return sum(self.counts.get(status, 0) for status in UNFINISHED)
+
+    def __str__(self):
+        counts = ", ".join(f"{count} {status}" for status, count in sorted(self.counts.items()))
+        return f"{self.total} deliveries: {counts} ({self.rate:.1f} sent/s)"
+
+
+def mailing_progress(mailing):
+    """Delivery counts by status, and the send rate since the mailing started."""
+    counts = dict(
+        mailing.deliveries.order_by()
+        .values("status")
+        .annotate(count=Count("pk"))
+        .values_list("status", "count")
+    )
+    rate = 0
+    last_sent = mailing.deliveries.aggregate(last=Max("sent_at"))["last"]
+    if mailing.started_at is not None and last_sent is not None:
+        elapsed = (last_sent - mailing.started_at).total_seconds()
+        if elapsed > 0:
+            rate = counts.get(MailingDelivery.Status.SENT, 0) / elapsed
+    return MailingProgress(counts, rate)
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from email_log.models import Email
+
+from profiles.models import EmailRecipient
+
+
+class Command(BaseCommand):
+    help = "Index the recipients of emails logged before the recipient index existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Emails to index per batch (default: 2000)",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-index every email, not just those without indexed recipients",
+        )
+
+    def handle(self, *args, **options):
+        emails = Email.objects.order_by("pk").only("pk", "recipients", "date_sent")
+        if not options["all"]:
+            emails = emails.filter(recipient_index__isnull=True)
+
+        indexed = 0
+        recipients = 0
+        last_pk = 0
+        while True:
+            batch = list(emails.filter(pk__gt=last_pk)[: options["batch_size"]])
+            if not batch:
+                break
+            recipients += EmailRecipient.index(batch)
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"Indexed {indexed} emails ({recipients} recipients)")
+
+        self.stdout.write(self.style.SUCCESS(f"Done, indexed {indexed} emails"))
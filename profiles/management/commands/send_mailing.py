@@ -0,0 +1,116 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.mailings import (
+    STALLED_AFTER,
+    dispatch_mailing,
+    mailing_progress,
+    plan_mailing,
+    reset_stalled,
+    resolve_audience,
+    stalled_deliveries,
+)
+from profiles.models import Mailing, MailingDelivery
+
+
+class Command(BaseCommand):
+    help = "Send (or resume sending) a bulk Mailing to its segmented audience"
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", help="Name of the Mailing to send")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the size of each segment's audience",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Deliveries per Celery task (default: MAILING_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--requeue",
+            action="store_true",
+            help="Queue deliveries that are already queued again, if tasks were lost",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Retry deliveries that failed to send",
+        )
+        parser.add_argument(
+            "--reset-stalled",
+            type=int,
+            nargs="?",
+            const=int(STALLED_AFTER.total_seconds() // 60),
+            metavar="MINUTES",
+            help=(
+                "Retry deliveries a dead worker left sending for over MINUTES (default: "
+                f"{int(STALLED_AFTER.total_seconds() // 60)}). Any it sent before dying "
+                "will be sent twice"
+            ),
+        )
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help="Report progress until every delivery has been attempted",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mailing = Mailing.objects.get(name=options["name"])
+        except Mailing.DoesNotExist:
+            raise CommandError(f"No mailing named {options['name']!r}")
+
+        if options["dry_run"]:
+            for number, segment in enumerate(mailing.segments):
+                start = time.perf_counter()
+                count = resolve_audience(segment.get("audience", {})).count()
+                elapsed = (time.perf_counter() - start) * 1000
+                self.stdout.write(
+                    f"Segment {number} ({segment['template']}): {count} profiles "
+                    f"(resolved in {elapsed:.0f}ms)"
+                )
+            return
+
+        start = time.perf_counter()
+        sizes = plan_mailing(mailing)
+        self.stdout.write(
+            f"Planned {sum(sizes)} profiles in {len(sizes)} segments "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+
+        if options["retry_failed"]:
+            retried = mailing.deliveries.filter(status=MailingDelivery.Status.FAILED).update(
+                status=MailingDelivery.Status.PENDING, error=""
+            )
+            self.stdout.write(f"Retrying {retried} failed deliveries")
+
+        if options["reset_stalled"] is not None:
+            reset = reset_stalled(mailing, datetime.timedelta(minutes=options["reset_stalled"]))
+            self.stdout.write(f"Retrying {reset} stalled deliveries")
+
+        queued = dispatch_mailing(
+            mailing, batch_size=options["batch_size"], requeue=options["requeue"]
+        )
+        self.stdout.write(f"Queued {queued} deliveries")
+
+        progress = mailing_progress(mailing)
+        self.stdout.write(str(progress))
+        while options["wait"] and progress.unfinished:
+            stalled = stalled_deliveries(mailing).count()
+            if stalled == progress.unfinished:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{stalled} deliveries are stalled, rerun with --reset-stalled "
+                        "to send them"
+                    )
+                )
+                break
+            time.sleep(5)
+            progress = mailing_progress(mailing)
+            self.stdout.write(str(progress))
+        self.stdout.write(self.style.SUCCESS("Done"))
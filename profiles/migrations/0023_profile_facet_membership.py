@@ -0,0 +1,95 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:47
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("facets", "0006_ward"),
+        ("profiles", "0022_profile_pronouns"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="facet_district",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="facets.district",
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="facet_rco_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.UUIDField(), blank=True, default=list, editable=False, size=None
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="facet_state_house_district",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="facets.statehousedistrict",
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="facet_state_senate_district",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="facets.statesenatedistrict",
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="facet_ward",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="facets.ward",
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="facet_zip_code",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="facets.zipcode",
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="facets_assigned_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["facet_rco_ids"], name="profile_rco_ids"
+            ),
+        ),
+    ]
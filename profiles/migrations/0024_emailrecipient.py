@@ -0,0 +1,48 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("email_log", "0004_alter_attachment_file"),
+        ("profiles", "0023_profile_facet_membership"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailRecipient",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("address", models.CharField()),
+                ("date_sent", models.DateTimeField()),
+                (
+                    "email",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recipient_index",
+                        to="email_log.email",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["address", "date_sent"], name="profiles_em_address_92e5dc_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("email", "address"), name="unique_email_recipient"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:09
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0024_emailrecipient"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Mailing",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("name", models.CharField(max_length=128, unique=True)),
+                (
+                    "from_address",
+                    models.CharField(
+                        default="Philly Bike Action <noreply@bikeaction.org>", max_length=256
+                    ),
+                ),
+                ("reply_to", models.EmailField(blank=True, max_length=254)),
+                (
+                    "subject",
+                    models.CharField(
+                        blank=True,
+                        help_text="Overrides each template's subject.txt",
+                        max_length=256,
+                    ),
+                ),
+                ("segments", models.JSONField(default=list)),
+                (
+                    "subject_prefix",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Prefix subjects with the site's EMAIL_SUBJECT_PREFIX",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, editable=False, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, editable=False, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="MailingDelivery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("address", models.CharField()),
+                ("segment", models.PositiveIntegerField()),
+                ("template_name", models.CharField(max_length=256)),
+                ("context", models.JSONField(default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("queued", "Queued"),
+                            ("sending", "Sending"),
+                            ("sent", "Sent"),
+                            ("suppressed", "Suppressed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "mailing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="profiles.mailing",
+                    ),
+                ),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="profiles.profile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "mailing deliveries",
+                "indexes": [
+                    models.Index(
+                        fields=["mailing", "status"], name="profiles_ma_mailing_4fd63a_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("mailing", "address"), name="unique_mailing_delivery"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_emails(apps, schema_editor):
+    DoNotEmail = apps.get_model("profiles", "DoNotEmail")
+    rows = DoNotEmail.objects.annotate(normalized=Lower(Trim("email"))).exclude(
+        email=Lower(Trim("email"))
+    )
+    for row in rows.order_by("created_at"):
+        if DoNotEmail.objects.filter(email=row.normalized).exists():
+            row.delete()
+        else:
+            DoNotEmail.objects.filter(pk=row.pk).update(email=row.normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0025_mailing"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+    ]
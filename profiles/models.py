@@ -1,5 +1,6 @@
 import datetime
 import uuid
+from email.utils import getaddresses
 
 from django.contrib.auth.models import User
 from django.contrib.gis.db import models
@@ -8,18 +9,16 @@ from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from email_log.models import Email
 
-from facets.models import District as DistrictFacet
-from facets.models import (
-    RegisteredCommunityOrganization as RegisteredCommunityOrganizationFacet,
-)
+from facets.models import FacetMembership
 from membership.models import Membership
 from organizers.models import OrganizerApplication
 from profiles.tasks import geocode_profile, sync_to_mailjet
 from projects.models import ProjectApplication
 
 
-class Profile(models.Model):
+class Profile(FacetMembership):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     mailjet_contact_id = models.BigIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -334,7 +333,7 @@ class Profile(models.Model):
             return None
         if self.location is None:
             return None
-        return DistrictFacet.objects.filter(mpoly__contains=self.location).first()
+        return self.containing_district()
 
     @property
     def rcos(self):
@@ -343,7 +342,7 @@ class Profile(models.Model):
         if self.location is None:
             return None
         return (
-            RegisteredCommunityOrganizationFacet.objects.filter(mpoly__contains=self.location)
+            self.containing_rcos()
             .filter(properties__org_type="Other")
             .order_by("properties__objectid")
             .all()
@@ -356,7 +355,7 @@ class Profile(models.Model):
         if self.location is None:
             return None
         return (
-            RegisteredCommunityOrganizationFacet.objects.filter(mpoly__contains=self.location)
+            self.containing_rcos()
             .filter(properties__org_type="Ward")
             .order_by("properties__objectid")
             .all()
@@ -369,7 +368,7 @@ class Profile(models.Model):
         if self.location is None:
             return None
         return (
-            RegisteredCommunityOrganizationFacet.objects.filter(mpoly__contains=self.location)
+            self.containing_rcos()
             .filter(properties__org_type__in=["NID", "SSD", None])
             .order_by("properties__objectid")
             .all()
@@ -427,11 +426,121 @@ class DoNotEmail(models.Model):
     def __str__(self):
         return f"{self.email} ({self.get_reason_display()})"
 
+    def save(self, *args, **kwargs):
+        self.email = normalize_address(self.email)
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "Do Not Email"
         verbose_name_plural = "Do Not Email"
 
 
+def normalize_address(address):
+    return address.strip().lower()
+
+
+def split_recipients(recipients):
+    """Normalized addresses from an email_log recipients string, without duplicates."""
+    addresses = (normalize_address(address) for _, address in getaddresses([recipients or ""]))
+    return list(dict.fromkeys(address for address in addresses if address))
+
+
+class EmailRecipient(models.Model):
+    """
+    One row per address an email_log Email was sent to, so a person's mail can be
+    found with an indexed lookup instead of scanning the recipients text.
+    """
+
+    email = models.ForeignKey(Email, on_delete=models.CASCADE, related_name="recipient_index")
+    address = models.CharField()
+    date_sent = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["email", "address"], name="unique_email_recipient")
+        ]
+        indexes = [models.Index(fields=["address", "date_sent"])]
+
+    def __str__(self):
+        return self.address
+
+    @classmethod
+    def index(cls, emails, batch_size=1000):
+        """Record the recipients of logged emails, skipping any already recorded."""
+        recipients = [
+            cls(email=email, address=address, date_sent=email.date_sent)
+            for email in emails
+            for address in split_recipients(email.recipients)
+        ]
+        cls.objects.bulk_create(recipients, batch_size=batch_size, ignore_conflicts=True)
+        return len(recipients)
+
+
+class Mailing(models.Model):
+    """
+    A bulk email to a segmented audience, sent by profiles.mailings.
+
+    segments is a list of {"template": ..., "audience": {...}} in priority order;
+    each recipient gets the template of the first segment they fall in. See
+    profiles.mailings.resolve_audience for the audience filters.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=128, unique=True)
+    from_address = models.CharField(
+        max_length=256, default="Philly Bike Action <noreply@bikeaction.org>"
+    )
+    reply_to = models.EmailField(blank=True)
+    subject = models.CharField(
+        max_length=256, blank=True, help_text="Overrides each template's subject.txt"
+    )
+    segments = models.JSONField(default=list)
+    subject_prefix = models.BooleanField(
+        default=False, help_text="Prefix subjects with the site's EMAIL_SUBJECT_PREFIX"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    def __str__(self):
+        return self.name
+
+
+class MailingDelivery(models.Model):
+    """Delivery state of one recipient of a Mailing."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        QUEUED = "queued", "Queued"
+        SENDING = "sending", "Sending"
+        SENT = "sent", "Sent"
+        SUPPRESSED = "suppressed", "Suppressed"
+        FAILED = "failed", "Failed"
+
+    mailing = models.ForeignKey(Mailing, on_delete=models.CASCADE, related_name="deliveries")
+    profile = models.ForeignKey(
+        Profile, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    address = models.CharField()
+    segment = models.PositiveIntegerField()
+    template_name = models.CharField(max_length=256)
+    context = models.JSONField(default=dict)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["mailing", "address"], name="unique_mailing_delivery")
+        ]
+        indexes = [models.Index(fields=["mailing", "status"])]
+        verbose_name_plural = "mailing deliveries"
+
+    def __str__(self):
+        return f"{self.mailing}: {self.address} ({self.status})"
+
+
 class ShirtOrder(models.Model):
     class ProductType(models.IntegerChoices):
         T_SHIRT = 0, "T-Shirt"
@@ -1,7 +1,11 @@
 from allauth.socialaccount.models import SocialAccount
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from email_log.models import Email
 
+from profiles.models import DoNotEmail, EmailRecipient
+from profiles.suppression import bump_suppression_version
 from profiles.tasks import add_user_to_connected_role, remove_user_from_connected_role
 
 
@@ -15,3 +19,15 @@ def social_account_post_save(sender, instance, **kwargs):
 def social_account_post_delete(sender, instance, **kwargs):
     if instance.provider == "discord":
         remove_user_from_connected_role.delay(instance.uid)
+
+
+@receiver(post_save, sender=Email, dispatch_uid="email_log_email_post_save")
+def email_log_email_post_save(sender, instance, created, **kwargs):
+    if created:
+        EmailRecipient.index([instance])
+
+
+@receiver(post_save, sender=DoNotEmail, dispatch_uid="do_not_email_post_save")
+@receiver(post_delete, sender=DoNotEmail, dispatch_uid="do_not_email_post_delete")
+def do_not_email_changed(sender, instance, **kwargs):
+    transaction.on_commit(bump_suppression_version)
@@ -0,0 +1,53 @@
+"""
+The DoNotEmail suppression list, for filtering recipients before sending.
+
+Each process holds the list as a set of normalized addresses, and reloads it
+when the shared suppression version, bumped whenever a DoNotEmail row is saved
+or deleted, has moved on.
+"""
+
+import threading
+
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Lower
+
+from pbaabp.counters import get_counters, incr
+from profiles.models import DoNotEmail, normalize_address
+
+_suppressed = (None, frozenset())
+_lock = threading.Lock()
+
+
+def suppression_version():
+    return get_counters("profiles", ["suppression_version"])["suppression_version"]
+
+
+def bump_suppression_version():
+    incr("profiles", "suppression_version")
+
+
+def suppressed_addresses():
+    """Every suppressed address, normalized, as a frozenset."""
+    global _suppressed
+    version = suppression_version()
+    if _suppressed[0] != version:
+        with _lock:
+            if _suppressed[0] != version:
+                addresses = DoNotEmail.objects.values_list("email", flat=True)
+                _suppressed = (version, frozenset(map(normalize_address, addresses)))
+    return _suppressed[1]
+
+
+def is_suppressed(address):
+    return normalize_address(address) in suppressed_addresses()
+
+
+def filter_suppressed(addresses):
+    """The addresses not on the suppression list, in their original order and case."""
+    suppressed = suppressed_addresses()
+    return [address for address in addresses if normalize_address(address) not in suppressed]
+
+
+def exclude_suppressed(queryset, field):
+    """Exclude rows whose email address, at the lookup path field, is suppressed."""
+    return queryset.exclude(Exists(DoNotEmail.objects.filter(email=Lower(OuterRef(field)))))
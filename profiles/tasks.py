@@ -3,6 +3,7 @@ from celery import shared_task
 from django.conf import settings
 from django.contrib.gis.geos import Point
 
+from facets.membership import assign_facets
 from facets.utils import geocode_address
 from pba_discord.bot import bot
 from pbaabp.integrations.mailjet import Mailjet
@@ -51,6 +52,7 @@ def geocode_profile(profile_id):
         else:
             print(f"No address found for {profile.street_address} {profile.zip_code}")
             Profile.objects.filter(id=profile_id).update(location=None)
+        assign_facets(Profile.objects.filter(id=profile_id))
 
 
 @shared_task
@@ -99,3 +101,10 @@ def unsubscribe_mailjet_email(list_id, email):
         from profiles.models import Profile
 
         Profile.objects.filter(user__email=email).update(newsletter_opt_in=False)
+
+
+@shared_task
+def send_mailing_batch(delivery_ids):
+    from profiles.mailings import send_batch
+
+    send_batch(delivery_ids)
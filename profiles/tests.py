@@ -1,13 +1,27 @@
 import datetime
+from unittest.mock import patch
 
 from allauth.socialaccount.models import SocialAccount
 from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends import locmem
 from django.test import TestCase
 from django.utils import timezone
 from djstripe.models import Customer, Price, Product, Subscription
+from email_log.models import Email
 
 from membership.models import Membership
-from profiles.models import DiscordActivity, Profile
+from pbaabp.email import send_email_message
+from profiles.mailings import plan_mailing, reset_stalled, send_batch
+from profiles.models import (
+    DiscordActivity,
+    DoNotEmail,
+    EmailRecipient,
+    Mailing,
+    MailingDelivery,
+    Profile,
+)
+from profiles.suppression import filter_suppressed
 
 
 class ProfileEligibilityTestCase(TestCase):
@@ -702,3 +716,151 @@ class ProfileEligibilityTestCase(TestCase):
         after_end = end_date + datetime.timedelta(days=1)
         result = self.profile.eligible_as_of(after_end)
         self.assertFalse(result["membership_sufficient_alone"])
+
+
+class EmailRecipientTestCase(TestCase):
+    def test_logged_email_recipients_are_indexed(self):
+        """Logging an email indexes each distinct recipient address, lowercased"""
+        email = Email.objects.create(
+            from_email="info@bikeaction.org",
+            recipients="Test@Example.com; Other Person <other@example.com>; test@example.com",
+            subject="Hello",
+            body="Hi",
+        )
+
+        self.assertEqual(
+            sorted(email.recipient_index.values_list("address", flat=True)),
+            ["other@example.com", "test@example.com"],
+        )
+        self.assertTrue(
+            EmailRecipient.objects.filter(
+                address="test@example.com", date_sent=email.date_sent
+            ).exists()
+        )
+
+    def test_index_skips_existing_recipients(self):
+        """Re-indexing an email does not duplicate its recipients"""
+        email = Email.objects.create(
+            from_email="info@bikeaction.org",
+            recipients="test@example.com",
+            subject="Hello",
+            body="Hi",
+        )
+
+        EmailRecipient.index([email])
+
+        self.assertEqual(email.recipient_index.count(), 1)
+
+
+class MailingTestCase(TestCase):
+    def setUp(self):
+        for username, opt_in in [("opted-in", True), ("opted-out", False), ("blocked", True)]:
+            user = User.objects.create_user(
+                username=username, email=f"{username.title()}@example.com", password="x"
+            )
+            Profile.objects.create(user=user, newsletter_opt_in=opt_in)
+        DoNotEmail.objects.create(
+            email="blocked@example.com", reason=DoNotEmail.Reason.ACCOUNT_DELETION
+        )
+        self.mailing = Mailing.objects.create(
+            name="test",
+            subject="Hello",
+            segments=[
+                {"template": "lz-hearing/d1-d2-d5", "audience": {"newsletter_opt_in": True}},
+                {"template": "lz-hearing/d3", "audience": {}},
+            ],
+        )
+
+    def test_plan_assigns_first_matching_segment(self):
+        """Each address gets one delivery, from the first segment it falls in"""
+        plan_mailing(self.mailing)
+        plan_mailing(self.mailing)
+
+        self.assertEqual(
+            dict(self.mailing.deliveries.values_list("address", "template_name")),
+            {
+                "opted-in@example.com": "lz-hearing/d1-d2-d5",
+                "opted-out@example.com": "lz-hearing/d3",
+            },
+        )
+
+    def test_queued_delivery_is_sent_once(self):
+        """A delivery queued in two batches is only sent by the first"""
+        plan_mailing(self.mailing)
+        delivery = self.mailing.deliveries.get(address="opted-in@example.com")
+        MailingDelivery.objects.filter(pk=delivery.pk).update(status=MailingDelivery.Status.QUEUED)
+
+        send_batch([delivery.pk])
+        send_batch([delivery.pk])
+
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, MailingDelivery.Status.SENT)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["opted-in@example.com"])
+
+    def test_partial_failure_only_fails_unsent_deliveries(self):
+        """Deliveries that went out before a send failed are marked sent, not failed"""
+        plan_mailing(self.mailing)
+        self.mailing.deliveries.update(
+            template_name="lz-hearing/d3", status=MailingDelivery.Status.QUEUED
+        )
+        send_messages = locmem.EmailBackend.send_messages
+
+        def fail_after_first(backend, messages):
+            if mail.outbox:
+                raise ConnectionError("Connection lost")
+            return send_messages(backend, messages)
+
+        with patch.object(locmem.EmailBackend, "send_messages", fail_after_first):
+            send_batch(list(self.mailing.deliveries.values_list("pk", flat=True)))
+
+        statuses = dict(self.mailing.deliveries.values_list("address", "status"))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(statuses.pop(mail.outbox[0].to[0]), MailingDelivery.Status.SENT)
+        self.assertEqual(list(statuses.values()), [MailingDelivery.Status.FAILED])
+
+    def test_reset_stalled_only_resets_old_sending_deliveries(self):
+        """Deliveries stuck sending past the timeout go back to pending"""
+        plan_mailing(self.mailing)
+        self.mailing.deliveries.update(status=MailingDelivery.Status.SENDING)
+        self.mailing.deliveries.filter(address="opted-in@example.com").update(
+            updated_at=timezone.now() - datetime.timedelta(hours=1)
+        )
+
+        self.assertEqual(reset_stalled(self.mailing), 1)
+        self.assertEqual(
+            dict(self.mailing.deliveries.values_list("address", "status")),
+            {
+                "opted-in@example.com": MailingDelivery.Status.PENDING,
+                "opted-out@example.com": MailingDelivery.Status.SENDING,
+            },
+        )
+
+
+class SuppressionTestCase(TestCase):
+    def test_suppression_ignores_case(self):
+        """Suppressed addresses are stored normalized and matched in any case"""
+        with self.captureOnCommitCallbacks(execute=True):
+            DoNotEmail.objects.create(
+                email=" Blocked@Example.com", reason=DoNotEmail.Reason.KNOWN_OPPONENT
+            )
+
+        self.assertTrue(DoNotEmail.objects.filter(email="blocked@example.com").exists())
+        self.assertEqual(
+            filter_suppressed(["BLOCKED@example.com", "Other@Example.com"]),
+            ["Other@Example.com"],
+        )
+
+    def test_suppression_list_reloads_after_changes(self):
+        """Adding and removing an address takes effect on the next send"""
+        with self.captureOnCommitCallbacks(execute=True):
+            do_not_email = DoNotEmail.objects.create(
+                email="blocked@example.com", reason=DoNotEmail.Reason.ACCOUNT_DELETION
+            )
+        send_email_message(None, None, ["Blocked@example.com"], {}, subject="Hi", message="Hi")
+        self.assertEqual(len(mail.outbox), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            do_not_email.delete()
+        send_email_message(None, None, ["Blocked@example.com"], {}, subject="Hi", message="Hi")
+        self.assertEqual(len(mail.outbox), 1)
@@ -14,7 +14,7 @@ from djstripe.models import Customer, Price
 from organizers.models import OrganizerApplication
 from pbaabp.integrations.mailjet import Mailjet
 from profiles.forms import ProfileUpdateForm
-from profiles.models import DoNotEmail, Profile, ShirtOrder
+from profiles.models import DoNotEmail, Profile, ShirtOrder, normalize_address
 from projects.models import ProjectApplication
 
 
@@ -365,7 +365,8 @@ class ProfileDeleteView(LoginRequiredMixin, DeleteView):
         user = self.get_object()
 
         DoNotEmail.objects.get_or_create(
-            email=user.email, defaults={"reason": DoNotEmail.Reason.ACCOUNT_DELETION}
+            email=normalize_address(user.email),
+            defaults={"reason": DoNotEmail.Reason.ACCOUNT_DELETION},
         )
 
         list_id = settings.MAILJET_CONTACT_LIST_ID
@@ -388,7 +389,8 @@ class ProfileDeleteView(LoginRequiredMixin, DeleteView):
         user = self.get_object()
 
         do_not_email, created = DoNotEmail.objects.get_or_create(
-            email=user.email, defaults={"reason": DoNotEmail.Reason.ACCOUNT_DELETION}
+            email=normalize_address(user.email),
+            defaults={"reason": DoNotEmail.Reason.ACCOUNT_DELETION},
         )
 
         messages.add_message(request, messages.SUCCESS, "Account deleted")